@@ -8,7 +8,7 @@ from config import config
 db = SQLAlchemy()
 jwt = JWTManager()
 
-def create_app(config_name='default'):
+def create_app(config_name='default', check_schema=True):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
 
@@ -66,9 +66,18 @@ def create_app(config_name='default'):
     app.register_blueprint(grades_bp, url_prefix='/api/grades')
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
 
+    from application.cli import register_commands
+    register_commands(app)
+
     with app.app_context():
-        # Import models to register them with SQLAlchemy before creating tables
+        # Import models to register them with SQLAlchemy
         from application import models
-        db.create_all()
+        from application.migrations import check_schema_version, upgrade
+
+        # Schema changes run from `python migrate.py`; booting only reads the recorded version
+        if check_schema and app.config['AUTO_MIGRATE']:
+            upgrade(db.engine, log=app.logger.info)
+        elif check_schema and app.config['SCHEMA_VERSION_CHECK']:
+            check_schema_version(db.engine)
 
     return app
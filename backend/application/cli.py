@@ -0,0 +1,22 @@
+import click
+from application.models.course_grade_snapshot import CourseGradeSnapshot
+from application.services.grade_scan_service import GradeScanService
+
+def register_commands(app):
+    @app.cli.command('rebuild-grade-snapshots')
+    @click.option('--chunk-size', default=500, show_default=True, help='Courses recomputed per transaction')
+    def rebuild_grade_snapshots(chunk_size):
+        """Recompute every course_grade_snapshots row from raw grades."""
+        rebuilt = CourseGradeSnapshot.rebuild_all(chunk_size=chunk_size)
+        click.echo(f'Rebuilt grade snapshots for {rebuilt} courses')
+
+    @app.cli.command('scan-grades')
+    @click.option('--chunk-size', type=int, help='Courses evaluated per chunk')
+    @click.option('--parallelism', type=int, help='Chunks evaluated concurrently')
+    def scan_grades(chunk_size, parallelism):
+        """Evaluate every course against its targets and enqueue grade alerts."""
+        report = GradeScanService(app, chunk_size=chunk_size, parallelism=parallelism).run()
+        click.echo(
+            f"Scanned {report['courses_scanned']} courses in {report['duration_seconds']}s "
+            f"({report['courses_per_second']} courses/sec), enqueued {report['alerts_enqueued']} alerts"
+        )
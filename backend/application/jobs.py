@@ -0,0 +1,138 @@
+from flask import current_app
+from application import db
+from application.models.course import Course
+from application.models.course_grade_snapshot import CourseGradeSnapshot
+from application.models.notification import Notification
+from application.models.user import User
+from application.services.job_queue import job_handler, PermanentJobError
+from application.services.brightspace_service import BrightspaceAPIError
+from application.services.course_import_service import CourseImportService
+from application.services.gmail_service import GmailService
+from application.services.notification_dispatcher import NotificationDispatcher
+from application.services.outlook_service import OutlookService
+from application.utils.grade_calculator import GradeCalculator
+
+@job_handler('import_courses')
+def import_courses(job):
+    try:
+        courses = CourseImportService().import_courses(job.payload['user_id'], skip_existing=True)
+    except BrightspaceAPIError as e:
+        if not e.retryable:
+            raise PermanentJobError(str(e)) from e
+        raise
+    return {'imported_courses': len(courses)}
+
+@job_handler('send_grade_alert', batch=True)
+def send_grade_alerts(jobs):
+    # A grade scan enqueues one alert per course; the worker claims the ready ones
+    # together so each provider sends them in as few batch requests as it can
+    course_ids = {job.payload['course_id'] for job in jobs}
+    courses = {course.id: course for course in Course.query_for_grading().filter(Course.id.in_(course_ids))}
+    grades = GradeCalculator.calculate_course_grades(list(courses.values()))
+
+    results = [None] * len(jobs)
+    groups = {}
+    for index, job in enumerate(jobs):
+        payload = job.payload
+        course = courses.get(payload['course_id'])
+        if not course or course.user_id != job.user_id:
+            results[index] = PermanentJobError('Course not found')
+            continue
+
+        grade_data = grades[course.id]
+        if grade_data.get('error'):
+            results[index] = PermanentJobError(grade_data['error'])
+            continue
+
+        channels = (payload.get('use_gmail', True), payload.get('use_outlook', True))
+        groups.setdefault(channels, []).append((index, course, grade_data))
+
+    for (use_gmail, use_outlook), pending in groups.items():
+        providers = []
+        if use_gmail:
+            providers.append(('gmail', GmailService()))
+        if use_outlook:
+            providers.append(('outlook', OutlookService()))
+
+        dispatcher = NotificationDispatcher(providers)
+        sent = dispatcher.dispatch([
+            (jobs[index].payload['recipient_email'], course.course_name, grade_data)
+            for index, course, grade_data in pending
+        ])
+
+        for (index, course, grade_data), sent_via, unconfirmed in zip(pending, sent, dispatcher.unconfirmed):
+            if not sent_via and unconfirmed:
+                # A timed-out call may still have delivered; retrying could send it twice
+                results[index] = {'sent_via': [], 'unconfirmed': unconfirmed, 'grade_data': grade_data}
+                continue
+            if not sent_via:
+                results[index] = RuntimeError('Failed to send notification via any service')
+                continue
+
+            notification = Notification(
+                user_id=jobs[index].user_id,
+                notification_type='grade_alert',
+                subject=f'Grade Update for {course.course_name}',
+                message=f"Current grade: {grade_data.get('final_grade', 'N/A')}% ({grade_data.get('letter_grade', 'N/A')})",
+                sent_via=', '.join(sent_via)
+            )
+            db.session.add(notification)
+            db.session.flush()
+
+            results[index] = {
+                'sent_via': sent_via,
+                'grade_data': grade_data,
+                'notification': notification.to_dict()
+            }
+
+    return results
+
+@job_handler('auto_check_grades')
+def auto_check_grades(job):
+    user = User.query.get(job.user_id)
+    if not user:
+        raise PermanentJobError('User not found')
+    course_snapshots = CourseGradeSnapshot.for_user(job.user_id)
+
+    threshold = current_app.config.get('GRADE_THRESHOLD', 85.0)
+    providers = [('gmail', GmailService()), ('outlook', OutlookService())]
+    alerts_sent = []
+
+    pending = []
+    for course, snapshot in course_snapshots:
+        grade_data = snapshot.to_dict()
+
+        if grade_data.get('error'):
+            continue
+
+        projected_grade = grade_data.get('projected_final_grade')
+
+        if projected_grade and (projected_grade < threshold or projected_grade < course.target_grade):
+            pending.append((course, projected_grade, grade_data))
+
+    results = NotificationDispatcher(providers).dispatch(
+        [(user.email, course.course_name, grade_data) for course, _, grade_data in pending]
+    )
+
+    for (course, projected_grade, _), sent_via in zip(pending, results):
+        if sent_via:
+            notification = Notification(
+                user_id=job.user_id,
+                notification_type='grade_alert',
+                subject=f'Grade Alert: {course.course_name}',
+                message=f"Grade {projected_grade}% is below target {course.target_grade}%",
+                sent_via=', '.join(sent_via)
+            )
+            db.session.add(notification)
+
+            alerts_sent.append({
+                'course': course.course_name,
+                'grade': projected_grade,
+                'target': course.target_grade,
+                'sent_via': sent_via
+            })
+
+    return {
+        'message': f'Checked {len(course_snapshots)} courses, sent {len(alerts_sent)} alerts',
+        'alerts': alerts_sent
+    }
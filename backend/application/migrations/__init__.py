@@ -0,0 +1,110 @@
+"""
+Versioned schema migrations.
+
+Each module named ``m<version>_<name>.py`` in this package defines
+``upgrade(connection)``. Modules that cannot run inside a transaction (e.g.
+CREATE INDEX CONCURRENTLY) set ``TRANSACTIONAL = False`` and must be
+idempotent. Applied versions are recorded in ``schema_migrations``.
+
+Run them with ``python migrate.py``; app startup only compares the recorded
+version with the newest migration.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select
+from sqlalchemy.exc import DBAPIError
+
+MIGRATION_MODULE = re.compile(r'^m(\d{4})_(\w+)$')
+ADVISORY_LOCK_ID = 72_655_001
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False, default=datetime.utcnow)
+)
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        self.transactional = getattr(module, 'TRANSACTIONAL', True)
+
+    def upgrade(self, connection):
+        self.module.upgrade(connection)
+
+def discover():
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MIGRATION_MODULE.match(module_info.name)
+        if match:
+            module = importlib.import_module(f'{__name__}.{module_info.name}')
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+def head_version():
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+def current_version(connection):
+    # One indexed aggregate; a database that was never migrated has no table yet
+    try:
+        return connection.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+    except DBAPIError:
+        connection.rollback()
+        return 0
+
+def check_schema_version(engine):
+    with engine.connect() as connection:
+        current = current_version(connection)
+    head = head_version()
+    if current < head:
+        raise SchemaVersionError(
+            f'Database schema is at version {current}, code expects {head}; run `python migrate.py` first'
+        )
+    return current
+
+def upgrade(engine, log=print):
+    applied = []
+    with engine.connect() as lock_connection:
+        # Serialize concurrent deploys; each waits for the other to finish migrating
+        if engine.dialect.name == 'postgresql':
+            lock_connection.execute(select(func.pg_advisory_lock(ADVISORY_LOCK_ID)))
+            lock_connection.commit()
+        try:
+            schema_migrations.create(lock_connection, checkfirst=True)
+            lock_connection.commit()
+            done = set(lock_connection.execute(select(schema_migrations.c.version)).scalars())
+            lock_connection.commit()
+
+            for migration in discover():
+                if migration.version in done:
+                    continue
+                log(f'Applying {migration.version:04d}_{migration.name}...')
+                if migration.transactional:
+                    with engine.begin() as connection:
+                        migration.upgrade(connection)
+                        _record(connection, migration)
+                else:
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                        migration.upgrade(connection)
+                    with engine.begin() as connection:
+                        _record(connection, migration)
+                applied.append(migration.version)
+        finally:
+            if engine.dialect.name == 'postgresql':
+                lock_connection.execute(select(func.pg_advisory_unlock(ADVISORY_LOCK_ID)))
+                lock_connection.commit()
+    return applied
+
+def _record(connection, migration):
+    connection.execute(schema_migrations.insert().values(
+        version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+    ))
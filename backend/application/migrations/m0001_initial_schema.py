@@ -0,0 +1,140 @@
+from sqlalchemy import (
+    JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    UniqueConstraint
+)
+
+# The schema as it stood when migrations were introduced, frozen here rather
+# than read from the models so this migration always builds the same tables.
+# checkfirst adopts databases that predate migrations: existing tables are kept
+metadata = MetaData()
+
+Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('email', String(120), nullable=False),
+    Column('password_hash', String(255), nullable=False),
+    Column('first_name', String(100)),
+    Column('last_name', String(100)),
+    Column('brightspace_user_id', String(100), unique=True),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    Index('ix_users_email', 'email', unique=True)
+)
+
+Table(
+    'courses', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('brightspace_course_id', String(100)),
+    Column('course_code', String(50), nullable=False),
+    Column('course_name', String(200), nullable=False),
+    Column('semester', String(50)),
+    Column('year', Integer),
+    Column('target_grade', Float),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+Table(
+    'assignments', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('course_id', Integer, ForeignKey('courses.id'), nullable=False),
+    Column('brightspace_assignment_id', String(100)),
+    Column('name', String(200), nullable=False),
+    Column('category', String(100)),
+    Column('max_points', Float, nullable=False),
+    Column('due_date', DateTime),
+    Column('description', Text),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+Table(
+    'grades', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('assignment_id', Integer, ForeignKey('assignments.id'), nullable=False, unique=True),
+    Column('points_earned', Float),
+    Column('percentage', Float),
+    Column('letter_grade', String(5)),
+    Column('graded_date', DateTime),
+    Column('feedback', Text),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+Table(
+    'syllabus_weights', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('course_id', Integer, ForeignKey('courses.id'), nullable=False),
+    Column('category', String(100), nullable=False),
+    Column('weight', Float, nullable=False),
+    Column('description', Text),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    UniqueConstraint('course_id', 'category', name='unique_course_category')
+)
+
+Table(
+    'notifications', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('notification_type', String(50), nullable=False),
+    Column('subject', String(200), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('sent_via', String(50)),
+    Column('sent_at', DateTime),
+    Column('is_read', Boolean),
+    Column('created_at', DateTime)
+)
+
+Table(
+    'course_grade_snapshots', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('course_id', Integer, ForeignKey('courses.id'), nullable=False),
+    Column('final_grade', Float),
+    Column('projected_final_grade', Float),
+    Column('letter_grade', String(5)),
+    Column('total_weight_applied', Float),
+    Column('completion_percentage', Float),
+    Column('breakdown', JSON),
+    Column('error', String(200)),
+    Column('computed_at', DateTime),
+    Index('ix_course_grade_snapshots_course_id', 'course_id', unique=True)
+)
+
+Table(
+    'course_sync_states', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('course_id', Integer, ForeignKey('courses.id'), nullable=False),
+    Column('assignments_etag', String(200)),
+    Column('grades_etag', String(200)),
+    Column('last_graded_date', DateTime),
+    Column('synced_at', DateTime),
+    Index('ix_course_sync_states_course_id', 'course_id', unique=True)
+)
+
+Table(
+    'jobs', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('job_type', String(50), nullable=False),
+    Column('user_id', Integer, ForeignKey('users.id')),
+    Column('dedupe_key', String(200)),
+    Column('payload', JSON),
+    Column('status', String(20), nullable=False),
+    Column('result', JSON),
+    Column('error', Text),
+    Column('attempts', Integer, nullable=False),
+    Column('max_attempts', Integer, nullable=False),
+    Column('run_at', DateTime, nullable=False),
+    Column('locked_until', DateTime),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    Index('ix_jobs_user_id', 'user_id'),
+    Index('ix_jobs_dedupe_key', 'dedupe_key'),
+    Index('ix_jobs_status_run_at', 'status', 'run_at')
+)
+
+def upgrade(connection):
+    metadata.create_all(connection, checkfirst=True)
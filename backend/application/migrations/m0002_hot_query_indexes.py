@@ -0,0 +1,47 @@
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, text
+from sqlalchemy.schema import CreateIndex
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+TRANSACTIONAL = False
+
+# Frozen copies of just the columns these indexes cover; the migration must keep
+# building the same indexes however the models change later
+metadata = MetaData()
+courses = Table('courses', metadata, Column('id', Integer), Column('user_id', Integer))
+assignments = Table(
+    'assignments', metadata,
+    Column('course_id', Integer), Column('brightspace_assignment_id', String(100))
+)
+notifications = Table(
+    'notifications', metadata,
+    Column('id', Integer), Column('user_id', Integer), Column('created_at', DateTime)
+)
+
+HOT_INDEXES = (
+    Index('ix_courses_user_id_id', courses.c.user_id, courses.c.id),
+    Index('ix_assignments_course_id_brightspace_id', assignments.c.course_id, assignments.c.brightspace_assignment_id),
+    Index('ix_notifications_user_id_created_at', notifications.c.user_id, notifications.c.created_at, notifications.c.id),
+)
+
+def create_index_sql(index, dialect):
+    sql = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    if dialect.name == 'postgresql':
+        # Builds without blocking writes to the table
+        sql = sql.replace('INDEX', 'INDEX CONCURRENTLY', 1)
+    return sql
+
+def drop_invalid_index(connection, name):
+    # A failed or interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index
+    # behind that IF NOT EXISTS would skip; drop it so it is rebuilt
+    valid = connection.execute(
+        text('SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)'), {'name': name}
+    ).scalar()
+    if valid is False:
+        connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS {connection.dialect.identifier_preparer.quote(name)}')
+    return valid is False
+
+def upgrade(connection):
+    for index in HOT_INDEXES:
+        if connection.dialect.name == 'postgresql':
+            drop_invalid_index(connection, index.name)
+        connection.exec_driver_sql(create_index_sql(index, connection.dialect))
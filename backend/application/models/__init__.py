@@ -4,5 +4,8 @@ from application.models.assignment import Assignment
 from application.models.grade import Grade
 from application.models.syllabus_weight import SyllabusWeight
 from application.models.notification import Notification
+from application.models.course_grade_snapshot import CourseGradeSnapshot
+from application.models.course_sync_state import CourseSyncState
+from application.models.job import Job
 
-__all__ = ['User', 'Course', 'Assignment', 'Grade', 'SyllabusWeight', 'Notification']
+__all__ = ['User', 'Course', 'Assignment', 'Grade', 'SyllabusWeight', 'Notification', 'CourseGradeSnapshot', 'CourseSyncState', 'Job']
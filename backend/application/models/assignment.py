@@ -18,6 +18,8 @@ class Assignment(db.Model):
     course = db.relationship('Course', back_populates='assignments')
     grade = db.relationship('Grade', back_populates='assignment', uselist=False, cascade='all, delete-orphan')
 
+    __table_args__ = (db.Index('ix_assignments_course_id_brightspace_id', 'course_id', 'brightspace_assignment_id'),)
+
     def to_dict(self, include_grade=False):
         data = {
             'id': self.id,
@@ -18,6 +18,55 @@ class Course(db.Model):
     user = db.relationship('User', back_populates='courses')
     assignments = db.relationship('Assignment', back_populates='course', cascade='all, delete-orphan')
     syllabus_weights = db.relationship('SyllabusWeight', back_populates='course', cascade='all, delete-orphan')
+    grade_snapshot = db.relationship('CourseGradeSnapshot', back_populates='course', uselist=False, cascade='all, delete-orphan')
+    sync_state = db.relationship('CourseSyncState', back_populates='course', uselist=False, cascade='all, delete-orphan')
+
+    __table_args__ = (db.Index('ix_courses_user_id_id', 'user_id', 'id'),)
+
+    @classmethod
+    def query_for_grading(cls):
+        # Weights, assignments and their grades in three round-trips regardless of course size
+        from application.models.assignment import Assignment
+        return cls.query.options(
+            db.selectinload(cls.syllabus_weights),
+            db.selectinload(cls.assignments).joinedload(Assignment.grade)
+        )
+
+    @classmethod
+    def load_for_grading(cls, course_id, user_id):
+        return cls.query_for_grading().filter_by(id=course_id, user_id=user_id).first()
+
+    @classmethod
+    def load_all_for_grading(cls, user_id):
+        return cls.query_for_grading().filter_by(user_id=user_id).order_by(cls.id).all()
+
+    @classmethod
+    def grading_columns(cls, course_ids):
+        # Column-only rows in the layout GradeCalculator.calculate_batch consumes
+        from application.models.assignment import Assignment
+        from application.models.grade import Grade
+        from application.models.syllabus_weight import SyllabusWeight
+
+        assignment_columns = {'course_id': [], 'category': [], 'max_points': [], 'points_earned': []}
+        for row in db.session.query(
+            Assignment.course_id, Assignment.category, Assignment.max_points, Grade.points_earned
+        ).join(Grade, Grade.assignment_id == Assignment.id).filter(
+            Assignment.course_id.in_(course_ids)
+        ).order_by(Assignment.course_id, Assignment.id):
+            assignment_columns['course_id'].append(row.course_id)
+            assignment_columns['category'].append(row.category)
+            assignment_columns['max_points'].append(row.max_points)
+            assignment_columns['points_earned'].append(row.points_earned)
+
+        weight_columns = {'course_id': [], 'category': [], 'weight': []}
+        for row in db.session.query(
+            SyllabusWeight.course_id, SyllabusWeight.category, SyllabusWeight.weight
+        ).filter(SyllabusWeight.course_id.in_(course_ids)).order_by(SyllabusWeight.course_id, SyllabusWeight.id):
+            weight_columns['course_id'].append(row.course_id)
+            weight_columns['category'].append(row.category)
+            weight_columns['weight'].append(row.weight)
+
+        return assignment_columns, weight_columns
 
     def to_dict(self, include_assignments=False, include_weights=False):
         data = {
@@ -0,0 +1,167 @@
+from datetime import datetime
+from sqlalchemy import event
+from application import db
+from application.utils.bulk_ops import upsert_rows
+
+STALE_COURSES_KEY = 'stale_grade_course_ids'
+STALE_ASSIGNMENTS_KEY = 'stale_grade_assignment_ids'
+SNAPSHOT_FIELDS = (
+    'final_grade', 'projected_final_grade', 'letter_grade', 'total_weight_applied',
+    'completion_percentage', 'breakdown', 'error', 'computed_at'
+)
+
+class CourseGradeSnapshot(db.Model):
+    __tablename__ = 'course_grade_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False, unique=True, index=True)
+    final_grade = db.Column(db.Float)
+    projected_final_grade = db.Column(db.Float)
+    letter_grade = db.Column(db.String(5))
+    total_weight_applied = db.Column(db.Float)
+    completion_percentage = db.Column(db.Float)
+    breakdown = db.Column(db.JSON)
+    error = db.Column(db.String(200))
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    course = db.relationship('Course', back_populates='grade_snapshot')
+
+    @staticmethod
+    def values_from(grade_data):
+        return {
+            'final_grade': grade_data.get('final_grade'),
+            'projected_final_grade': grade_data.get('projected_final_grade'),
+            'letter_grade': grade_data.get('letter_grade'),
+            'total_weight_applied': grade_data.get('total_weight_applied'),
+            'completion_percentage': grade_data.get('completion_percentage'),
+            'breakdown': grade_data.get('breakdown', []),
+            'error': grade_data.get('error'),
+            'computed_at': datetime.utcnow()
+        }
+
+    def to_dict(self):
+        # Same shape GradeCalculator.calculate_course_grade returns
+        if self.error:
+            return {
+                'final_grade': None,
+                'letter_grade': None,
+                'breakdown': [],
+                'error': self.error
+            }
+        return {
+            'final_grade': self.final_grade,
+            'projected_final_grade': self.projected_final_grade,
+            'letter_grade': self.letter_grade,
+            'breakdown': self.breakdown or [],
+            'total_weight_applied': self.total_weight_applied,
+            'completion_percentage': self.completion_percentage
+        }
+
+    @staticmethod
+    def mark_stale(course_ids, session=None):
+        # For writes that bypass the ORM unit of work (bulk inserts/upserts)
+        session = session or db.session
+        session.info.setdefault(STALE_COURSES_KEY, set()).update(course_ids)
+
+    @classmethod
+    def refresh(cls, course_ids):
+        from application.models.course import Course
+        from application.utils.grade_calculator import GradeCalculator
+
+        course_ids = set(course_ids)
+        if not course_ids:
+            return {}
+
+        courses = Course.query_for_grading().filter(Course.id.in_(course_ids)).execution_options(
+            populate_existing=True
+        ).all()
+        results = GradeCalculator.calculate_course_grades(courses)
+
+        # One upsert rather than check-then-insert: concurrent first reads of the
+        # same course both write the row instead of one failing on course_id
+        upsert_rows(cls, [
+            dict(cls.values_from(grade_data), course_id=course_id) for course_id, grade_data in results.items()
+        ], ['course_id'], SNAPSHOT_FIELDS)
+        return {s.course_id: s for s in cls.query.filter(cls.course_id.in_(results.keys())).execution_options(
+            populate_existing=True
+        )}
+
+    @classmethod
+    def for_user(cls, user_id):
+        # Every course of the user paired with its snapshot in one query
+        from application.models.course import Course
+
+        rows = db.session.query(Course, cls).outerjoin(cls).filter(
+            Course.user_id == user_id
+        ).order_by(Course.id).all()
+
+        snapshots = {course.id: snapshot for course, snapshot in rows if snapshot}
+        missing = [course.id for course, snapshot in rows if not snapshot]
+        if missing:
+            snapshots.update(cls.refresh(missing))
+        return [(course, snapshots[course.id]) for course, _ in rows]
+
+    @classmethod
+    def rebuild_all(cls, chunk_size=500):
+        from application.models.course import Course
+
+        rebuilt = 0
+        last_id = 0
+        while True:
+            course_ids = [row.id for row in db.session.query(Course.id).filter(
+                Course.id > last_id
+            ).order_by(Course.id).limit(chunk_size)]
+            if not course_ids:
+                break
+            cls.refresh(course_ids)
+            db.session.commit()
+            rebuilt += len(course_ids)
+            last_id = course_ids[-1]
+        return rebuilt
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_stale_courses(session, flush_context):
+    from application.models.course import Course
+    from application.models.assignment import Assignment
+    from application.models.grade import Grade
+    from application.models.syllabus_weight import SyllabusWeight
+
+    stale_courses = session.info.setdefault(STALE_COURSES_KEY, set())
+    stale_assignments = session.info.setdefault(STALE_ASSIGNMENTS_KEY, set())
+
+    changed = list(session.new) + list(session.deleted) + [
+        obj for obj in session.dirty if session.is_modified(obj)
+    ]
+    for obj in changed:
+        if isinstance(obj, Grade):
+            if obj.assignment_id is not None:
+                stale_assignments.add(obj.assignment_id)
+        elif isinstance(obj, (Assignment, SyllabusWeight)):
+            if obj.course_id is not None:
+                stale_courses.add(obj.course_id)
+        elif isinstance(obj, Course) and obj in session.new:
+            stale_courses.add(obj.id)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _refresh_stale_snapshots(session):
+    from application.models.assignment import Assignment
+
+    session.flush()
+    stale_courses = session.info.pop(STALE_COURSES_KEY, set())
+    stale_assignments = session.info.pop(STALE_ASSIGNMENTS_KEY, set())
+
+    if stale_assignments:
+        stale_courses.update(row.course_id for row in session.query(Assignment.course_id).filter(
+            Assignment.id.in_(stale_assignments)
+        ).distinct())
+
+    if stale_courses:
+        CourseGradeSnapshot.refresh(stale_courses)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_stale_courses(session):
+    session.info.pop(STALE_COURSES_KEY, None)
+    session.info.pop(STALE_ASSIGNMENTS_KEY, None)
@@ -0,0 +1,31 @@
+from application import db
+
+class CourseSyncState(db.Model):
+    # Per-course Brightspace watermarks; a sync sends the stored ETags back
+    # as If-None-Match and skips any resource the server reports unchanged
+    __tablename__ = 'course_sync_states'
+
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False, unique=True, index=True)
+    assignments_etag = db.Column(db.String(200))
+    grades_etag = db.Column(db.String(200))
+    last_graded_date = db.Column(db.DateTime)
+    synced_at = db.Column(db.DateTime)
+
+    course = db.relationship('Course', back_populates='sync_state')
+
+    def to_watermarks(self):
+        return {
+            'assignments_etag': self.assignments_etag,
+            'grades_etag': self.grades_etag,
+            'last_graded_date': self.last_graded_date
+        }
+
+    def to_dict(self):
+        return {
+            'course_id': self.course_id,
+            'assignments_etag': self.assignments_etag,
+            'grades_etag': self.grades_etag,
+            'last_graded_date': self.last_graded_date.isoformat() if self.last_graded_date else None,
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None
+        }
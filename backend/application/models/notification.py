@@ -16,6 +16,8 @@ class Notification(db.Model):
 
     user = db.relationship('User', back_populates='notifications')
 
+    __table_args__ = (db.Index('ix_notifications_user_id_created_at', 'user_id', 'created_at', 'id'),)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -2,11 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from application import db
 from application.models.user import User
-from application.models.course import Course
-from application.models.assignment import Assignment
-from application.models.syllabus_weight import SyllabusWeight
-from application.models.grade import Grade
-from application.services.brightspace_service import BrightspaceService
+from application.models.job import Job
+from application.services.job_queue import JobQueue
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -30,86 +27,30 @@ def register():
     user.set_password(data['password'])
 
     db.session.add(user)
-    db.session.commit()
+    db.session.flush()
 
-    _import_synthetic_courses_for_user(user.id)
+    import_job = JobQueue.enqueue('import_courses', {'user_id': user.id}, user_id=user.id)
+    db.session.commit()
 
     access_token = create_access_token(identity=str(user.id))
 
     return jsonify({
         'message': 'Registration successful',
         'user': user.to_dict(),
-        'access_token': access_token
+        'access_token': access_token,
+        'import_job': import_job.to_dict()
     }), 201
 
-def _import_synthetic_courses_for_user(user_id):
-    brightspace = BrightspaceService()
-    synthetic_courses = brightspace.get_courses(user_id)
-
-    for course_data in synthetic_courses:
-        course = Course(
-            user_id=user_id,
-            brightspace_course_id=course_data['brightspace_course_id'],
-            course_code=course_data['course_code'],
-            course_name=course_data['course_name'],
-            semester=course_data.get('semester'),
-            year=course_data.get('year'),
-            target_grade=85.0
-        )
-
-        db.session.add(course)
-        db.session.flush()
-
-        assignments_data = brightspace.get_assignments(course_data['brightspace_course_id'])
-
-        for assignment_data in assignments_data:
-            assignment = Assignment(
-                course_id=course.id,
-                brightspace_assignment_id=assignment_data['brightspace_assignment_id'],
-                name=assignment_data['name'],
-                category=assignment_data['category'],
-                max_points=assignment_data['max_points'],
-                due_date=assignment_data.get('due_date'),
-                description=assignment_data.get('description')
-            )
-            db.session.add(assignment)
-            db.session.flush()
-
-        grades_data = brightspace.get_grades(course_data['brightspace_course_id'], user_id)
-
-        for assignment_id, grade_data in grades_data.items():
-            assignment = Assignment.query.filter_by(
-                course_id=course.id,
-                brightspace_assignment_id=assignment_id
-            ).first()
-
-            if assignment:
-                grade = Grade(
-                    assignment_id=assignment.id,
-                    points_earned=grade_data['points_earned'],
-                    percentage=(grade_data['points_earned'] / assignment.max_points) * 100,
-                    graded_date=grade_data.get('graded_date'),
-                    feedback=grade_data.get('feedback')
-                )
-                db.session.add(grade)
-
-        weights = [
-            {'category': 'Homework', 'weight': 30.0, 'description': 'Weekly homework assignments'},
-            {'category': 'Quiz', 'weight': 20.0, 'description': 'In-class quizzes'},
-            {'category': 'Exam', 'weight': 40.0, 'description': 'Midterm and final exams'},
-            {'category': 'Project', 'weight': 10.0, 'description': 'Course project'}
-        ]
-
-        for weight_data in weights:
-            weight = SyllabusWeight(
-                course_id=course.id,
-                category=weight_data['category'],
-                weight=weight_data['weight'],
-                description=weight_data['description']
-            )
-            db.session.add(weight)
+@auth_bp.route('/import-status', methods=['GET'])
+@jwt_required()
+def get_import_status():
+    user_id = int(get_jwt_identity())
+    job = Job.query.filter_by(user_id=user_id, job_type='import_courses').order_by(Job.id.desc()).first()
 
-    db.session.commit()
+    if not job:
+        return jsonify({'error': 'No course import found'}), 404
+
+    return jsonify({'job': job.to_dict()}), 200
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -1,108 +1,96 @@
-from flask import Blueprint, request, jsonify
+import json
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from application import db
 from application.models.course import Course
 from application.models.assignment import Assignment
 from application.models.syllabus_weight import SyllabusWeight
-from application.models.grade import Grade
+from application.models.course_grade_snapshot import CourseGradeSnapshot
 from application.utils.grade_calculator import GradeCalculator
-from application.services.brightspace_service import BrightspaceService
+from application.utils.pagination import KeysetPaginator, PaginationError
+from application.services.course_import_service import CourseImportService
+from application.services.course_sync_service import CourseSyncService
+from application.services.bulk_sync_service import BulkSyncService
+from application.services.brightspace_service import BrightspaceAPIError, BrightspaceService
 
 courses_bp = Blueprint('courses', __name__)
 
+COURSE_FIELDS = (
+    'id', 'user_id', 'brightspace_course_id', 'course_code', 'course_name',
+    'semester', 'year', 'target_grade', 'created_at', 'updated_at'
+)
+ASSIGNMENT_FIELDS = (
+    'id', 'course_id', 'brightspace_assignment_id', 'name', 'category',
+    'max_points', 'due_date', 'description', 'created_at', 'updated_at'
+)
+
+course_pages = KeysetPaginator(Course, COURSE_FIELDS, order_by=('id',), default_limit=50, max_limit=200)
+assignment_pages = KeysetPaginator(Assignment, ASSIGNMENT_FIELDS, order_by=('id',), default_limit=200, max_limit=1000)
+
+def brightspace_error_response(error):
+    # Throttled upstream maps to 503 so clients back off; anything else is a bad gateway
+    status = 503 if error.status_code in (429, 503) else 502
+    return jsonify({
+        'error': 'Brightspace request failed',
+        'details': str(error),
+        'upstream_status': error.status_code
+    }), status
+
 @courses_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_courses():
     user_id = int(get_jwt_identity())
-    courses = Course.query.filter_by(user_id=user_id).all()
+    try:
+        courses, page = course_pages.page(request.args, Course.user_id == user_id)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
-        'courses': [course.to_dict() for course in courses]
+        'courses': courses,
+        'page': page
     }), 200
 
+@courses_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    user_id = int(get_jwt_identity())
+    rows = db.session.query(
+        *[getattr(Course, name) for name in COURSE_FIELDS], CourseGradeSnapshot
+    ).outerjoin(CourseGradeSnapshot, CourseGradeSnapshot.course_id == Course.id).filter(
+        Course.user_id == user_id
+    ).order_by(Course.id).all()
+
+    # Snapshots are kept current on every grade write; only courses that predate
+    # the backfill are computed here, in one set-based pass
+    missing = [row.id for row in rows if row.CourseGradeSnapshot is None]
+    computed = {}
+    if missing:
+        assignment_columns, weight_columns = Course.grading_columns(missing)
+        computed = GradeCalculator.calculate_batch(missing, assignment_columns, weight_columns)
+
+    courses = []
+    for row in rows:
+        data = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in zip(COURSE_FIELDS, row)
+        }
+        data['grade'] = row.CourseGradeSnapshot.to_dict() if row.CourseGradeSnapshot else computed[row.id]
+        courses.append(data)
+
+    return jsonify({'courses': courses}), 200
+
 @courses_bp.route('/import-synthetic', methods=['POST'])
 @jwt_required()
 def import_synthetic_courses():
     user_id = int(get_jwt_identity())
 
-    brightspace = BrightspaceService()
-    synthetic_courses = brightspace.get_courses(user_id)
-
-    imported_courses = []
-
-    for course_data in synthetic_courses:
-        existing = Course.query.filter_by(
-            user_id=user_id,
-            brightspace_course_id=course_data['brightspace_course_id']
-        ).first()
-
-        if existing:
-            continue
-
-        course = Course(
-            user_id=user_id,
-            brightspace_course_id=course_data['brightspace_course_id'],
-            course_code=course_data['course_code'],
-            course_name=course_data['course_name'],
-            semester=course_data.get('semester'),
-            year=course_data.get('year'),
-            target_grade=85.0
-        )
-
-        db.session.add(course)
-        db.session.flush()
-
-        assignments_data = brightspace.get_assignments(course_data['brightspace_course_id'])
-
-        for assignment_data in assignments_data:
-            assignment = Assignment(
-                course_id=course.id,
-                brightspace_assignment_id=assignment_data['brightspace_assignment_id'],
-                name=assignment_data['name'],
-                category=assignment_data['category'],
-                max_points=assignment_data['max_points'],
-                due_date=assignment_data.get('due_date'),
-                description=assignment_data.get('description')
-            )
-            db.session.add(assignment)
-            db.session.flush()
-
-        grades_data = brightspace.get_grades(course_data['brightspace_course_id'], user_id)
-
-        for assignment_id, grade_data in grades_data.items():
-            assignment = Assignment.query.filter_by(
-                course_id=course.id,
-                brightspace_assignment_id=assignment_id
-            ).first()
-
-            if assignment:
-                grade = Grade(
-                    assignment_id=assignment.id,
-                    points_earned=grade_data['points_earned'],
-                    percentage=(grade_data['points_earned'] / assignment.max_points) * 100,
-                    graded_date=grade_data.get('graded_date'),
-                    feedback=grade_data.get('feedback')
-                )
-                db.session.add(grade)
-
-        weights = [
-            {'category': 'Homework', 'weight': 30.0, 'description': 'Weekly homework assignments'},
-            {'category': 'Quiz', 'weight': 20.0, 'description': 'In-class quizzes'},
-            {'category': 'Exam', 'weight': 40.0, 'description': 'Midterm and final exams'},
-            {'category': 'Project', 'weight': 10.0, 'description': 'Course project'}
-        ]
-
-        for weight_data in weights:
-            weight = SyllabusWeight(
-                course_id=course.id,
-                category=weight_data['category'],
-                weight=weight_data['weight'],
-                description=weight_data['description']
-            )
-            db.session.add(weight)
-
-        imported_courses.append(course)
-
+    try:
+        imported_courses = CourseImportService().import_courses(user_id, skip_existing=True)
+    except BrightspaceAPIError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Brightspace import error for user {user_id}: {e}")
+        return brightspace_error_response(e)
     db.session.commit()
 
     return jsonify({
@@ -146,8 +134,17 @@ def get_course(course_id):
     if not course:
         return jsonify({'error': 'Course not found'}), 404
 
+    # limit/cursor/fields page through the assignments; the course row itself is always whole
+    try:
+        assignments, page = assignment_pages.page(request.args, Assignment.course_id == course.id)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    data = course.to_dict(include_weights=True)
+    data['assignments'] = assignments
     return jsonify({
-        'course': course.to_dict(include_assignments=True, include_weights=True)
+        'course': data,
+        'assignments_page': page
     }), 200
 
 @courses_bp.route('/<int:course_id>', methods=['PUT'])
@@ -202,73 +199,71 @@ def sync_course(course_id):
     if not course:
         return jsonify({'error': 'Course not found'}), 404
 
-    brightspace = BrightspaceService()
-
-    assignments_data = brightspace.get_assignments(course.brightspace_course_id or course_id)
-
-    synced_count = 0
-    for assignment_data in assignments_data:
-        assignment = Assignment.query.filter_by(
-            course_id=course_id,
-            brightspace_assignment_id=assignment_data.get('brightspace_assignment_id')
-        ).first()
-
-        if not assignment:
-            assignment = Assignment(
-                course_id=course_id,
-                brightspace_assignment_id=assignment_data.get('brightspace_assignment_id'),
-                name=assignment_data['name'],
-                category=assignment_data.get('category', 'Homework'),
-                max_points=assignment_data['max_points'],
-                due_date=assignment_data.get('due_date'),
-                description=assignment_data.get('description')
-            )
-            db.session.add(assignment)
-            synced_count += 1
-
-    grades_data = brightspace.get_grades(course.brightspace_course_id or course_id, user_id)
-
-    for assignment_id, grade_data in grades_data.items():
-        assignment = Assignment.query.filter_by(
-            course_id=course_id,
-            brightspace_assignment_id=assignment_id
-        ).first()
-
-        if assignment:
-            grade = assignment.grade or Grade(assignment_id=assignment.id)
-            grade.points_earned = grade_data.get('points_earned')
-            grade.percentage = (grade_data.get('points_earned') / assignment.max_points) * 100
-            grade.graded_date = grade_data.get('graded_date')
-            grade.feedback = grade_data.get('feedback')
-
-            if not assignment.grade:
-                db.session.add(grade)
+    sync_service = CourseSyncService()
+    try:
+        sync_stats = sync_service.sync(course, user_id)
+    except BrightspaceAPIError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Brightspace sync error for course {course_id}: {e}")
+        return brightspace_error_response(e)
 
     db.session.commit()
 
     return jsonify({
-        'message': f'Synced {synced_count} assignments from Brightspace',
+        'message': f"Synced {sync_stats['counts']['assignments_inserted']} assignments from Brightspace",
+        'sync_stats': sync_stats,
+        'rate_limit': BrightspaceService.rate_limit_stats(),
         'course': course.to_dict(include_assignments=True)
     }), 200
 
+@courses_bp.route('/sync-all', methods=['POST'])
+@jwt_required()
+def sync_all_courses():
+    user_id = int(get_jwt_identity())
+    events = BulkSyncService().iter_sync(user_id)
+
+    stream = request.args.get('stream', '').lower() in ('1', 'true') or \
+        'application/x-ndjson' in request.headers.get('Accept', '')
+    if stream:
+        def generate():
+            for event in events:
+                yield json.dumps(event) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    results = list(events)
+    summary = results.pop()
+    return jsonify({
+        'message': f"Synced {summary['synced']} of {summary['courses']} courses from Brightspace",
+        'summary': summary,
+        'courses': results,
+        'rate_limit': BrightspaceService.rate_limit_stats()
+    }), 200
+
 @courses_bp.route('/<int:course_id>/calculate', methods=['GET'])
 @jwt_required()
 def calculate_course_grade(course_id):
     user_id = int(get_jwt_identity())
-    course = Course.query.filter_by(id=course_id, user_id=user_id).first()
+    snapshot = CourseGradeSnapshot.query.join(Course).filter(
+        Course.id == course_id,
+        Course.user_id == user_id
+    ).first()
 
-    if not course:
-        return jsonify({'error': 'Course not found'}), 404
+    if not snapshot:
+        course = Course.query.filter_by(id=course_id, user_id=user_id).first()
+
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
 
-    grade_data = GradeCalculator.calculate_course_grade(course)
+        snapshot = CourseGradeSnapshot.refresh([course_id])[course_id]
+        db.session.commit()
 
-    return jsonify(grade_data), 200
+    return jsonify(snapshot.to_dict()), 200
 
 @courses_bp.route('/<int:course_id>/grade-needed', methods=['GET'])
 @jwt_required()
 def calculate_grade_needed(course_id):
     user_id = int(get_jwt_identity())
-    course = Course.query.filter_by(id=course_id, user_id=user_id).first()
+    course = Course.load_for_grading(course_id, user_id)
 
     if not course:
         return jsonify({'error': 'Course not found'}), 404
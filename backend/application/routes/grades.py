@@ -1,12 +1,65 @@
-from flask import Blueprint, request, jsonify
+import json
+from datetime import datetime
+from itertools import chain
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from application import db
 from application.models.assignment import Assignment
 from application.models.grade import Grade
 from application.models.course import Course
+from application.models.course_grade_snapshot import CourseGradeSnapshot
+from application.services.bulk_grade_service import BulkGradeError, BulkGradeService, parse_csv_rows
 
 grades_bp = Blueprint('grades', __name__)
 
+GRADEBOOK_ASSIGNMENT_COLUMNS = (
+    Assignment.id, Assignment.brightspace_assignment_id, Assignment.name, Assignment.category,
+    Assignment.max_points, Assignment.due_date
+)
+GRADEBOOK_GRADE_COLUMNS = (
+    Grade.id, Grade.points_earned, Grade.percentage, Grade.letter_grade, Grade.graded_date, Grade.feedback
+)
+GRADEBOOK_CHUNK_ROWS = 500
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def _gradebook_rows(course_id, user_id):
+    # Ownership, assignments and grades in one SELECT; the course row survives the
+    # outer joins so an owned course with no assignments still yields one row
+    stmt = db.select(Course.id, *GRADEBOOK_ASSIGNMENT_COLUMNS, *GRADEBOOK_GRADE_COLUMNS).outerjoin(
+        Assignment, Assignment.course_id == Course.id
+    ).outerjoin(Grade, Grade.assignment_id == Assignment.id).where(
+        Course.id == course_id,
+        Course.user_id == user_id
+    ).order_by(Assignment.id)
+    return db.session.execute(stmt.execution_options(yield_per=GRADEBOOK_CHUNK_ROWS))
+
+def _gradebook_json(course_id, first, rows):
+    encode = json.JSONEncoder(default=_json_default, separators=(',', ':')).encode
+    assignment_keys = ('id', 'brightspace_assignment_id', 'name', 'category', 'max_points', 'due_date')
+    grade_keys = ('id', 'points_earned', 'percentage', 'letter_grade', 'graded_date', 'feedback')
+    width = len(assignment_keys)
+
+    yield f'{{"course_id":{course_id},"assignments":['
+    if first[1] is not None:
+        separator = ''
+        chunk = []
+        for row in chain((first,), rows):
+            assignment = dict(zip(assignment_keys, row[1:1 + width]))
+            grade = row[1 + width:]
+            assignment['grade'] = dict(zip(grade_keys, grade)) if grade[0] is not None else None
+            chunk.append(encode(assignment))
+            if len(chunk) >= GRADEBOOK_CHUNK_ROWS:
+                yield separator + ','.join(chunk)
+                separator = ','
+                chunk = []
+        if chunk:
+            yield separator + ','.join(chunk)
+    yield ']}'
+
 @grades_bp.route('/assignment/<int:assignment_id>', methods=['POST'])
 @jwt_required()
 def add_or_update_grade(assignment_id):
@@ -45,3 +98,45 @@ def delete_grade(assignment_id):
     db.session.commit()
 
     return jsonify({'message': 'Grade deleted successfully'}), 200
+
+@grades_bp.route('/course/<int:course_id>', methods=['GET'])
+@jwt_required()
+def get_course_grades(course_id):
+    user_id = int(get_jwt_identity())
+    rows = _gradebook_rows(course_id, user_id)
+    first = next(rows, None)
+
+    if first is None:
+        return jsonify({'error': 'Course not found'}), 404
+
+    return Response(stream_with_context(_gradebook_json(course_id, first, rows)), mimetype='application/json')
+
+@grades_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_upsert_grades():
+    user_id = int(get_jwt_identity())
+
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            rows = parse_csv_rows(upload.read().decode('utf-8-sig'))
+        elif request.mimetype == 'text/csv':
+            rows = parse_csv_rows(request.get_data(as_text=True))
+        else:
+            data = request.get_json(silent=True)
+            rows = data.get('grades') if isinstance(data, dict) else data
+        result = BulkGradeService().upsert(user_id, rows)
+    except BulkGradeError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+    except UnicodeDecodeError:
+        return jsonify({'error': 'CSV must be UTF-8 encoded'}), 400
+
+    db.session.commit()
+
+    snapshots = CourseGradeSnapshot.query.filter(CourseGradeSnapshot.course_id.in_(result['course_ids'])).all()
+    return jsonify({
+        'message': f"Saved {result['upserted']} grades",
+        'upserted': result['upserted'],
+        'course_grades': {str(s.course_id): s.to_dict() for s in snapshots}
+    }), 200
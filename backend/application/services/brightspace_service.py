@@ -1,9 +1,181 @@
+import math
 import os
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import random
+from requests.adapters import HTTPAdapter
 from flask import current_app
 import logging
+from application.utils.retry_after import retry_after_seconds
+
+TOKEN_EXPIRY_MARGIN = 60
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class BrightspaceAPIError(Exception):
+    def __init__(self, message, status_code=None, retryable=True):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+class RateLimiter:
+    # Token bucket shared by every outbound D2L call in the process. A throttle
+    # response pauses the whole bucket, not just the request that received it
+    def __init__(self, rate, burst, max_pause=None):
+        self.rate = rate
+        self.burst = burst
+        # Caps any server-requested pause; the bucket is shared by every thread
+        self.max_pause = max_pause
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    wait = self._paused_until - now
+                    if wait <= 0:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        wait = (1 - self._tokens) / self.rate
+                time.sleep(wait)
+        finally:
+            waited = time.monotonic() - start
+            with self._lock:
+                self.queue_depth -= 1
+                self.requests += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return waited
+
+    def pause(self, seconds):
+        if self.max_pause is not None:
+            seconds = min(seconds, self.max_pause)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def observe(self, response):
+        # D2L reports its remaining budget; stop before the server starts refusing
+        remaining = response.headers.get('X-Rate-Limit-Remaining')
+        reset = response.headers.get('X-Rate-Limit-Reset')
+        if remaining is not None and reset is not None:
+            try:
+                remaining, reset = float(remaining), float(reset)
+            except ValueError:
+                # A malformed budget header is ignored rather than failing the request
+                remaining = reset = None
+            if remaining is not None and math.isfinite(reset) and remaining <= 0:
+                self.pause(max(reset, 0.0))
+        if response.status_code == 429:
+            with self._lock:
+                self.throttled += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'retries': self.retries,
+                'wait_seconds_total': round(self.wait_seconds_total, 3),
+                'wait_seconds_max': round(self.wait_seconds_max, 3),
+                'wait_seconds_avg': round(self.wait_seconds_total / self.requests, 3) if self.requests else 0.0
+            }
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                rate=float(os.getenv('BRIGHTSPACE_RATE_LIMIT', '10')),
+                burst=int(os.getenv('BRIGHTSPACE_RATE_BURST', '20')),
+                max_pause=float(os.getenv('BRIGHTSPACE_MAX_RETRY_AFTER', '30'))
+            )
+        return _rate_limiter
+
+def _retry_after_seconds(response):
+    return retry_after_seconds(response.headers.get('Retry-After'))
+
+class BrightspaceTokenCache:
+    # Auth tokens keyed by (base_url, app, user), reused until shortly before they expire
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, fetch):
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached and cached[1] - TOKEN_EXPIRY_MARGIN > time.monotonic():
+                self.hits += 1
+                return cached[0]
+
+            self.misses += 1
+            token, expires_in = fetch()
+            if token:
+                self._tokens[key] = (token, time.monotonic() + expires_in)
+            return token
+
+    def invalidate(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'tokens': len(self._tokens)}
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self.hits = 0
+            self.misses = 0
+
+BRIGHTSPACE_TOKEN_CACHE = BrightspaceTokenCache()
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    # Keep-alive pool sized for the per-course fetch fan-out
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = int(os.getenv('BRIGHTSPACE_POOL_SIZE', '20'))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
 
 class BrightspaceService:
     def __init__(self):
@@ -12,6 +184,13 @@ class BrightspaceService:
         self.app_key = os.getenv('BRIGHTSPACE_APP_KEY', '')
         self.user_id = os.getenv('BRIGHTSPACE_USER_ID', '')
         self.user_key = os.getenv('BRIGHTSPACE_USER_KEY', '')
+        self.max_concurrency = int(os.getenv('BRIGHTSPACE_MAX_CONCURRENCY', '8'))
+        self.max_retries = int(os.getenv('BRIGHTSPACE_MAX_RETRIES', '3'))
+        self.retry_backoff = float(os.getenv('BRIGHTSPACE_RETRY_BACKOFF', '1.0'))
+        self.request_timeout = float(os.getenv('BRIGHTSPACE_REQUEST_TIMEOUT', '30'))
+        self.max_retry_after = float(os.getenv('BRIGHTSPACE_MAX_RETRY_AFTER', '30'))
+        # Only for local development; production surfaces BrightspaceAPIError instead
+        self.synthetic_fallback = os.getenv('BRIGHTSPACE_SYNTHETIC_FALLBACK', 'false').lower() == 'true'
 
         force_synthetic = os.getenv('USE_SYNTHETIC_DATA', 'true').lower() == 'true'
         self.use_synthetic = force_synthetic or not all([self.base_url, self.app_id, self.app_key])
@@ -33,10 +212,124 @@ class BrightspaceService:
             'Authorization': f'Bearer {self._get_access_token()}'
         }
 
+    def _token_cache_key(self):
+        return (self.base_url, self.app_id, self.user_id)
+
     def _get_access_token(self):
         if self.use_synthetic:
             return 'synthetic_token'
 
+        return BRIGHTSPACE_TOKEN_CACHE.get(self._token_cache_key(), self._fetch_access_token)
+
+    @staticmethod
+    def cache_stats():
+        return BRIGHTSPACE_TOKEN_CACHE.stats()
+
+    @staticmethod
+    def rate_limit_stats():
+        return get_rate_limiter().stats()
+
+    def _retry_delay(self, attempt):
+        delay = self.retry_backoff * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
+    def _pause_for_retry_after(self, limiter, response, url):
+        # Returns whether the response's Retry-After paused the shared bucket
+        retry_after = _retry_after_seconds(response)
+        if retry_after is None:
+            return False
+        if retry_after > self.max_retry_after:
+            # Pausing the shared bucket that long would stall every D2L call
+            # in the process; fail this request and let the caller back off
+            raise BrightspaceAPIError(
+                f'Brightspace asked to retry {url} after {retry_after:.0f}s '
+                f'(max {self.max_retry_after:.0f}s)',
+                status_code=response.status_code
+            )
+        limiter.pause(retry_after)
+        return True
+
+    def _request(self, url, params=None, etag=None):
+        # Every call waits its turn on the shared token bucket. Throttling and
+        # server errors are retried a bounded number of times with jitter
+        limiter = get_rate_limiter()
+        for attempt in range(self.max_retries + 1):
+            headers = self._get_headers()
+            if etag:
+                headers['If-None-Match'] = etag
+
+            limiter.acquire()
+            delay = self._retry_delay(attempt)
+            try:
+                response = get_http_session().get(url, headers=headers, params=params, timeout=self.request_timeout)
+            except requests.RequestException as e:
+                error = BrightspaceAPIError(f'Brightspace request to {url} failed: {e}')
+            else:
+                limiter.observe(response)
+                if response.status_code < 400:
+                    return response
+
+                error = BrightspaceAPIError(
+                    f'Brightspace returned {response.status_code} for {url}',
+                    status_code=response.status_code,
+                    retryable=response.status_code in RETRYABLE_STATUSES
+                )
+                if response.status_code == 401 and attempt == 0:
+                    # The cached token may have been revoked; retry once with a fresh one
+                    BRIGHTSPACE_TOKEN_CACHE.invalidate(self._token_cache_key())
+                    delay = 0
+                elif not error.retryable:
+                    raise error
+                elif self._pause_for_retry_after(limiter, response, url):
+                    delay = 0
+
+            if attempt == self.max_retries:
+                raise error
+            limiter.record_retry()
+            current_app.logger.warning(f"{error}; retry {attempt + 1}/{self.max_retries}")
+            time.sleep(delay)
+
+    def _get(self, url, params=None):
+        return self._request(url, params).json()
+
+    def _paged(self, url, watermark=None):
+        # Yields items one page at a time, following PagedResultSet bookmarks
+        # and ObjectListPage Next links; plain JSON arrays are a single page.
+        # With a watermark dict, its 'etag' is sent as If-None-Match; on return it
+        # holds 'not_modified' and the new 'etag' (only kept for single-page lists,
+        # since a first-page ETag says nothing about later pages)
+        watermark = watermark if watermark is not None else {}
+        etag = watermark.get('etag')
+        watermark['not_modified'] = False
+        params = None
+        pages = 0
+        while url:
+            response = self._request(url, params, etag if pages == 0 else None)
+            if response.status_code == 304:
+                watermark['not_modified'] = True
+                return
+            if pages == 0:
+                first_page_etag = response.headers.get('ETag')
+            pages += 1
+
+            payload = response.json()
+            if isinstance(payload, list):
+                yield from payload
+                url = None
+            elif 'Items' in payload:
+                yield from payload['Items']
+                paging = payload.get('PagingInfo') or {}
+                if paging.get('HasMoreItems') and paging.get('Bookmark'):
+                    params = {'bookmark': paging['Bookmark']}
+                else:
+                    url = None
+            else:
+                yield from payload.get('Objects', [])
+                url, params = payload.get('Next'), None
+
+        watermark['etag'] = first_page_etag if pages == 1 else None
+
+    def _fetch_access_token(self):
         token_url = f'{self.base_url}/d2l/api/lp/auth'
         params = {
             'x_a': self.app_id,
@@ -46,92 +339,107 @@ class BrightspaceService:
         }
 
         try:
-            response = requests.get(token_url, params=params)
+            get_rate_limiter().acquire()
+            response = get_http_session().get(token_url, params=params, timeout=self.request_timeout)
             response.raise_for_status()
-            return response.json().get('access_token', '')
+            payload = response.json()
+            return payload.get('access_token', ''), int(payload.get('expires_in', 3600))
         except Exception as e:
             current_app.logger.error(f"Brightspace auth error: {e}")
-            return ''
+            return '', 0
 
-    def get_courses(self, user_id):
+    def iter_courses(self, user_id):
         if self.use_synthetic:
-            return self._generate_synthetic_courses()
+            yield from self._generate_synthetic_courses()
+            return
 
-        try:
-            url = f'{self.base_url}/d2l/api/lp/1.0/enrollments/myenrollments/'
-            response = requests.get(url, headers=self._get_headers())
-            response.raise_for_status()
+        for enrollment in self._paged(f'{self.base_url}/d2l/api/lp/1.0/enrollments/myenrollments/'):
+            org = enrollment.get('OrgUnit', {})
+            yield {
+                'brightspace_course_id': str(org.get('Id')),
+                'course_code': org.get('Code', ''),
+                'course_name': org.get('Name', ''),
+                'semester': self._extract_semester(org.get('Name', '')),
+                'year': datetime.now().year
+            }
 
-            enrollments = response.json().get('Items', [])
-            courses = []
+    def iter_assignments(self, course_id, watermark=None):
+        if self.use_synthetic:
+            yield from self._generate_synthetic_assignments(course_id)
+            return
 
-            for enrollment in enrollments:
-                org = enrollment.get('OrgUnit', {})
-                courses.append({
-                    'brightspace_course_id': str(org.get('Id')),
-                    'course_code': org.get('Code', ''),
-                    'course_name': org.get('Name', ''),
-                    'semester': self._extract_semester(org.get('Name', '')),
-                    'year': datetime.now().year
-                })
+        for activity in self._paged(f'{self.base_url}/d2l/api/le/1.0/{course_id}/activities/', watermark):
+            if activity.get('ActivityType') in ['Assignment', 'Quiz']:
+                yield {
+                    'brightspace_assignment_id': str(activity.get('Id')),
+                    'name': activity.get('Name', ''),
+                    'category': activity.get('ActivityType', 'Assignment'),
+                    'max_points': float(activity.get('MaxPoints', 100)),
+                    'due_date': self._parse_date(activity.get('DueDate')),
+                    'description': activity.get('Description', {}).get('Text', '')
+                }
 
-            return courses
-        except Exception as e:
+    def iter_grades(self, course_id, user_id, watermark=None):
+        # Yields (brightspace_assignment_id, grade) pairs
+        if self.use_synthetic:
+            yield from self._generate_synthetic_grades().items()
+            return
+
+        for grade in self._paged(f'{self.base_url}/d2l/api/le/1.0/{course_id}/grades/values/{user_id}/', watermark):
+            yield str(grade.get('GradeObjectIdentifier')), {
+                'points_earned': float(grade.get('PointsNumerator', 0)),
+                'graded_date': self._parse_date(grade.get('GradedDate')),
+                'feedback': grade.get('Comments', {}).get('Text', '')
+            }
+
+    def get_courses(self, user_id):
+        try:
+            return list(self.iter_courses(user_id))
+        except BrightspaceAPIError as e:
             current_app.logger.error(f"Brightspace get_courses error: {e}")
+            if not self.synthetic_fallback:
+                raise
             return self._generate_synthetic_courses()
 
     def get_assignments(self, course_id):
-        if self.use_synthetic:
-            return self._generate_synthetic_assignments(course_id)
-
         try:
-            url = f'{self.base_url}/d2l/api/le/1.0/{course_id}/activities/'
-            response = requests.get(url, headers=self._get_headers())
-            response.raise_for_status()
-
-            activities = response.json()
-            assignments = []
-
-            for activity in activities:
-                if activity.get('ActivityType') in ['Assignment', 'Quiz']:
-                    assignments.append({
-                        'brightspace_assignment_id': str(activity.get('Id')),
-                        'name': activity.get('Name', ''),
-                        'category': activity.get('ActivityType', 'Assignment'),
-                        'max_points': float(activity.get('MaxPoints', 100)),
-                        'due_date': self._parse_date(activity.get('DueDate')),
-                        'description': activity.get('Description', {}).get('Text', '')
-                    })
-
-            return assignments
-        except Exception as e:
+            return list(self.iter_assignments(course_id))
+        except BrightspaceAPIError as e:
             current_app.logger.error(f"Brightspace get_assignments error: {e}")
+            if not self.synthetic_fallback:
+                raise
             return self._generate_synthetic_assignments(course_id)
 
     def get_grades(self, course_id, user_id):
-        if self.use_synthetic:
-            return self._generate_synthetic_grades()
-
         try:
-            url = f'{self.base_url}/d2l/api/le/1.0/{course_id}/grades/values/{user_id}/'
-            response = requests.get(url, headers=self._get_headers())
-            response.raise_for_status()
+            return dict(self.iter_grades(course_id, user_id))
+        except BrightspaceAPIError as e:
+            current_app.logger.error(f"Brightspace get_grades error: {e}")
+            if not self.synthetic_fallback:
+                raise
+            return self._generate_synthetic_grades()
 
-            grade_values = response.json()
-            grades = {}
+    def fetch_course_data(self, course_ids, user_id):
+        # Assignments and grades for every course fetched concurrently, at most
+        # max_concurrency requests in flight; returns {course_id: (assignments, grades)}
+        app = current_app._get_current_object()
 
-            for grade in grade_values:
-                assignment_id = str(grade.get('GradeObjectIdentifier'))
-                grades[assignment_id] = {
-                    'points_earned': float(grade.get('PointsNumerator', 0)),
-                    'graded_date': self._parse_date(grade.get('GradedDate')),
-                    'feedback': grade.get('Comments', {}).get('Text', '')
-                }
+        def run(fetch, *args):
+            with app.app_context():
+                return fetch(*args)
 
-            return grades
-        except Exception as e:
-            current_app.logger.error(f"Brightspace get_grades error: {e}")
-            return self._generate_synthetic_grades()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as pool:
+            futures = {
+                course_id: (
+                    pool.submit(run, self.get_assignments, course_id),
+                    pool.submit(run, self.get_grades, course_id, user_id)
+                )
+                for course_id in course_ids
+            }
+            return {
+                course_id: (assignments.result(), grades.result())
+                for course_id, (assignments, grades) in futures.items()
+            }
 
     def _extract_semester(self, course_name):
         if 'Spring' in course_name or 'Sp' in course_name:
@@ -0,0 +1,124 @@
+import csv
+import io
+import math
+from datetime import datetime
+from flask import current_app
+from application import db
+from application.models.assignment import Assignment
+from application.models.course import Course
+from application.models.course_grade_snapshot import CourseGradeSnapshot
+from application.models.grade import Grade
+from application.services.course_sync_service import _naive_utc
+from application.utils.bulk_ops import iter_chunks, upsert_rows
+
+BULK_GRADE_FIELDS = ('points_earned', 'percentage', 'graded_date', 'feedback', 'updated_at')
+
+class BulkGradeError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+def parse_csv_rows(text):
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {'assignment_id', 'points_earned'} <= set(reader.fieldnames):
+        raise BulkGradeError('CSV needs assignment_id and points_earned columns')
+    return [{key: (value if value != '' else None) for key, value in row.items()} for row in reader]
+
+class BulkGradeService:
+    def __init__(self, max_rows=None, chunk_size=None):
+        self.max_rows = max_rows or current_app.config.get('GRADE_BULK_MAX_ROWS', 5000)
+        self.chunk_size = chunk_size or current_app.config.get('SYNC_CHUNK_SIZE', 500)
+
+    def _validate(self, row):
+        if not isinstance(row, dict):
+            raise ValueError('row must be an object')
+        try:
+            assignment_id = int(row['assignment_id'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('assignment_id must be an integer')
+        return assignment_id, {
+            'points_earned': self._points_earned(row),
+            'graded_date': self._graded_date(row),
+            'feedback': self._feedback(row)
+        }
+
+    @staticmethod
+    def _points_earned(row):
+        try:
+            points_earned = float(row['points_earned'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('points_earned must be a number')
+        if not math.isfinite(points_earned):
+            raise ValueError('points_earned must be a finite number')
+        if points_earned < 0:
+            raise ValueError('points_earned cannot be negative')
+        return points_earned
+
+    @staticmethod
+    def _graded_date(row):
+        graded_date = row.get('graded_date')
+        if graded_date is None:
+            return None
+        try:
+            return _naive_utc(datetime.fromisoformat(str(graded_date).replace('Z', '+00:00')))
+        except ValueError:
+            raise ValueError('graded_date must be an ISO 8601 timestamp')
+
+    @staticmethod
+    def _feedback(row):
+        feedback = row.get('feedback')
+        return str(feedback) if feedback is not None else None
+
+    def upsert(self, user_id, rows):
+        if not isinstance(rows, list) or not rows:
+            raise BulkGradeError('Expected a non-empty list of grades')
+        if len(rows) > self.max_rows:
+            raise BulkGradeError(f'At most {self.max_rows} grades per request')
+
+        errors = []
+        incoming = {}
+        for index, row in enumerate(rows):
+            try:
+                assignment_id, values = self._validate(row)
+            except ValueError as e:
+                errors.append({'row': index, 'error': str(e)})
+                continue
+            # Later rows for the same assignment win, as they would if sent one by one
+            incoming[assignment_id] = (index, values)
+
+        # Ownership and max_points for every referenced assignment in one joined query
+        owned = {}
+        if incoming:
+            owned = {row.id: row for row in db.session.query(
+                Assignment.id, Assignment.course_id, Assignment.max_points
+            ).join(Course, Course.id == Assignment.course_id).filter(
+                Assignment.id.in_(incoming.keys()),
+                Course.user_id == user_id
+            )}
+
+        errors.extend(
+            {'row': index, 'error': f'Assignment {assignment_id} not found'}
+            for assignment_id, (index, _) in incoming.items() if assignment_id not in owned
+        )
+        if errors:
+            raise BulkGradeError('Invalid grades', sorted(errors, key=lambda error: error['row']))
+
+        now = datetime.utcnow()
+        grade_rows = []
+        for assignment_id, (_, values) in incoming.items():
+            max_points = owned[assignment_id].max_points
+            grade_rows.append(dict(
+                values,
+                assignment_id=assignment_id,
+                percentage=(values['points_earned'] / max_points) * 100 if max_points else None,
+                updated_at=now
+            ))
+
+        for chunk in iter_chunks(grade_rows, self.chunk_size):
+            upsert_rows(Grade, chunk, ['assignment_id'], BULK_GRADE_FIELDS)
+
+        # Upserts bypass the unit of work; snapshots refresh once per course at commit
+        course_ids = sorted({row.course_id for row in owned.values()})
+        CourseGradeSnapshot.mark_stale(course_ids)
+
+        return {'upserted': len(grade_rows), 'course_ids': course_ids}
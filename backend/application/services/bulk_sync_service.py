@@ -0,0 +1,77 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from application import db
+from application.models.course import Course
+from application.models.course_sync_state import CourseSyncState
+from application.services.brightspace_service import BrightspaceAPIError, BrightspaceService
+from application.services.course_sync_service import CourseSyncService
+
+class BulkSyncService:
+    def __init__(self, brightspace=None, max_concurrency=None):
+        self.brightspace = brightspace or BrightspaceService()
+        self.max_concurrency = max_concurrency or self.brightspace.max_concurrency
+
+    def iter_sync(self, user_id):
+        # Yields one progress event per course, then a summary. Remote fetches
+        # run in parallel; each course's writes are committed (or rolled back)
+        # on their own before its event is yielded, so one failing course does
+        # not undo the others and a course reported as synced stays synced even
+        # if the stream is cut off afterwards
+        start = time.perf_counter()
+        courses = Course.query.filter_by(user_id=user_id).order_by(Course.id).all()
+        watermarks = {
+            state.course_id: state.to_watermarks()
+            for state in CourseSyncState.query.filter(CourseSyncState.course_id.in_([c.id for c in courses]))
+        }
+        app = current_app._get_current_object()
+
+        def fetch(course):
+            with app.app_context():
+                return CourseSyncService(self.brightspace).prefetch(
+                    course.brightspace_course_id or course.id, user_id, watermarks.get(course.id)
+                )
+
+        summary = {'type': 'summary', 'courses': len(courses), 'synced': 0, 'failed': 0, 'updated': 0, 'skipped': 0}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as pool:
+            # Bound fetched-but-unwritten courses so memory stays flat for large enrollments
+            pending = deque()
+            remaining = iter(courses)
+            for done in range(1, len(courses) + 1):
+                while len(pending) < self.max_concurrency * 2:
+                    course = next(remaining, None)
+                    if course is None:
+                        break
+                    pending.append((course, pool.submit(fetch, course)))
+
+                course, future = pending.popleft()
+                event = self._apply(course, user_id, future)
+                summary['synced' if event['status'] == 'synced' else 'failed'] += 1
+                if event['status'] == 'synced':
+                    summary['updated'] += event['sync_stats']['updated']
+                    summary['skipped'] += event['sync_stats']['skipped']
+                event['progress'] = {'done': done, 'total': len(courses)}
+                yield event
+
+        summary['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        yield summary
+
+    def _apply(self, course, user_id, future):
+        event = {'type': 'course', 'course_id': course.id, 'course_code': course.course_code}
+        try:
+            stats = CourseSyncService(self.brightspace).sync(course, user_id, future.result())
+            db.session.commit()
+        except BrightspaceAPIError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Brightspace sync error for course {course.id}: {e}")
+            event.update(status='failed', error=str(e), upstream_status=e.status_code)
+        except Exception as e:
+            # Anything else (a bad payload, a constraint violation) fails this course
+            # only; the stream still reaches its summary
+            db.session.rollback()
+            current_app.logger.error(f"Sync error for course {course.id}: {e}")
+            event.update(status='failed', error=str(e))
+        else:
+            event.update(status='synced', sync_stats=stats)
+        return event
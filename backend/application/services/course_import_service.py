@@ -0,0 +1,91 @@
+from application import db
+from application.models.course import Course
+from application.models.assignment import Assignment
+from application.models.grade import Grade
+from application.models.syllabus_weight import SyllabusWeight
+from application.services.brightspace_service import BrightspaceService
+
+DEFAULT_SYLLABUS_WEIGHTS = [
+    {'category': 'Homework', 'weight': 30.0, 'description': 'Weekly homework assignments'},
+    {'category': 'Quiz', 'weight': 20.0, 'description': 'In-class quizzes'},
+    {'category': 'Exam', 'weight': 40.0, 'description': 'Midterm and final exams'},
+    {'category': 'Project', 'weight': 10.0, 'description': 'Course project'}
+]
+
+class CourseImportService:
+    def __init__(self, brightspace=None):
+        self.brightspace = brightspace or BrightspaceService()
+
+    def import_courses(self, user_id, skip_existing=False):
+        # Builds the full course graph in memory so the unit of work can
+        # write each table with a single batched INSERT on one flush
+        courses_data = self.brightspace.get_courses(user_id)
+
+        existing_ids = set()
+        if skip_existing:
+            existing_ids = {
+                row.brightspace_course_id for row in db.session.query(Course.brightspace_course_id).filter(
+                    Course.user_id == user_id
+                )
+            }
+
+        courses_data = [data for data in courses_data if data['brightspace_course_id'] not in existing_ids]
+        remote_data = self.brightspace.fetch_course_data(
+            [data['brightspace_course_id'] for data in courses_data], user_id
+        )
+
+        courses = []
+        for course_data in courses_data:
+            assignments_data, grades_data = remote_data[course_data['brightspace_course_id']]
+            courses.append(self._build_course(user_id, course_data, assignments_data, grades_data))
+
+        db.session.add_all(courses)
+        db.session.flush()
+        return courses
+
+    def _build_course(self, user_id, course_data, assignments_data, grades_data):
+        remote_course_id = course_data['brightspace_course_id']
+        course = Course(
+            user_id=user_id,
+            brightspace_course_id=remote_course_id,
+            course_code=course_data['course_code'],
+            course_name=course_data['course_name'],
+            semester=course_data.get('semester'),
+            year=course_data.get('year'),
+            target_grade=85.0
+        )
+
+        assignments = {}
+        for assignment_data in assignments_data:
+            assignment = Assignment(
+                brightspace_assignment_id=assignment_data['brightspace_assignment_id'],
+                name=assignment_data['name'],
+                category=assignment_data['category'],
+                max_points=assignment_data['max_points'],
+                due_date=assignment_data.get('due_date'),
+                description=assignment_data.get('description')
+            )
+            course.assignments.append(assignment)
+            assignments[assignment.brightspace_assignment_id] = assignment
+
+        for remote_assignment_id, grade_data in grades_data.items():
+            assignment = assignments.get(remote_assignment_id)
+            if assignment:
+                points_earned = grade_data['points_earned']
+                assignment.grade = Grade(
+                    points_earned=points_earned,
+                    # Zero-point (ungraded or bonus) activities have no meaningful percentage
+                    percentage=(points_earned / assignment.max_points) * 100
+                    if points_earned is not None and assignment.max_points else None,
+                    graded_date=grade_data.get('graded_date'),
+                    feedback=grade_data.get('feedback')
+                )
+
+        for weight_data in DEFAULT_SYLLABUS_WEIGHTS:
+            course.syllabus_weights.append(SyllabusWeight(
+                category=weight_data['category'],
+                weight=weight_data['weight'],
+                description=weight_data['description']
+            ))
+
+        return course
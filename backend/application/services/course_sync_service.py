@@ -0,0 +1,259 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import current_app
+from application import db
+from application.models.assignment import Assignment
+from application.models.grade import Grade
+from application.models.course_grade_snapshot import CourseGradeSnapshot
+from application.models.course_sync_state import CourseSyncState
+from application.services.brightspace_service import BrightspaceService
+from application.utils.bulk_ops import bulk_insert_returning, bulk_update, iter_chunks, upsert_rows
+
+ASSIGNMENT_SYNC_FIELDS = ('name', 'category', 'max_points', 'due_date', 'description')
+GRADE_COMPARE_FIELDS = ('points_earned', 'percentage', 'graded_date', 'feedback')
+GRADE_SYNC_FIELDS = GRADE_COMPARE_FIELDS + ('updated_at',)
+
+def _naive_utc(value):
+    # Brightspace dates arrive timezone-aware; the columns store naive UTC
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class CourseSyncService:
+    def __init__(self, brightspace=None, chunk_size=None):
+        self.brightspace = brightspace or BrightspaceService()
+        self.chunk_size = chunk_size or current_app.config.get('SYNC_CHUNK_SIZE', 500)
+        self.timings = {}
+        self.counts = {
+            'assignments_received': 0,
+            'assignments_inserted': 0,
+            'assignments_updated': 0,
+            'assignments_unchanged': 0,
+            'grades_received': 0,
+            'grades_upserted': 0,
+            'grades_unchanged': 0,
+            'grades_settled': 0,
+            'grades_unmatched': 0
+        }
+        self.not_modified = []
+
+    @contextmanager
+    def _phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = round(self.timings.get(name, 0) + elapsed, 2)
+
+    def _fetch_chunks(self, name, items):
+        # Pages stream in lazily, so the fetch time is spent producing each chunk
+        chunks = iter_chunks(items, self.chunk_size)
+        while True:
+            with self._phase(name):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def stats(self):
+        counts = dict(self.counts)
+        return {
+            'timings_ms': dict(self.timings),
+            'counts': counts,
+            'updated': counts['assignments_inserted'] + counts['assignments_updated'] + counts['grades_upserted'],
+            'skipped': counts['assignments_unchanged'] + counts['grades_unchanged'],
+            'not_modified': list(self.not_modified)
+        }
+
+    def remote(self, remote_course_id, user_id, watermarks=None):
+        # Lazy page iterators plus the watermark dicts they update as they run
+        watermarks = watermarks or {}
+        assignments_mark = {'etag': watermarks.get('assignments_etag')}
+        grades_mark = {'etag': watermarks.get('grades_etag')}
+        return {
+            'assignments': self.brightspace.iter_assignments(remote_course_id, assignments_mark),
+            'grades': self.brightspace.iter_grades(remote_course_id, user_id, grades_mark),
+            'assignments_mark': assignments_mark,
+            'grades_mark': grades_mark
+        }
+
+    def prefetch(self, remote_course_id, user_id, watermarks=None):
+        # Network only, no session use, so it is safe to run on a worker thread
+        remote = self.remote(remote_course_id, user_id, watermarks)
+        remote['assignments'] = list(remote['assignments'])
+        remote['grades'] = list(remote['grades'])
+        return remote
+
+    def sync(self, course, user_id, remote=None):
+        # Assignments and grades are written chunk by chunk as pages arrive,
+        # so memory stays flat however large the gradebook is. Only rows that
+        # differ from the stored values are written, and resources whose ETag
+        # still matches the course's watermark are not fetched at all.
+        # remote is the result of prefetch() when the fetch already happened
+        remote_course_id = course.brightspace_course_id or course.id
+        changed = False
+
+        with self._phase('load_watermarks'):
+            state = CourseSyncState.query.filter_by(course_id=course.id).first()
+        if remote is None:
+            remote = self.remote(remote_course_id, user_id, state.to_watermarks() if state else None)
+        assignments_mark = remote['assignments_mark']
+        grades_mark = remote['grades_mark']
+        watermark_date = last_graded_date = state.last_graded_date if state else None
+
+        assignments = remote['assignments']
+        for assignments_data in self._fetch_chunks('fetch_assignments', assignments):
+            self.counts['assignments_received'] += len(assignments_data)
+
+            with self._phase('load_existing'):
+                existing = self._load_existing_assignments(
+                    course.id, [data.get('brightspace_assignment_id') for data in assignments_data]
+                )
+
+            with self._phase('diff_assignments'):
+                inserts, updates = self._diff_assignments(course.id, assignments_data, existing)
+
+            with self._phase('write_assignments'):
+                bulk_insert_returning(Assignment, inserts, Assignment.id)
+                bulk_update(Assignment, updates)
+            self.counts['assignments_inserted'] += len(inserts)
+            self.counts['assignments_updated'] += len(updates)
+            self.counts['assignments_unchanged'] += len(assignments_data) - len(inserts) - len(updates)
+            changed = changed or bool(inserts or updates)
+
+        grades = remote['grades']
+        for grades_data in self._fetch_chunks('fetch_grades', grades):
+            grades_data = dict(grades_data)
+            self.counts['grades_received'] += len(grades_data)
+
+            # Without an ETag to say whether anything changed, the graded-date
+            # watermark does: Brightspace restamps GradedDate on every (re)grade,
+            # so a grade dated at or before it was stored by an earlier sync and
+            # only needs loading if its row has since gone missing. Synthetic
+            # grades are re-rolled with random dates, so they are always compared
+            settled = set()
+            if watermark_date and not grades_mark.get('etag') and not self.brightspace.use_synthetic:
+                settled = {
+                    remote_id for remote_id, grade_data in grades_data.items()
+                    if grade_data.get('graded_date') and _naive_utc(grade_data['graded_date']) <= watermark_date
+                }
+
+            with self._phase('load_existing'):
+                existing = self._load_existing_grades(course.id, list(grades_data), settled)
+            skipped = settled - set(existing)
+            grades_data = {remote_id: data for remote_id, data in grades_data.items() if remote_id not in skipped}
+
+            with self._phase('write_grades'):
+                grade_rows, unchanged = self._diff_grades(grades_data, existing)
+                upsert_rows(Grade, grade_rows, ['assignment_id'], GRADE_SYNC_FIELDS)
+            self.counts['grades_upserted'] += len(grade_rows)
+            self.counts['grades_unchanged'] += unchanged + len(skipped)
+            self.counts['grades_settled'] += len(skipped)
+            self.counts['grades_unmatched'] += len(grades_data) - len(grade_rows) - unchanged
+            changed = changed or bool(grade_rows)
+
+            graded_dates = [row['graded_date'] for row in grade_rows if row['graded_date']]
+            if graded_dates:
+                last_graded_date = max([last_graded_date or graded_dates[0]] + graded_dates)
+
+        if assignments_mark.get('not_modified'):
+            self.not_modified.append('assignments')
+        if grades_mark.get('not_modified'):
+            self.not_modified.append('grades')
+
+        watermarks = {
+            'assignments_etag': assignments_mark.get('etag'),
+            'grades_etag': grades_mark.get('etag'),
+            'last_graded_date': last_graded_date
+        }
+        if changed or (state.to_watermarks() if state else {}) != watermarks:
+            with self._phase('write_watermarks'):
+                self._save_watermarks(course.id, state, watermarks)
+
+        if changed:
+            CourseGradeSnapshot.mark_stale([course.id])
+
+        return self.stats()
+
+    def _save_watermarks(self, course_id, state, watermarks):
+        if state is None:
+            state = CourseSyncState(course_id=course_id)
+            db.session.add(state)
+        for field, value in watermarks.items():
+            setattr(state, field, value)
+        state.synced_at = datetime.utcnow()
+
+    def _load_existing_assignments(self, course_id, remote_ids):
+        columns = [getattr(Assignment, field) for field in ASSIGNMENT_SYNC_FIELDS]
+        rows = db.session.query(Assignment.id, Assignment.brightspace_assignment_id, *columns).filter(
+            Assignment.course_id == course_id,
+            Assignment.brightspace_assignment_id.in_(set(remote_ids))
+        ).all()
+        return {row.brightspace_assignment_id: row._asdict() for row in rows}
+
+    def _load_existing_grades(self, course_id, remote_ids, settled=()):
+        # Settled ids come back only when their assignment has no grade row yet
+        columns = [getattr(Grade, field) for field in GRADE_COMPARE_FIELDS]
+        query = db.session.query(
+            Assignment.id, Assignment.brightspace_assignment_id, Assignment.max_points, Grade.id.label('grade_id'), *columns
+        ).outerjoin(Grade, Grade.assignment_id == Assignment.id).filter(
+            Assignment.course_id == course_id,
+            Assignment.brightspace_assignment_id.in_(set(remote_ids))
+        )
+        if settled:
+            query = query.filter(db.or_(
+                Assignment.brightspace_assignment_id.not_in(set(settled)),
+                Grade.id.is_(None)
+            ))
+        rows = query.all()
+        return {row.brightspace_assignment_id: row._asdict() for row in rows}
+
+    def _diff_assignments(self, course_id, assignments_data, existing):
+        inserts = []
+        updates = []
+        pending = set()
+        for assignment_data in assignments_data:
+            remote_id = assignment_data.get('brightspace_assignment_id')
+            if remote_id in pending:
+                continue
+            incoming = {
+                'name': assignment_data['name'],
+                'category': assignment_data.get('category', 'Homework'),
+                'max_points': assignment_data['max_points'],
+                'due_date': _naive_utc(assignment_data.get('due_date')),
+                'description': assignment_data.get('description')
+            }
+            current = existing.get(remote_id)
+            if current is None:
+                inserts.append(dict(incoming, course_id=course_id, brightspace_assignment_id=remote_id))
+                pending.add(remote_id)
+                continue
+            if any(current[field] != incoming[field] for field in ASSIGNMENT_SYNC_FIELDS):
+                updates.append(dict(incoming, id=current['id']))
+                current.update(incoming)
+        return inserts, updates
+
+    def _diff_grades(self, grades_data, existing):
+        now = datetime.utcnow()
+        rows = []
+        unchanged = 0
+        for remote_id, grade_data in grades_data.items():
+            current = existing.get(remote_id)
+            if not current:
+                continue
+            points_earned = grade_data.get('points_earned')
+            max_points = current['max_points']
+            incoming = {
+                'points_earned': points_earned,
+                # Zero-point (ungraded or bonus) activities have no meaningful percentage
+                'percentage': (points_earned / max_points) * 100 if points_earned is not None and max_points else None,
+                'graded_date': _naive_utc(grade_data.get('graded_date')),
+                'feedback': grade_data.get('feedback')
+            }
+            if current['grade_id'] is not None and all(current[field] == incoming[field] for field in GRADE_COMPARE_FIELDS):
+                unchanged += 1
+                continue
+            rows.append(dict(incoming, assignment_id=current['id'], updated_at=now))
+        return rows, unchanged
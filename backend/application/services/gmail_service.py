@@ -1,19 +1,98 @@
 import os
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import httplib2
 from flask import current_app
+from application.utils.email_templates import GMAIL_GRADE_ALERT, render_grade_alert
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+GMAIL_BATCH_LIMIT = 100
+
+class GmailClientCache:
+    # Process-wide cache of built Gmail API clients and their credentials,
+    # keyed by OAuth client and refresh token
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.token_refreshes = 0
+
+    def get(self, key, credentials_factory, api_endpoint=None):
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                self.misses += 1
+                credentials = credentials_factory()
+                self._refresh_if_needed(credentials)
+                options = {'client_options': {'api_endpoint': api_endpoint}} if api_endpoint else {}
+                entry = {
+                    'credentials': credentials,
+                    'service': build('gmail', 'v1', credentials=credentials, cache_discovery=False, **options)
+                }
+                self._clients[key] = entry
+            else:
+                self.hits += 1
+                self._refresh_if_needed(entry['credentials'])
+            return entry['service'], entry['credentials']
+
+    def _refresh_if_needed(self, credentials):
+        expiry = credentials.expiry
+        if credentials.token is None or expiry is None or expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN:
+            credentials.refresh(Request())
+            self.token_refreshes += 1
+
+    def http_for(self, credentials, timeout=None):
+        # httplib2 connections are not thread-safe, so each thread gets its own
+        http = getattr(self._local, 'http', None)
+        if http is None or http.credentials is not credentials or http.http.timeout != timeout:
+            http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=timeout))
+            self._local.http = http
+        return http
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'token_refreshes': self.token_refreshes,
+                'clients': len(self._clients)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+            self.token_refreshes = 0
+        self._local = threading.local()
+
+GMAIL_CLIENT_CACHE = GmailClientCache()
 
 class GmailService:
+    # NotificationDispatcher hands this provider a whole dispatch via send_batch_alerts
+    supports_batch_alerts = True
+
     def __init__(self):
         self.client_id = os.getenv('GMAIL_CLIENT_ID', '')
         self.client_secret = os.getenv('GMAIL_CLIENT_SECRET', '')
         self.refresh_token = os.getenv('GMAIL_REFRESH_TOKEN', '')
         self.redirect_uri = os.getenv('GMAIL_REDIRECT_URI', 'http://localhost:5001/api/auth/gmail/callback')
+        self.api_endpoint = os.getenv('GMAIL_API_ENDPOINT', '').rstrip('/')
+        self.batch_size = min(int(os.getenv('GMAIL_BATCH_SIZE', '50')), GMAIL_BATCH_LIMIT)
+        self.send_concurrency = int(os.getenv('GMAIL_SEND_CONCURRENCY', '8'))
+        self.request_timeout = float(os.getenv('GMAIL_REQUEST_TIMEOUT', '30'))
 
         synthetic_value = os.getenv('USE_SYNTHETIC_DATA', 'true')
         force_synthetic = synthetic_value.lower() == 'true'
@@ -31,11 +110,8 @@ class GmailService:
         except RuntimeError:
             pass
 
-    def _get_credentials(self):
-        if not self.enabled:
-            return None
-
-        creds = Credentials(
+    def _new_credentials(self):
+        return Credentials(
             None,
             refresh_token=self.refresh_token,
             token_uri='https://oauth2.googleapis.com/token',
@@ -43,50 +119,64 @@ class GmailService:
             client_secret=self.client_secret
         )
 
-        if creds.expired:
-            creds.refresh(Request())
-
-        return creds
+    def _get_client(self):
+        if not self.enabled:
+            return None, None
 
-    def _build_service(self):
         try:
-            creds = self._get_credentials()
-            if not creds:
-                return None
-            return build('gmail', 'v1', credentials=creds)
+            return GMAIL_CLIENT_CACHE.get(
+                (self.client_id, self.refresh_token, self.api_endpoint),
+                self._new_credentials,
+                api_endpoint=self.api_endpoint or None
+            )
         except Exception as e:
             current_app.logger.error(f"Gmail service build error: {e}")
-            return None
+            return None, None
+
+    def _get_credentials(self):
+        return self._get_client()[1]
+
+    def _build_service(self):
+        return self._get_client()[0]
+
+    @staticmethod
+    def cache_stats():
+        return GMAIL_CLIENT_CACHE.stats()
 
     def authenticate(self):
         return self.enabled and self._build_service() is not None
 
+    def _build_message(self, to_email, subject, body, html=True):
+        message = MIMEMultipart('alternative')
+        message['To'] = to_email
+        message['Subject'] = subject
+
+        if html:
+            part = MIMEText(body, 'html')
+        else:
+            part = MIMEText(body, 'plain')
+
+        message.attach(part)
+
+        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        return {'raw': raw_message}
+
     def send_email(self, to_email, subject, body, html=True):
         if not self.enabled:
             current_app.logger.info(f"Gmail (stub): Email to {to_email} - {subject}")
             return True
 
         try:
-            service = self._build_service()
+            service, creds = self._get_client()
             if not service:
                 current_app.logger.error("Gmail: Failed to build service")
                 return False
 
-            message = MIMEMultipart('alternative')
-            message['To'] = to_email
-            message['Subject'] = subject
-
-            if html:
-                part = MIMEText(body, 'html')
-            else:
-                part = MIMEText(body, 'plain')
-
-            message.attach(part)
+            send_message = self._build_message(to_email, subject, body, html)
 
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-            send_message = {'raw': raw_message}
-
-            result = service.users().messages().send(userId='me', body=send_message).execute()
+            result = service.users().messages().send(userId='me', body=send_message).execute(
+                http=GMAIL_CLIENT_CACHE.http_for(creds, self.request_timeout)
+            )
             current_app.logger.info(f"Gmail: Email sent successfully (ID: {result.get('id')})")
             return True
 
@@ -98,89 +188,82 @@ class GmailService:
             return False
 
     def send_grade_alert(self, to_email, course_name, grade_data):
-        subject = f"Grade Update: {course_name}"
-
-        html_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">
-                        Grade Update for {course_name}
-                    </h2>
-
-                    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                        <h3 style="color: #2c3e50; margin-top: 0;">Current Grade Summary</h3>
-                        <p style="font-size: 18px; margin: 10px 0;">
-                            <strong>Current Grade:</strong>
-                            <span style="color: #27ae60; font-size: 24px; font-weight: bold;">
-                                {grade_data.get('current_grade', 'N/A')}%
-                            </span>
-                        </p>
-                        <p style="font-size: 16px; margin: 10px 0;">
-                            <strong>Letter Grade:</strong>
-                            <span style="color: #2980b9; font-size: 20px;">
-                                {grade_data.get('letter_grade', 'N/A')}
-                            </span>
-                        </p>
-                    </div>
-
-                    {self._build_category_breakdown_html(grade_data.get('category_breakdown', {}))}
-
-                    <div style="margin-top: 30px; padding: 15px; background-color: #e8f4f8; border-left: 4px solid #3498db; border-radius: 3px;">
-                        <p style="margin: 0; font-size: 14px;">
-                            <strong>Target Grade:</strong> {grade_data.get('target_grade', 85)}%<br>
-                            {self._build_progress_message(grade_data)}
-                        </p>
-                    </div>
-
-                    <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #7f8c8d; font-size: 12px;">
-                        <p>This is an automated notification from GradeSync Pro</p>
-                    </div>
-                </div>
-            </body>
-        </html>
-        """
-
+        subject, html_body = self._build_grade_alert(course_name, grade_data)
         return self.send_email(to_email, subject, html_body, html=True)
 
-    def _build_category_breakdown_html(self, categories):
-        if not categories:
-            return ''
-
-        html = '<div style="margin: 20px 0;"><h4 style="color: #2c3e50;">Category Breakdown</h4><table style="width: 100%; border-collapse: collapse;">'
-
-        for category, data in categories.items():
-            avg = data.get('average', 0)
-            weight = data.get('weight', 0)
-            html += f'''
-            <tr style="border-bottom: 1px solid #ddd;">
-                <td style="padding: 10px; font-weight: bold;">{category}</td>
-                <td style="padding: 10px; text-align: right;">{avg:.1f}%</td>
-                <td style="padding: 10px; text-align: right; color: #7f8c8d;">({weight}%)</td>
-            </tr>
-            '''
+    def _build_grade_alert(self, course_name, grade_data):
+        return render_grade_alert(GMAIL_GRADE_ALERT, course_name, grade_data)
 
-        html += '</table></div>'
-        return html
+    def send_batch_alerts(self, alerts):
+        if not self.enabled:
+            return [
+                {'email': alert['email'], 'success': self.send_grade_alert(alert['email'], alert['course_name'], alert['grade_data'])}
+                for alert in alerts
+            ]
 
-    def _build_progress_message(self, grade_data):
-        current = grade_data.get('current_grade', 0)
-        target = grade_data.get('target_grade', 85)
+        messages = []
+        for alert in alerts:
+            subject, html_body = self._build_grade_alert(alert['course_name'], alert['grade_data'])
+            messages.append((alert['email'], subject, html_body))
 
-        if current >= target:
-            return f'<span style="color: #27ae60;">You are meeting your target grade!</span>'
+        if self.batch_size > 1:
+            statuses = self._send_batched(messages)
         else:
-            diff = target - current
-            return f'<span style="color: #e67e22;">You need {diff:.1f}% more to reach your target.</span>'
+            statuses = self._send_concurrently(messages)
 
-    def send_batch_alerts(self, alerts):
         results = []
-        for alert in alerts:
-            success = self.send_grade_alert(
-                alert['email'],
-                alert['course_name'],
-                alert['grade_data']
-            )
-            results.append({'email': alert['email'], 'success': success})
-
+        for (to_email, _, _), error in zip(messages, statuses):
+            result = {'email': to_email, 'success': error is None}
+            if error is not None:
+                result['error'] = error
+            results.append(result)
         return results
+
+    def _send_batched(self, messages):
+        # Packs up to batch_size messages.send calls into each multipart
+        # /batch request; returns one error (or None) per message
+        service, creds = self._get_client()
+        if not service:
+            current_app.logger.error("Gmail: Failed to build service")
+            return ['Gmail service unavailable'] * len(messages)
+
+        statuses = [None] * len(messages)
+        for start in range(0, len(messages), self.batch_size):
+            chunk = range(start, min(start + self.batch_size, len(messages)))
+
+            def record(request_id, response, exception):
+                if exception is not None:
+                    current_app.logger.error(f"Gmail batch item to {messages[int(request_id)][0]} failed: {exception}")
+                    statuses[int(request_id)] = str(exception)
+
+            if self.api_endpoint:
+                batch = BatchHttpRequest(callback=record, batch_uri=f'{self.api_endpoint}/batch/gmail/v1')
+            else:
+                batch = service.new_batch_http_request(callback=record)
+            for index in chunk:
+                to_email, subject, html_body = messages[index]
+                batch.add(
+                    service.users().messages().send(userId='me', body=self._build_message(to_email, subject, html_body)),
+                    request_id=str(index)
+                )
+
+            try:
+                batch.execute(http=GMAIL_CLIENT_CACHE.http_for(creds, self.request_timeout))
+            except Exception as error:
+                # The whole multipart request failed; send this chunk individually instead
+                current_app.logger.error(f"Gmail batch error, falling back to individual sends: {error}")
+                for index, status in zip(chunk, self._send_concurrently([messages[i] for i in chunk])):
+                    statuses[index] = status
+
+        return statuses
+
+    def _send_concurrently(self, messages):
+        app = current_app._get_current_object()
+
+        def send(message):
+            with app.app_context():
+                to_email, subject, html_body = message
+                return None if self.send_email(to_email, subject, html_body, html=True) else 'Gmail send failed'
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.send_concurrency, len(messages)))) as pool:
+            return list(pool.map(send, messages))
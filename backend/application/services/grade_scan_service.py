@@ -0,0 +1,111 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from application import db
+from application.models.course import Course
+from application.models.job import Job
+from application.models.user import User
+from application.services.job_queue import JobQueue
+from application.utils.grade_calculator import GradeCalculator
+
+class GradeScanService:
+    def __init__(self, app, chunk_size=None, parallelism=None):
+        self.app = app
+        self.chunk_size = chunk_size or app.config.get('GRADE_SCAN_CHUNK_SIZE', 500)
+        self.parallelism = parallelism or app.config.get('GRADE_SCAN_PARALLELISM', 4)
+        self.threshold = app.config.get('GRADE_THRESHOLD', 85.0)
+        self.cooldown = timedelta(hours=app.config.get('GRADE_SCAN_ALERT_COOLDOWN_HOURS', 24))
+
+    def _course_id_chunks(self):
+        # Keyset pagination on the primary key; never OFFSET
+        last_id = 0
+        while True:
+            course_ids = [row.id for row in db.session.query(Course.id).filter(
+                Course.id > last_id
+            ).order_by(Course.id).limit(self.chunk_size)]
+            if not course_ids:
+                return
+            yield course_ids
+            last_id = course_ids[-1]
+
+    def run(self):
+        start = time.perf_counter()
+        report = {'courses_scanned': 0, 'alerts_enqueued': 0, 'alerts_suppressed': 0, 'chunks': 0}
+
+        def collect(future):
+            chunk_report = future.result()
+            for key in ('courses_scanned', 'alerts_enqueued', 'alerts_suppressed'):
+                report[key] += chunk_report[key]
+            report['chunks'] += 1
+
+        with self.app.app_context():
+            with ThreadPoolExecutor(max_workers=self.parallelism) as pool:
+                # Bound in-flight chunks so memory stays flat however many courses exist
+                in_flight = deque()
+                for course_ids in self._course_id_chunks():
+                    in_flight.append(pool.submit(self._scan_chunk, course_ids))
+                    if len(in_flight) >= self.parallelism * 2:
+                        collect(in_flight.popleft())
+                while in_flight:
+                    collect(in_flight.popleft())
+            db.session.remove()
+
+        elapsed = time.perf_counter() - start
+        report['duration_seconds'] = round(elapsed, 3)
+        report['courses_per_second'] = round(report['courses_scanned'] / elapsed, 1) if elapsed > 0 else None
+        self.app.logger.info(
+            f"Grade scan: {report['courses_scanned']} courses in {report['duration_seconds']}s "
+            f"({report['courses_per_second']} courses/sec), {report['alerts_enqueued']} alerts enqueued"
+        )
+        return report
+
+    def _scan_chunk(self, course_ids):
+        with self.app.app_context():
+            try:
+                return self._evaluate_chunk(course_ids)
+            finally:
+                db.session.remove()
+
+    def _evaluate_chunk(self, course_ids):
+        courses = db.session.query(
+            Course.id, Course.user_id, Course.target_grade, User.email
+        ).join(User, User.id == Course.user_id).filter(Course.id.in_(course_ids)).all()
+
+        assignment_columns, weight_columns = Course.grading_columns(course_ids)
+        results = GradeCalculator.calculate_batch(course_ids, assignment_columns, weight_columns)
+
+        alerts = {}
+        for course in courses:
+            grade_data = results[course.id]
+            if grade_data.get('error'):
+                continue
+            projected_grade = grade_data.get('projected_final_grade')
+            below_target = course.target_grade is not None and projected_grade is not None and projected_grade < course.target_grade
+            if projected_grade and (projected_grade < self.threshold or below_target):
+                alerts[f'grade_alert:{course.id}:{projected_grade}'] = course
+
+        suppressed = set()
+        if alerts:
+            cutoff = datetime.utcnow() - self.cooldown
+            suppressed = {row.dedupe_key for row in db.session.query(Job.dedupe_key).filter(
+                Job.dedupe_key.in_(alerts.keys()),
+                Job.created_at >= cutoff
+            )}
+
+        for dedupe_key, course in alerts.items():
+            if dedupe_key in suppressed:
+                continue
+            JobQueue.enqueue('send_grade_alert', {
+                'course_id': course.id,
+                'recipient_email': course.email,
+                'use_gmail': True,
+                'use_outlook': True
+            }, user_id=course.user_id, dedupe_key=dedupe_key)
+        db.session.commit()
+
+        return {
+            'courses_scanned': len(course_ids),
+            'alerts_enqueued': len(alerts) - len(suppressed),
+            'alerts_suppressed': len(suppressed)
+        }
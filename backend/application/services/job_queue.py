@@ -0,0 +1,237 @@
+import random
+import threading
+import traceback
+from datetime import datetime, timedelta
+from flask import current_app
+from application import db
+from application.models.job import Job
+
+JOB_HANDLERS = {}
+BATCH_JOB_TYPES = set()
+
+class PermanentJobError(Exception):
+    # Raised by handlers for failures a retry cannot fix
+    pass
+
+def job_handler(job_type, batch=False):
+    # A batch handler takes a list of jobs and returns one result, or the exception
+    # that failed it, per job; the worker claims ready jobs of its type together
+    def register(func):
+        JOB_HANDLERS[job_type] = func
+        if batch:
+            BATCH_JOB_TYPES.add(job_type)
+        return func
+    return register
+
+class JobQueue:
+
+    @staticmethod
+    def enqueue(job_type, payload=None, user_id=None, max_attempts=None, dedupe_key=None):
+        job = Job(
+            job_type=job_type,
+            payload=payload or {},
+            user_id=user_id,
+            dedupe_key=dedupe_key,
+            max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3)
+        )
+        db.session.add(job)
+        db.session.flush()
+        return job
+
+    @staticmethod
+    def fail_exhausted(now):
+        # A job whose worker died on its final attempt is failed rather than reclaimed,
+        # so a poison job that kills or hangs its worker cannot loop forever
+        return db.session.execute(db.update(Job).where(
+            Job.status == Job.STATUS_RUNNING,
+            Job.locked_until < now,
+            Job.attempts >= Job.max_attempts
+        ).values(
+            status=Job.STATUS_FAILED,
+            error=db.func.coalesce(Job.error, 'Worker lost during final attempt (visibility timeout expired)'),
+            locked_until=None,
+            finished_at=now
+        ).execution_options(synchronize_session=False)).rowcount
+
+    @staticmethod
+    def claim_next():
+        now = datetime.utcnow()
+        if JobQueue.fail_exhausted(now):
+            db.session.commit()
+
+        query = Job.query.filter(db.or_(
+            db.and_(Job.status == Job.STATUS_QUEUED, Job.run_at <= now),
+            # A running job whose visibility timeout lapsed belongs to a worker that died
+            db.and_(Job.status == Job.STATUS_RUNNING, Job.locked_until < now, Job.attempts < Job.max_attempts)
+        )).order_by(Job.run_at, Job.id)
+
+        # Concurrent workers skip rows another worker has already locked
+        if db.session.get_bind().dialect.name == 'postgresql':
+            query = query.with_for_update(skip_locked=True)
+
+        job = query.first()
+        if not job:
+            db.session.rollback()
+            return None
+        return JobQueue._lease([job], now)[0]
+
+    @staticmethod
+    def claim_batch(job_type, limit):
+        # Further queued jobs of one type, leased together with one already claimed
+        now = datetime.utcnow()
+        query = Job.query.filter(
+            Job.job_type == job_type,
+            Job.status == Job.STATUS_QUEUED,
+            Job.run_at <= now
+        ).order_by(Job.run_at, Job.id).limit(limit)
+
+        if db.session.get_bind().dialect.name == 'postgresql':
+            query = query.with_for_update(skip_locked=True)
+
+        jobs = query.all()
+        if not jobs:
+            db.session.rollback()
+            return []
+        return JobQueue._lease(jobs, now)
+
+    @staticmethod
+    def _lease(jobs, now):
+        visibility_timeout = current_app.config.get('JOB_VISIBILITY_TIMEOUT', 300)
+        for job in jobs:
+            job.status = Job.STATUS_RUNNING
+            job.started_at = now
+            # locked_until doubles as the lease token: a reclaim always writes a new value
+            job.locked_until = now + timedelta(seconds=visibility_timeout)
+            job.attempts += 1
+        db.session.commit()
+        return jobs
+
+    @staticmethod
+    def retry_delay(attempts):
+        base = current_app.config.get('JOB_RETRY_BACKOFF', 30.0)
+        delay = base * (2 ** (attempts - 1))
+        return delay + random.uniform(0, delay / 2)
+
+    @staticmethod
+    def run(job):
+        if job.job_type in BATCH_JOB_TYPES:
+            return JobQueue.run_batch([job])[0]
+        return JobQueue._run([job], lambda jobs: [JOB_HANDLERS[job.job_type](jobs[0])])[0]
+
+    @staticmethod
+    def run_batch(jobs):
+        return JobQueue._run(jobs, lambda jobs: JOB_HANDLERS[jobs[0].job_type](jobs))
+
+    @staticmethod
+    def _run(jobs, call):
+        leases = [(job.id, job.job_type, job.locked_until, job.attempts, job.max_attempts) for job in jobs]
+        handler = JOB_HANDLERS.get(jobs[0].job_type)
+        try:
+            if handler is None:
+                raise LookupError(f'No handler registered for job type {jobs[0].job_type}')
+            results = call(jobs)
+        except Exception as e:
+            db.session.rollback()
+            results = [e] * len(jobs)
+
+        outcomes = []
+        for (job_id, job_type, lease, attempts, max_attempts), result in zip(leases, results):
+            if isinstance(result, Exception):
+                current_app.logger.error(
+                    f"Job {job_id} ({job_type}) attempt {attempts} failed: {result}\n"
+                    f"{''.join(traceback.format_exception(result))}"
+                )
+                retryable = handler is not None and not isinstance(result, PermanentJobError)
+                if retryable and attempts < max_attempts:
+                    outcome = {
+                        'status': Job.STATUS_QUEUED,
+                        'run_at': datetime.utcnow() + timedelta(seconds=JobQueue.retry_delay(attempts))
+                    }
+                else:
+                    outcome = {'status': Job.STATUS_FAILED, 'finished_at': datetime.utcnow()}
+                outcome['error'] = str(result)
+            else:
+                outcome = {
+                    'status': Job.STATUS_SUCCEEDED,
+                    'result': result,
+                    'error': None,
+                    'finished_at': datetime.utcnow()
+                }
+            outcomes.append((job_id, lease, outcome))
+
+        # The handler's own writes are still pending and commit together with the
+        # outcomes. If any lease was lost the job belongs to another worker, so the
+        # whole transaction is rolled back rather than committing work it will redo
+        held = [JobQueue.finish(job_id, lease, outcome) for job_id, lease, outcome in outcomes]
+        if all(held):
+            db.session.commit()
+        else:
+            db.session.rollback()
+            current_app.logger.warning(f"Rolled back the work of {len(outcomes)} job(s) after a lost lease")
+
+        return [db.session.get(Job, lease[0]) for lease in leases]
+
+    @staticmethod
+    def finish(job_id, lease, outcome):
+        # Only the worker still holding the lease records the outcome; once the job is
+        # reclaimed its new worker owns it and this late result is dropped. The
+        # caller commits or rolls back
+        updated = db.session.execute(db.update(Job).where(
+            Job.id == job_id,
+            Job.status == Job.STATUS_RUNNING,
+            Job.locked_until == lease
+        ).values(locked_until=None, **outcome).execution_options(synchronize_session=False)).rowcount
+        if not updated:
+            current_app.logger.warning(f"Job {job_id} lost its lease before finishing; outcome {outcome['status']} discarded")
+        return bool(updated)
+
+class JobWorker:
+    def __init__(self, app, poll_interval=None, concurrency=None):
+        # Importing the jobs module registers every handler with JOB_HANDLERS
+        import application.jobs  # noqa: F401
+
+        self.app = app
+        self.poll_interval = poll_interval or app.config.get('JOB_POLL_INTERVAL', 2.0)
+        self.concurrency = concurrency or app.config.get('WORKER_CONCURRENCY', 1)
+        self._stopped = threading.Event()
+
+    def stop(self, *args):
+        self._stopped.set()
+
+    def run_once(self):
+        with self.app.app_context():
+            try:
+                job = JobQueue.claim_next()
+                if not job:
+                    return False
+                if job.job_type in BATCH_JOB_TYPES:
+                    batch_size = self.app.config.get('JOB_BATCH_SIZE', 50)
+                    JobQueue.run_batch([job] + JobQueue.claim_batch(job.job_type, batch_size - 1))
+                else:
+                    JobQueue.run(job)
+                return True
+            finally:
+                db.session.remove()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                self.app.logger.error(f"Job worker error: {e}")
+                worked = False
+            if not worked:
+                self._stopped.wait(self.poll_interval)
+
+    def run_forever(self):
+        self.app.logger.info(f"Job worker started ({self.concurrency} threads, poll interval {self.poll_interval}s)")
+        threads = [
+            threading.Thread(target=self._loop, name=f'job-worker-{i}', daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1.0)
+        self.app.logger.info("Job worker stopped")
@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor(max_workers):
+    # One pool per process so concurrent jobs share a single cap on provider calls
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notify')
+        return _executor
+
+class NotificationDispatcher:
+    def __init__(self, providers, timeout=None):
+        self.providers = providers
+        self.timeout = timeout or current_app.config.get('NOTIFY_PROVIDER_TIMEOUT', 30.0)
+        # Per alert, after dispatch: providers whose call was still running at the
+        # deadline. It may yet deliver, so callers must not resend through them
+        self.unconfirmed = []
+
+    def dispatch(self, alerts):
+        # Sends every (recipient_email, course_name, grade_data) alert through every
+        # provider at once; returns the providers that succeeded for each alert
+        app = current_app._get_current_object()
+        executor = get_executor(app.config.get('NOTIFY_MAX_CONCURRENCY', 8))
+
+        # The deadline runs from submission, so a call still queued behind a
+        # saturated pool times out too; unstarted calls are cancelled outright
+        futures = {}
+        for name, service in self.providers:
+            if alerts and getattr(service, 'supports_batch_alerts', False):
+                # One task per provider; it packs the alerts into its own batch requests
+                futures[executor.submit(self._send_batch, app, service, name, alerts)] = (None, name)
+                continue
+            for index, (recipient_email, course_name, grade_data) in enumerate(alerts):
+                future = executor.submit(self._send, app, service, name, recipient_email, course_name, grade_data)
+                futures[future] = (index, name)
+
+        done, pending = wait(futures, timeout=self.timeout)
+
+        succeeded = set()
+        running = set()
+        for future in done:
+            index, name = futures[future]
+            if index is None:
+                succeeded.update((i, name) for i, sent in enumerate(future.result()) if sent)
+            elif future.result():
+                succeeded.add((index, name))
+
+        for future in pending:
+            index, name = futures[future]
+            target = f'{len(alerts)} alerts' if index is None else alerts[index][1]
+            if future.cancel():
+                app.logger.error(f"{name.capitalize()} call for {target} never started within {self.timeout}s; cancelled")
+            else:
+                # Already running; its HTTP timeout frees the worker thread
+                app.logger.error(f"{name.capitalize()} timed out after {self.timeout}s for {target}; delivery unknown")
+                running.update((i, name) for i in (range(len(alerts)) if index is None else [index]))
+
+        self.unconfirmed = [
+            [name for name, _ in self.providers if (index, name) in running]
+            for index in range(len(alerts))
+        ]
+        return [
+            [name for name, _ in self.providers if (index, name) in succeeded]
+            for index in range(len(alerts))
+        ]
+
+    @staticmethod
+    def _send(app, service, name, recipient_email, course_name, grade_data):
+        with app.app_context():
+            try:
+                return service.send_grade_alert(recipient_email, course_name, grade_data)
+            except Exception as e:
+                current_app.logger.error(f"{name.capitalize()} error for {course_name}: {str(e)}")
+                return False
+
+    @staticmethod
+    def _send_batch(app, service, name, alerts):
+        with app.app_context():
+            try:
+                results = service.send_batch_alerts([
+                    {'email': recipient_email, 'course_name': course_name, 'grade_data': grade_data}
+                    for recipient_email, course_name, grade_data in alerts
+                ])
+                return [result['success'] for result in results]
+            except Exception as e:
+                current_app.logger.error(f"{name.capitalize()} batch error for {len(alerts)} alerts: {str(e)}")
+                return [False] * len(alerts)
@@ -1,14 +1,84 @@
 import os
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from flask import current_app
+from application.utils.email_templates import OUTLOOK_GRADE_ALERT, render_grade_alert
+from application.utils.retry_after import retry_after_seconds
+
+TOKEN_EXPIRY_MARGIN = 60
+GRAPH_BATCH_LIMIT = 20
+GRAPH_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class OutlookTokenCache:
+    # Access tokens keyed by (tenant, client), reused until shortly before expires_in lapses
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, fetch):
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached and cached[1] - TOKEN_EXPIRY_MARGIN > time.monotonic():
+                self.hits += 1
+                return cached[0]
+
+            self.misses += 1
+            token, expires_in = fetch()
+            if token:
+                self._tokens[key] = (token, time.monotonic() + expires_in)
+            return token
+
+    def invalidate(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'tokens': len(self._tokens)}
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self.hits = 0
+            self.misses = 0
+
+OUTLOOK_TOKEN_CACHE = OutlookTokenCache()
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    # One keep-alive connection pool shared by every token and Graph request
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = int(os.getenv('OUTLOOK_POOL_SIZE', '20'))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
 
 class OutlookService:
+    # NotificationDispatcher hands this provider a whole dispatch via send_batch_alerts
+    supports_batch_alerts = True
+
     def __init__(self):
         self.client_id = os.getenv('OUTLOOK_CLIENT_ID', '')
         self.client_secret = os.getenv('OUTLOOK_CLIENT_SECRET', '')
         self.refresh_token = os.getenv('OUTLOOK_REFRESH_TOKEN', '')
         self.tenant_id = os.getenv('OUTLOOK_TENANT_ID', 'common')
         self.redirect_uri = os.getenv('OUTLOOK_REDIRECT_URI', 'http://localhost:5001/api/auth/outlook/callback')
+        self.authority_url = os.getenv('OUTLOOK_AUTHORITY_URL', 'https://login.microsoftonline.com').rstrip('/')
+        self.graph_url = os.getenv('OUTLOOK_GRAPH_URL', 'https://graph.microsoft.com/v1.0').rstrip('/')
+        self.batch_max_retries = int(os.getenv('OUTLOOK_BATCH_MAX_RETRIES', '3'))
+        self.request_timeout = float(os.getenv('OUTLOOK_REQUEST_TIMEOUT', '30'))
+        self.max_retry_after = float(os.getenv('OUTLOOK_MAX_RETRY_AFTER', '10'))
 
         synthetic_value = os.getenv('USE_SYNTHETIC_DATA', 'true')
         force_synthetic = synthetic_value.lower() == 'true'
@@ -26,11 +96,17 @@ class OutlookService:
         except RuntimeError:
             pass
 
+    def _token_cache_key(self):
+        return (self.tenant_id, self.client_id)
+
     def _get_access_token(self):
         if not self.enabled:
             return None
 
-        token_url = f'https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token'
+        return OUTLOOK_TOKEN_CACHE.get(self._token_cache_key(), self._fetch_access_token)
+
+    def _fetch_access_token(self):
+        token_url = f'{self.authority_url}/{self.tenant_id}/oauth2/v2.0/token'
 
         data = {
             'client_id': self.client_id,
@@ -41,12 +117,17 @@ class OutlookService:
         }
 
         try:
-            response = requests.post(token_url, data=data)
+            response = get_http_session().post(token_url, data=data, timeout=self.request_timeout)
             response.raise_for_status()
-            return response.json().get('access_token')
+            payload = response.json()
+            return payload.get('access_token'), int(payload.get('expires_in', 3600))
         except Exception as e:
             current_app.logger.error(f"Outlook token refresh error: {e}")
-            return None
+            return None, 0
+
+    @staticmethod
+    def cache_stats():
+        return OUTLOOK_TOKEN_CACHE.stats()
 
     def _get_headers(self):
         access_token = self._get_access_token()
@@ -61,17 +142,8 @@ class OutlookService:
     def authenticate(self):
         return self.enabled and self._get_access_token() is not None
 
-    def send_email(self, to_email, subject, body, html=True):
-        if not self.enabled:
-            current_app.logger.info(f"Outlook (stub): Email to {to_email} - {subject}")
-            return True
-
-        headers = self._get_headers()
-        if not headers:
-            current_app.logger.error("Outlook: Failed to get access token")
-            return False
-
-        message = {
+    def _build_message(self, to_email, subject, body, html=True):
+        return {
             'message': {
                 'subject': subject,
                 'body': {
@@ -89,12 +161,27 @@ class OutlookService:
             'saveToSentItems': 'true'
         }
 
+    def send_email(self, to_email, subject, body, html=True):
+        if not self.enabled:
+            current_app.logger.info(f"Outlook (stub): Email to {to_email} - {subject}")
+            return True
+
+        headers = self._get_headers()
+        if not headers:
+            current_app.logger.error("Outlook: Failed to get access token")
+            return False
+
+        message = self._build_message(to_email, subject, body, html)
+
         try:
-            response = requests.post(
-                'https://graph.microsoft.com/v1.0/me/sendMail',
+            response = get_http_session().post(
+                f'{self.graph_url}/me/sendMail',
                 headers=headers,
-                json=message
+                json=message,
+                timeout=self.request_timeout
             )
+            if response.status_code == 401:
+                OUTLOOK_TOKEN_CACHE.invalidate(self._token_cache_key())
             response.raise_for_status()
             current_app.logger.info(f"Outlook: Email sent successfully to {to_email}")
             return True
@@ -108,89 +195,92 @@ class OutlookService:
             return False
 
     def send_grade_alert(self, to_email, course_name, grade_data):
-        subject = f"Grade Update: {course_name}"
-
-        html_body = f"""
-        <html>
-            <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #0078d4; border-bottom: 2px solid #0078d4; padding-bottom: 10px;">
-                        Grade Update for {course_name}
-                    </h2>
-
-                    <div style="background-color: #f3f2f1; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                        <h3 style="color: #323130; margin-top: 0;">Current Grade Summary</h3>
-                        <p style="font-size: 18px; margin: 10px 0;">
-                            <strong>Current Grade:</strong>
-                            <span style="color: #107c10; font-size: 24px; font-weight: bold;">
-                                {grade_data.get('current_grade', 'N/A')}%
-                            </span>
-                        </p>
-                        <p style="font-size: 16px; margin: 10px 0;">
-                            <strong>Letter Grade:</strong>
-                            <span style="color: #0078d4; font-size: 20px;">
-                                {grade_data.get('letter_grade', 'N/A')}
-                            </span>
-                        </p>
-                    </div>
-
-                    {self._build_category_breakdown_html(grade_data.get('category_breakdown', {}))}
-
-                    <div style="margin-top: 30px; padding: 15px; background-color: #deecf9; border-left: 4px solid #0078d4; border-radius: 3px;">
-                        <p style="margin: 0; font-size: 14px;">
-                            <strong>Target Grade:</strong> {grade_data.get('target_grade', 85)}%<br>
-                            {self._build_progress_message(grade_data)}
-                        </p>
-                    </div>
-
-                    <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #605e5c; font-size: 12px;">
-                        <p>This is an automated notification from GradeSync Pro</p>
-                    </div>
-                </div>
-            </body>
-        </html>
-        """
-
+        subject, html_body = self._build_grade_alert(course_name, grade_data)
         return self.send_email(to_email, subject, html_body, html=True)
 
-    def _build_category_breakdown_html(self, categories):
-        if not categories:
-            return ''
+    def _build_grade_alert(self, course_name, grade_data):
+        return render_grade_alert(OUTLOOK_GRADE_ALERT, course_name, grade_data)
 
-        html = '<div style="margin: 20px 0;"><h4 style="color: #323130;">Category Breakdown</h4><table style="width: 100%; border-collapse: collapse;">'
+    def send_batch_alerts(self, alerts):
+        if not self.enabled:
+            return [
+                {'email': alert['email'], 'success': self.send_grade_alert(alert['email'], alert['course_name'], alert['grade_data'])}
+                for alert in alerts
+            ]
 
-        for category, data in categories.items():
-            avg = data.get('average', 0)
-            weight = data.get('weight', 0)
-            html += f'''
-            <tr style="border-bottom: 1px solid #edebe9;">
-                <td style="padding: 10px; font-weight: bold;">{category}</td>
-                <td style="padding: 10px; text-align: right;">{avg:.1f}%</td>
-                <td style="padding: 10px; text-align: right; color: #605e5c;">({weight}%)</td>
-            </tr>
-            '''
+        requests_by_id = {}
+        for index, alert in enumerate(alerts):
+            subject, html_body = self._build_grade_alert(alert['course_name'], alert['grade_data'])
+            requests_by_id[str(index)] = {
+                'id': str(index),
+                'method': 'POST',
+                'url': '/me/sendMail',
+                'headers': {'Content-Type': 'application/json'},
+                'body': self._build_message(alert['email'], subject, html_body)
+            }
 
-        html += '</table></div>'
-        return html
+        succeeded = set()
+        pending = list(requests_by_id)
+        for attempt in range(self.batch_max_retries + 1):
+            retry, retry_after = self._send_graph_batches([requests_by_id[i] for i in pending], succeeded)
+            if not retry or attempt == self.batch_max_retries:
+                break
+            if retry_after > self.max_retry_after:
+                # Waiting that long would hold a dispatcher thread past its deadline;
+                # the unsent alerts fail now and their jobs retry later instead
+                current_app.logger.error(
+                    f"Outlook: throttled for {retry_after}s (max {self.max_retry_after}s); {len(retry)} sendMail requests not sent"
+                )
+                break
+            current_app.logger.info(f"Outlook: retrying {len(retry)} failed sendMail requests in {retry_after}s")
+            time.sleep(retry_after)
+            pending = retry
 
-    def _build_progress_message(self, grade_data):
-        current = grade_data.get('current_grade', 0)
-        target = grade_data.get('target_grade', 85)
+        return [
+            {'email': alert['email'], 'success': str(index) in succeeded}
+            for index, alert in enumerate(alerts)
+        ]
 
-        if current >= target:
-            return f'<span style="color: #107c10;">You are meeting your target grade!</span>'
-        else:
-            diff = target - current
-            return f'<span style="color: #d83b01;">You need {diff:.1f}% more to reach your target.</span>'
+    def _send_graph_batches(self, batch_requests, succeeded):
+        # Packs up to 20 sendMail calls per $batch POST and returns the ids worth retrying
+        retry = []
+        retry_after = 0
+        for start in range(0, len(batch_requests), GRAPH_BATCH_LIMIT):
+            chunk = batch_requests[start:start + GRAPH_BATCH_LIMIT]
+            headers = self._get_headers()
+            if not headers:
+                current_app.logger.error("Outlook: Failed to get access token")
+                retry.extend(request['id'] for request in chunk)
+                retry_after = max(retry_after, 1)
+                continue
 
-    def send_batch_alerts(self, alerts):
-        results = []
-        for alert in alerts:
-            success = self.send_grade_alert(
-                alert['email'],
-                alert['course_name'],
-                alert['grade_data']
-            )
-            results.append({'email': alert['email'], 'success': success})
+            try:
+                response = get_http_session().post(
+                    f'{self.graph_url}/$batch', headers=headers, json={'requests': chunk}, timeout=self.request_timeout
+                )
+                if response.status_code == 401:
+                    OUTLOOK_TOKEN_CACHE.invalidate(self._token_cache_key())
+                response.raise_for_status()
+                responses = response.json().get('responses', [])
+            except Exception as error:
+                current_app.logger.error(f"Outlook batch error: {error}")
+                retry.extend(request['id'] for request in chunk)
+                retry_after = max(retry_after, 1)
+                continue
+
+            answered = set()
+            for item in responses:
+                request_id = str(item.get('id'))
+                status = item.get('status', 0)
+                answered.add(request_id)
+                if 200 <= status < 300:
+                    succeeded.add(request_id)
+                elif status in GRAPH_RETRYABLE_STATUSES:
+                    retry.append(request_id)
+                    delay = retry_after_seconds((item.get('headers') or {}).get('Retry-After'))
+                    retry_after = max(retry_after, 1 if delay is None else delay)
+                else:
+                    current_app.logger.error(f"Outlook batch item {request_id} failed with status {status}: {item.get('body')}")
+            retry.extend(request['id'] for request in chunk if request['id'] not in answered)
 
-        return results
+        return retry, retry_after
@@ -0,0 +1,44 @@
+from itertools import islice
+from sqlalchemy.dialects import postgresql, sqlite
+from application import db
+
+_UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def bulk_insert_returning(model, rows, *returning):
+    if not rows:
+        return []
+    return db.session.execute(db.insert(model).returning(*returning), rows).all()
+
+def bulk_update(model, rows):
+    # rows must carry the primary key; issued as a single executemany UPDATE
+    if rows:
+        db.session.execute(db.update(model), rows)
+    return len(rows)
+
+def upsert_rows(model, rows, index_elements, update_columns):
+    if not rows:
+        return 0
+
+    dialect = db.session.get_bind().dialect.name
+    insert = _UPSERT_DIALECTS.get(dialect)
+    if insert is None:
+        raise NotImplementedError(f'Upsert is not supported for the {dialect} dialect')
+
+    stmt = insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: getattr(stmt.excluded, column) for column in update_columns}
+    )
+    db.session.execute(stmt, rows)
+    return len(rows)
@@ -0,0 +1,192 @@
+import threading
+from collections import OrderedDict
+from string import Formatter, Template
+
+RENDER_CACHE_SIZE = 512
+
+GRADE_ALERT_SKELETON = """
+        <html>
+            <body style="font-family: $font_family; line-height: 1.6; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                    <h2 style="color: $title; border-bottom: 2px solid $accent; padding-bottom: 10px;">
+                        Grade Update for {course_name}
+                    </h2>
+
+                    <div style="background-color: $summary_background; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                        <h3 style="color: $heading; margin-top: 0;">Current Grade Summary</h3>
+                        <p style="font-size: 18px; margin: 10px 0;">
+                            <strong>Current Grade:</strong>
+                            <span style="color: $success; font-size: 24px; font-weight: bold;">
+                                {current_grade}%
+                            </span>
+                        </p>
+                        <p style="font-size: 16px; margin: 10px 0;">
+                            <strong>Letter Grade:</strong>
+                            <span style="color: $letter; font-size: 20px;">
+                                {letter_grade}
+                            </span>
+                        </p>
+                    </div>
+
+                    {category_breakdown}
+
+                    <div style="margin-top: 30px; padding: 15px; background-color: $callout_background; border-left: 4px solid $accent; border-radius: 3px;">
+                        <p style="margin: 0; font-size: 14px;">
+                            <strong>Target Grade:</strong> {target_grade}%<br>
+                            {progress_message}
+                        </p>
+                    </div>
+
+                    <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: $muted; font-size: 12px;">
+                        <p>This is an automated notification from GradeSync Pro</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+
+CATEGORY_BREAKDOWN_HEADER = '<div style="margin: 20px 0;"><h4 style="color: $heading;">Category Breakdown</h4><table style="width: 100%; border-collapse: collapse;">'
+CATEGORY_BREAKDOWN_FOOTER = '</table></div>'
+
+CATEGORY_ROW = '''
+            <tr style="border-bottom: 1px solid $row_border;">
+                <td style="padding: 10px; font-weight: bold;">{category}</td>
+                <td style="padding: 10px; text-align: right;">{average:.1f}%</td>
+                <td style="padding: 10px; text-align: right; color: $muted;">({weight}%)</td>
+            </tr>
+            '''
+
+TARGET_MET = '<span style="color: $success;">You are meeting your target grade!</span>'
+TARGET_MISSED = '<span style="color: $warning;">You need {diff:.1f}% more to reach your target.</span>'
+
+GMAIL_THEME = {
+    'font_family': 'Arial, sans-serif',
+    'title': '#2c3e50',
+    'heading': '#2c3e50',
+    'accent': '#3498db',
+    'summary_background': '#f8f9fa',
+    'callout_background': '#e8f4f8',
+    'success': '#27ae60',
+    'letter': '#2980b9',
+    'warning': '#e67e22',
+    'muted': '#7f8c8d',
+    'row_border': '#ddd'
+}
+
+OUTLOOK_THEME = {
+    'font_family': "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif",
+    'title': '#0078d4',
+    'heading': '#323130',
+    'accent': '#0078d4',
+    'summary_background': '#f3f2f1',
+    'callout_background': '#deecf9',
+    'success': '#107c10',
+    'letter': '#0078d4',
+    'warning': '#d83b01',
+    'muted': '#605e5c',
+    'row_border': '#edebe9'
+}
+
+class CompiledTemplate:
+    # Splits a str.format template into literal fragments and fields once,
+    # so rendering is a single join instead of re-parsing or concatenating
+    def __init__(self, source):
+        self.parts = [
+            (literal, field, spec or '')
+            for literal, field, spec, _ in Formatter().parse(source)
+        ]
+
+    def render(self, values):
+        pieces = []
+        for literal, field, spec in self.parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(format(values[field], spec))
+        return ''.join(pieces)
+
+class GradeAlertTemplate:
+    def __init__(self, name, theme):
+        self.name = name
+        # Theme colors are substituted at compile time; only grade data is left to render
+        self.body = CompiledTemplate(Template(GRADE_ALERT_SKELETON).substitute(theme))
+        self.row = CompiledTemplate(Template(CATEGORY_ROW).substitute(theme))
+        self.breakdown_header = Template(CATEGORY_BREAKDOWN_HEADER).substitute(theme)
+        self.target_met = Template(TARGET_MET).substitute(theme)
+        self.target_missed = CompiledTemplate(Template(TARGET_MISSED).substitute(theme))
+
+    def render(self, course_name, grade_data):
+        return f"Grade Update: {course_name}", self.body.render({
+            'course_name': course_name,
+            'current_grade': grade_data.get('current_grade', 'N/A'),
+            'letter_grade': grade_data.get('letter_grade', 'N/A'),
+            'category_breakdown': self._render_breakdown(grade_data.get('category_breakdown', {})),
+            'target_grade': grade_data.get('target_grade', 85),
+            'progress_message': self._render_progress(grade_data)
+        })
+
+    def cache_key(self, course_name, grade_data):
+        # repr keeps 85 and 85.0 (which render differently) apart and is far
+        # cheaper than a canonical JSON dump
+        return (self.name, course_name, repr(grade_data))
+
+    def _render_breakdown(self, categories):
+        if not categories:
+            return ''
+
+        rows = [
+            self.row.render({'category': category, 'average': data.get('average', 0), 'weight': data.get('weight', 0)})
+            for category, data in categories.items()
+        ]
+        return ''.join([self.breakdown_header, *rows, CATEGORY_BREAKDOWN_FOOTER])
+
+    def _render_progress(self, grade_data):
+        current = grade_data.get('current_grade', 0)
+        target = grade_data.get('target_grade', 85)
+
+        if current >= target:
+            return self.target_met
+        return self.target_missed.render({'diff': target - current})
+
+class RenderCache:
+    # LRU of rendered (subject, html) pairs keyed by template, course and grade
+    # snapshot, so one alert sent to many recipients renders once
+    def __init__(self, maxsize=RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template, course_name, grade_data):
+        key = template.cache_key(course_name, grade_data)
+        with self._lock:
+            rendered = self._entries.get(key)
+            if rendered is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rendered
+
+        rendered = template.render(course_name, grade_data)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = rendered
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return rendered
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+GMAIL_GRADE_ALERT = GradeAlertTemplate('gmail', GMAIL_THEME)
+OUTLOOK_GRADE_ALERT = GradeAlertTemplate('outlook', OUTLOOK_THEME)
+RENDER_CACHE = RenderCache()
+
+def render_grade_alert(template, course_name, grade_data):
+    return RENDER_CACHE.render(template, course_name, grade_data)
@@ -5,32 +5,71 @@ from application.models.syllabus_weight import SyllabusWeight
 class GradeCalculator:
 
     @staticmethod
-    def calculate_category_average(assignments, category):
-        category_assignments = [a for a in assignments if a.category == category and a.grade]
-        if not category_assignments:
-            return None
-        total_points = 0
-        earned_points = 0
-        for assignment in category_assignments:
-            if assignment.grade and assignment.grade.points_earned is not None:
-                total_points += assignment.max_points
-                earned_points += assignment.grade.points_earned
-        if total_points == 0:
-            return None
-        return (earned_points / total_points) * 100
+    def build_columns(courses):
+        # Flatten ORM courses into the columnar layout consumed by calculate_batch
+        assignment_columns = {'course_id': [], 'category': [], 'max_points': [], 'points_earned': []}
+        weight_columns = {'course_id': [], 'category': [], 'weight': []}
+        for course in courses:
+            for assignment in course.assignments:
+                if not assignment.grade:
+                    continue
+                assignment_columns['course_id'].append(course.id)
+                assignment_columns['category'].append(assignment.category)
+                assignment_columns['max_points'].append(assignment.max_points)
+                assignment_columns['points_earned'].append(assignment.grade.points_earned)
+            for weight in course.syllabus_weights:
+                weight_columns['course_id'].append(course.id)
+                weight_columns['category'].append(weight.category)
+                weight_columns['weight'].append(weight.weight)
+        return assignment_columns, weight_columns
 
     @staticmethod
-    def calculate_course_grade(course):
-        syllabus_weights = course.syllabus_weights
-        assignments = course.assignments
-        if not syllabus_weights:
+    def calculate_batch(course_ids, assignment_columns, weight_columns):
+        # Grouped pass over graded assignment rows: (course_id, category) -> [earned, total]
+        sums = {}
+        for course_id, category, max_points, points_earned in zip(
+            assignment_columns['course_id'],
+            assignment_columns['category'],
+            assignment_columns['max_points'],
+            assignment_columns['points_earned']
+        ):
+            if points_earned is None:
+                continue
+            key = (course_id, category)
+            bucket = sums.get(key)
+            if bucket is None:
+                sums[key] = [points_earned, max_points]
+            else:
+                bucket[0] += points_earned
+                bucket[1] += max_points
+
+        # Group weight rows by course, preserving syllabus order
+        weights_by_course = {}
+        for course_id, category, weight in zip(
+            weight_columns['course_id'],
+            weight_columns['category'],
+            weight_columns['weight']
+        ):
+            weights_by_course.setdefault(course_id, []).append((category, weight))
+
+        results = {}
+        for course_id in course_ids:
+            results[course_id] = GradeCalculator._grade_from_groups(
+                weights_by_course.get(course_id, []),
+                lambda category, course_id=course_id: sums.get((course_id, category))
+            )
+        return results
+
+    @staticmethod
+    def _grade_from_groups(weights, category_sums):
+        if not weights:
             return {
                 'final_grade': None,
                 'letter_grade': None,
                 'breakdown': [],
                 'error': 'No syllabus weights defined for this course'
             }
-        total_weight = sum(w.weight for w in syllabus_weights)
+        total_weight = sum(weight for _, weight in weights)
         if abs(total_weight - 100.0) > 0.01:
             return {
                 'final_grade': None,
@@ -41,19 +80,20 @@ class GradeCalculator:
         breakdown = []
         weighted_grade = 0.0
         total_weight_applied = 0.0
-        for weight in syllabus_weights:
-            category_avg = GradeCalculator.calculate_category_average(assignments, weight.category)
+        for category, weight in weights:
+            bucket = category_sums(category)
+            category_avg = (bucket[0] / bucket[1]) * 100 if bucket and bucket[1] != 0 else None
             category_data = {
-                'category': weight.category,
-                'weight': weight.weight,
+                'category': category,
+                'weight': weight,
                 'average': category_avg,
                 'weighted_contribution': None
             }
             if category_avg is not None:
-                contribution = (category_avg * weight.weight) / 100
+                contribution = (category_avg * weight) / 100
                 category_data['weighted_contribution'] = contribution
                 weighted_grade += contribution
-                total_weight_applied += weight.weight
+                total_weight_applied += weight
             breakdown.append(category_data)
         if total_weight_applied > 0:
             final_grade = weighted_grade
@@ -70,6 +110,17 @@ class GradeCalculator:
             'completion_percentage': round((total_weight_applied / 100) * 100, 2)
         }
 
+    @staticmethod
+    def calculate_course_grades(courses):
+        assignment_columns, weight_columns = GradeCalculator.build_columns(courses)
+        return GradeCalculator.calculate_batch(
+            [course.id for course in courses], assignment_columns, weight_columns
+        )
+
+    @staticmethod
+    def calculate_course_grade(course):
+        return GradeCalculator.calculate_course_grades([course])[course.id]
+
     @staticmethod
     def get_letter_grade(percentage):
         if percentage is None:
@@ -0,0 +1,98 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+from application import db
+
+class PaginationError(ValueError):
+    pass
+
+def encode_cursor(values):
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise PaginationError('Invalid cursor')
+
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            if value is not None and column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None:
+                value = column.type.python_type(value)
+        except (TypeError, ValueError):
+            raise PaginationError('Invalid cursor')
+        decoded.append(value)
+    return decoded
+
+class KeysetPaginator:
+    # Column-only keyset pages: rows are serialized straight from tuples, never hydrated as models
+    def __init__(self, model, fields, order_by, descending=False, default_limit=50, max_limit=200):
+        self.model = model
+        self.fields = tuple(fields)
+        self.order_by = tuple(order_by)
+        self.descending = descending
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def _limit(self, value):
+        if value is None or value == '':
+            return self.default_limit
+        try:
+            limit = int(value)
+        except ValueError:
+            raise PaginationError('limit must be an integer')
+        if limit < 1:
+            raise PaginationError('limit must be positive')
+        return min(limit, self.max_limit)
+
+    def _fields(self, value):
+        if not value:
+            return self.fields
+        requested = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+        return requested or self.fields
+
+    def page(self, args, *criteria):
+        limit = self._limit(args.get('limit'))
+        fields = self._fields(args.get('fields'))
+        cursor = args.get('cursor')
+
+        order_columns = [getattr(self.model, name) for name in self.order_by]
+        selected = list(dict.fromkeys(fields + self.order_by))
+        query = db.session.query(*[getattr(self.model, name) for name in selected]).filter(*criteria)
+
+        if cursor:
+            position = tuple_(*order_columns)
+            values = tuple_(*decode_cursor(cursor, order_columns))
+            query = query.filter(position < values if self.descending else position > values)
+
+        query = query.order_by(*[column.desc() if self.descending else column for column in order_columns])
+        rows = query.limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]._mapping
+            next_cursor = encode_cursor([last[name] for name in self.order_by])
+
+        items = []
+        for row in rows:
+            mapping = row._mapping
+            items.append({
+                name: mapping[name].isoformat() if isinstance(mapping[name], datetime) else mapping[name]
+                for name in fields
+            })
+
+        return items, {'limit': limit, 'next_cursor': next_cursor}
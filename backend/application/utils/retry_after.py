@@ -0,0 +1,23 @@
+import math
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+def retry_after_seconds(value):
+    # Retry-After is either delta-seconds (possibly fractional) or an HTTP date;
+    # an unparseable value yields None so the caller falls back to its own delay
+    value = str(value or '').strip()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,53 @@
+"""
+Email template benchmark: renders grade alert bodies through the precompiled
+Gmail and Outlook templates and reports renders/sec, uncached and through the
+render cache (one course snapshot sent to many recipients).
+
+    python benchmarks/bench_email_render.py --renders 20000 --categories 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from application.utils.email_templates import GMAIL_GRADE_ALERT, OUTLOOK_GRADE_ALERT, RenderCache
+
+def grade_data(index, categories):
+    return {
+        'current_grade': 70 + index % 30,
+        'letter_grade': 'B',
+        'target_grade': 85,
+        'category_breakdown': {
+            f'Category {c}': {'average': 60 + (index + c) % 40, 'weight': 100 / categories}
+            for c in range(categories)
+        }
+    }
+
+def measure(label, renders, render):
+    start = time.perf_counter()
+    for i in range(renders):
+        render(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {renders / elapsed:>12.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--renders', type=int, default=20000)
+    parser.add_argument('--categories', type=int, default=4)
+    parser.add_argument('--recipients', type=int, default=25, help='recipients per course snapshot for the cached run')
+    args = parser.parse_args()
+
+    snapshots = [grade_data(i, args.categories) for i in range(args.renders // args.recipients + 1)]
+    print(f"{'template':<24} {'renders/sec':>12}")
+    for template in (GMAIL_GRADE_ALERT, OUTLOOK_GRADE_ALERT):
+        measure(f'{template.name} uncached', args.renders,
+                lambda i: template.render(f'Course {i}', snapshots[i % len(snapshots)]))
+
+        cache = RenderCache(maxsize=len(snapshots))
+        measure(f'{template.name} cached', args.renders,
+                lambda i: cache.render(template, f'Course {i // args.recipients}', snapshots[i // args.recipients]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Gmail batch sending benchmark: sends N grade alerts through
+GmailService.send_batch_alerts against a local fake Gmail API and reports
+messages/sec for each batch size (1 = individual sends on the thread pool).
+
+    python benchmarks/bench_gmail_batch.py --messages 500 --batch-sizes 1,10,50,100 --latency-ms 20
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from application.services import gmail_service
+from application.services.gmail_service import GmailService, GMAIL_CLIENT_CACHE
+from tests.stub_server import StubServer, gmail_api_handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--batch-sizes', default='1,10,50,100')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated server latency per HTTP request')
+    args = parser.parse_args()
+
+    # Seed a live token so no OAuth refresh leaves the machine
+    def seeded_refresh(credentials, request):
+        credentials.token = 'bench-token'
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    gmail_service.Credentials.refresh = seeded_refresh
+    os.environ.update({
+        'USE_SYNTHETIC_DATA': 'false',
+        'GMAIL_CLIENT_ID': 'bench-client',
+        'GMAIL_CLIENT_SECRET': 'bench-secret',
+        'GMAIL_REFRESH_TOKEN': 'bench-refresh'
+    })
+
+    alerts = [{
+        'email': f'student{i}@example.com',
+        'course_name': 'CS 3520',
+        'grade_data': {'current_grade': 80 + i % 20, 'letter_grade': 'B', 'target_grade': 85}
+    } for i in range(args.messages)]
+
+    app = Flask(__name__)
+    handler = gmail_api_handler(latency=args.latency_ms / 1000)
+    with StubServer(handler) as server, app.app_context():
+        os.environ['GMAIL_API_ENDPOINT'] = server.url
+        print(f"{'batch size':>10} {'requests':>9} {'seconds':>8} {'msgs/sec':>9}")
+        for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+            os.environ['GMAIL_BATCH_SIZE'] = str(batch_size)
+            GMAIL_CLIENT_CACHE.clear()
+            service = GmailService()
+            service._get_client()
+            server.requests.clear()
+
+            start = time.perf_counter()
+            results = service.send_batch_alerts(alerts)
+            elapsed = time.perf_counter() - start
+
+            failed = sum(1 for result in results if not result['success'])
+            print(f"{batch_size:>10} {len(server.requests):>9} {elapsed:>8.2f} {len(alerts) / elapsed:>9.1f}"
+                  + (f"  ({failed} failed)" if failed else ''))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Gradebook benchmark: seeds one course with N graded assignments and compares
+building the gradebook from ORM objects (assignments plus lazy-loaded grades)
+with the streaming GET /api/grades/course/<id> endpoint, which serializes row
+tuples from a single joined SELECT.
+
+    python benchmarks/bench_gradebook.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import json
+from flask_jwt_extended import create_access_token
+from application import create_app, db
+from application.models.assignment import Assignment
+from application.models.course import Course
+from application.models.grade import Grade
+from application.models.user import User
+from application.utils.bulk_ops import bulk_insert_returning, iter_chunks
+
+CATEGORIES = ['Homework', 'Quiz', 'Exam', 'Project']
+
+def seed_course(user_id, size):
+    course = Course(user_id=user_id, course_code=f'BENCH {size}', course_name='Gradebook benchmark')
+    db.session.add(course)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    for chunk in iter_chunks(range(size), 5000):
+        assignment_ids = bulk_insert_returning(Assignment, [{
+            'course_id': course.id,
+            'brightspace_assignment_id': f'ASSIGN{i}',
+            'name': f'{CATEGORIES[i % 4]} {i}',
+            'category': CATEGORIES[i % 4],
+            'max_points': 100.0,
+            'due_date': now,
+            'created_at': now,
+            'updated_at': now
+        } for i in chunk], Assignment.id)
+        db.session.execute(db.insert(Grade), [{
+            'assignment_id': row.id,
+            'points_earned': 60.0 + row.id % 40,
+            'percentage': 60.0 + row.id % 40,
+            'graded_date': now,
+            'feedback': 'Good job!',
+            'created_at': now,
+            'updated_at': now
+        } for row in assignment_ids])
+    db.session.commit()
+    return course.id
+
+def orm_gradebook(course_id):
+    course = db.session.get(Course, course_id)
+    return json.dumps({
+        'course_id': course.id,
+        'assignments': [assignment.to_dict(include_grade=True) for assignment in course.assignments]
+    })
+
+def measure(run):
+    start = time.perf_counter()
+    payload = run()
+    return (time.perf_counter() - start) * 1000, len(payload)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--config', default='testing')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    client = app.test_client()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(email='bench@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        print(f"{'assignments':>12} {'orm ms':>10} {'stream ms':>10} {'speedup':>8} {'bytes':>12}")
+        for size in args.sizes:
+            course_id = seed_course(user.id, size)
+
+            db.session.expire_all()
+            orm_ms, _ = measure(lambda: orm_gradebook(course_id))
+            db.session.expire_all()
+            stream_ms, payload_bytes = measure(
+                lambda: client.get(f'/api/grades/course/{course_id}', headers=headers).get_data()
+            )
+            print(f'{size:>12} {orm_ms:>10.1f} {stream_ms:>10.1f} {orm_ms / stream_ms:>7.1f}x {payload_bytes:>12}')
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    main()
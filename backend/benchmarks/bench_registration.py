@@ -0,0 +1,86 @@
+"""
+Registration benchmark: registers N users whose synthetic Brightspace
+gradebooks hold M assignments per course, reports per-registration latency,
+then drains the queued course imports through the job worker.
+
+    python benchmarks/bench_registration.py --users 50 --assignments 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from application import create_app, db
+from application.services.brightspace_service import BrightspaceService
+from application.services.job_queue import JobWorker
+
+def patch_gradebook_size(assignment_count):
+    categories = ['Homework', 'Quiz', 'Exam', 'Project']
+
+    def assignments(self, course_id):
+        return [{
+            'brightspace_assignment_id': f'ASSIGN{i}',
+            'name': f'{categories[i % 4]} {i}',
+            'category': categories[i % 4],
+            'max_points': 100,
+            'due_date': datetime.now() + timedelta(days=i),
+            'description': f'Assignment {i}'
+        } for i in range(assignment_count)]
+
+    def grades(self):
+        return {f'ASSIGN{i}': {
+            'points_earned': 75 + (i % 25),
+            'graded_date': datetime.now(),
+            'feedback': 'Good job!'
+        } for i in range(assignment_count)}
+
+    BrightspaceService._generate_synthetic_assignments = assignments
+    BrightspaceService._generate_synthetic_grades = grades
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--assignments', type=int, default=100)
+    parser.add_argument('--config', default='testing')
+    args = parser.parse_args()
+
+    patch_gradebook_size(args.assignments)
+    app = create_app(args.config)
+    client = app.test_client()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        latencies = []
+        for i in range(args.users):
+            start = time.perf_counter()
+            response = client.post('/api/auth/register', json={
+                'email': f'bench{i}@example.com',
+                'password': 'password123'
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code in (201, 202), response.json
+
+        worker = JobWorker(app)
+        start = time.perf_counter()
+        while worker.run_once():
+            pass
+        drain_seconds = time.perf_counter() - start
+
+        db.session.remove()
+        db.drop_all()
+
+    latencies.sort()
+    print(f'users={args.users} assignments/course={args.assignments}')
+    print(f'mean={statistics.mean(latencies):.1f}ms '
+          f'p50={latencies[len(latencies) // 2]:.1f}ms '
+          f'p99={latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.1f}ms')
+    print(f'imports drained in {drain_seconds:.2f}s ({args.users / drain_seconds:.1f} users/sec)')
+
+if __name__ == '__main__':
+    main()
@@ -32,6 +32,27 @@ class Config:
 
     USE_SYNTHETIC_DATA = os.getenv('USE_SYNTHETIC_DATA', 'false').lower() == 'true'
 
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2.0'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', '30.0'))
+    JOB_VISIBILITY_TIMEOUT = int(os.getenv('JOB_VISIBILITY_TIMEOUT', '300'))
+    JOB_BATCH_SIZE = int(os.getenv('JOB_BATCH_SIZE', '50'))
+    WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '2'))
+
+    NOTIFY_MAX_CONCURRENCY = int(os.getenv('NOTIFY_MAX_CONCURRENCY', '8'))
+    NOTIFY_PROVIDER_TIMEOUT = float(os.getenv('NOTIFY_PROVIDER_TIMEOUT', '30.0'))
+
+    SYNC_CHUNK_SIZE = int(os.getenv('SYNC_CHUNK_SIZE', '500'))
+    GRADE_BULK_MAX_ROWS = int(os.getenv('GRADE_BULK_MAX_ROWS', '5000'))
+
+    GRADE_SCAN_INTERVAL = int(os.getenv('GRADE_SCAN_INTERVAL', '3600'))
+    GRADE_SCAN_CHUNK_SIZE = int(os.getenv('GRADE_SCAN_CHUNK_SIZE', '500'))
+    GRADE_SCAN_PARALLELISM = int(os.getenv('GRADE_SCAN_PARALLELISM', '4'))
+    GRADE_SCAN_ALERT_COOLDOWN_HOURS = float(os.getenv('GRADE_SCAN_ALERT_COOLDOWN_HOURS', '24'))
+
+    SCHEMA_VERSION_CHECK = True
+    AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', 'false').lower() == 'true'
+
 class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
@@ -43,6 +64,9 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'postgresql://localhost/gradesync_test'
+    # Test fixtures build and drop the schema themselves
+    SCHEMA_VERSION_CHECK = False
+    AUTO_MIGRATE = False
 
 config = {
     'development': DevelopmentConfig,
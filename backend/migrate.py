@@ -0,0 +1,38 @@
+"""
+Applies pending schema migrations (application/migrations) and records them
+in schema_migrations. Run before starting the app after every deploy; app
+startup refuses to boot against an older schema.
+
+    python migrate.py --config production
+    python migrate.py --status
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from application import create_app, db
+from application.migrations import current_version, discover, upgrade
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'production'))
+    parser.add_argument('--status', action='store_true', help='list migrations and exit without applying them')
+    args = parser.parse_args()
+
+    app = create_app(args.config, check_schema=False)
+    with app.app_context():
+        if args.status:
+            with db.engine.connect() as connection:
+                current = current_version(connection)
+            for migration in discover():
+                state = 'applied' if migration.version <= current else 'pending'
+                print(f'{migration.version:04d}_{migration.name:<32} {state}')
+            return
+
+        applied = upgrade(db.engine)
+        print(f'Applied {len(applied)} migrations' if applied else 'Schema is up to date')
+
+if __name__ == '__main__':
+    main()
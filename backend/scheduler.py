@@ -0,0 +1,32 @@
+"""
+Periodic scheduler. Runs the fleet-wide grade scan every
+GRADE_SCAN_INTERVAL seconds and leaves alert delivery to worker.py.
+
+    python scheduler.py
+"""
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from application import create_app
+from application.services.grade_scan_service import GradeScanService
+
+config_name = os.getenv('FLASK_ENV', 'production')
+app = create_app(config_name)
+
+if __name__ == "__main__":
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stopped.set())
+    signal.signal(signal.SIGINT, lambda *args: stopped.set())
+
+    interval = app.config.get('GRADE_SCAN_INTERVAL', 3600)
+    app.logger.info(f"Scheduler started (grade scan every {interval}s)")
+    while not stopped.is_set():
+        try:
+            GradeScanService(app).run()
+        except Exception as e:
+            app.logger.error(f"Grade scan failed: {e}")
+        stopped.wait(interval)
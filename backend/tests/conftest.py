@@ -0,0 +1,54 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from application import create_app, db
+from application.models.user import User
+from application.models.course import Course
+from application.models.assignment import Assignment
+from application.models.grade import Grade
+from application.models.syllabus_weight import SyllabusWeight
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def user(app):
+    user = User(email='student@example.com', first_name='Test', last_name='Student')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+@pytest.fixture
+def make_course(user):
+    def _make_course(assignment_count=7, course_code='CS 3520'):
+        course = Course(user_id=user.id, course_code=course_code, course_name='Programming in C++')
+        for category, weight in [('Homework', 30.0), ('Quiz', 20.0), ('Exam', 40.0), ('Project', 10.0)]:
+            course.syllabus_weights.append(SyllabusWeight(category=category, weight=weight))
+        categories = ['Homework', 'Quiz', 'Exam', 'Project']
+        for i in range(assignment_count):
+            assignment = Assignment(
+                brightspace_assignment_id=f'ASSIGN{i}',
+                name=f'Assignment {i}',
+                category=categories[i % len(categories)],
+                max_points=100.0
+            )
+            assignment.grade = Grade(points_earned=80.0 + (i % 20), percentage=80.0 + (i % 20))
+            course.assignments.append(assignment)
+        db.session.add(course)
+        db.session.commit()
+        return course
+    return _make_course
@@ -0,0 +1,195 @@
+import base64
+import email
+import hashlib
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubServer:
+    # Minimal threaded HTTP server for exercising API clients against local fakes.
+    # handler(method, path, headers, body) -> (status, headers, body)
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                stub.requests.append((self.command, self.path))
+                status, headers, payload = stub.handler(self.command, self.path, self.headers, body)
+                if not isinstance(payload, (bytes, str)):
+                    payload = json.dumps(payload)
+                    headers = dict({'Content-Type': 'application/json'}, **(headers or {}))
+                if isinstance(payload, str):
+                    payload = payload.encode('utf-8')
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _handle
+            do_POST = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+def gmail_api_handler(reject=(), latency=0.0):
+    # Fake Gmail API: single messages.send calls plus multipart /batch/gmail/v1
+    # requests; recipients in reject get a 400 back
+    sent = []
+
+    def send(raw):
+        message = email.message_from_bytes(base64.urlsafe_b64decode(raw))
+        if message['To'] in reject:
+            return 400, {'error': {'code': 400, 'message': f"Invalid To header: {message['To']}"}}
+        sent.append(message['To'])
+        return 200, {'id': str(len(sent)), 'labelIds': ['SENT']}
+
+    def handler(method, path, headers, body):
+        if latency:
+            time.sleep(latency)
+        if path.startswith('/gmail/v1/users/me/messages/send'):
+            status, payload = send(json.loads(body)['raw'])
+            return status, {}, payload
+        if path == '/batch/gmail/v1':
+            container = email.message_from_bytes(
+                f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode('utf-8') + body
+            )
+            boundary = 'batch_response_boundary'
+            parts = []
+            for part in container.get_payload():
+                inner = part.get_payload()
+                status, payload = send(json.loads(re.split(r'\r?\n\r?\n', inner, maxsplit=1)[1])['raw'])
+                content_id = part['Content-ID'].strip('<>')
+                parts.append(
+                    f'--{boundary}\r\nContent-Type: application/http\r\n'
+                    f'Content-ID: <response-{content_id}>\r\n\r\n'
+                    f'HTTP/1.1 {status} {"OK" if status == 200 else "Bad Request"}\r\n'
+                    f'Content-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n'
+                )
+            response = ''.join(parts) + f'--{boundary}--\r\n'
+            return 200, {'Content-Type': f'multipart/mixed; boundary={boundary}'}, response
+        return 404, {}, {}
+
+    handler.sent = sent
+    return handler
+
+class D2LApiHandler:
+    # Fake Brightspace (D2L) API: auth, enrollments, activities and grade values
+    # for course_count courses of activity_count graded assignments each. With
+    # page_size set, lists are paged: bookmarks for enrollments and activities,
+    # Next links for grade values. With etags set, unpaged lists carry an ETag
+    # and answer a matching If-None-Match with 304. grade_points and
+    # graded_dates override PointsNumerator and GradedDate by grade object id;
+    # throttle holds (status, Retry-After) responses served to the next data
+    # requests
+    def __init__(self, course_count=3, activity_count=5, latency=0.0, page_size=None, etags=False):
+        self.courses = {
+            str(1000 + c): {
+                'Id': 1000 + c,
+                'Code': f'CS {3500 + c}',
+                'Name': f'Course {c} Fall',
+            }
+            for c in range(course_count)
+        }
+        self.activity_count = activity_count
+        self.latency = latency
+        self.page_size = page_size
+        self.etags = etags
+        self.grade_points = {}
+        self.graded_dates = {}
+        self.throttle = []
+
+    def activities(self, course_id):
+        return [{
+            'Id': int(course_id) * 100 + i,
+            'Name': f'Assignment {i}',
+            'ActivityType': 'Assignment' if i % 2 else 'Quiz',
+            'MaxPoints': 100,
+            'DueDate': '2026-05-01T12:00:00Z',
+            'Description': {'Text': f'Assignment {i}'}
+        } for i in range(self.activity_count)]
+
+    def grade_values(self, course_id):
+        return [{
+            'GradeObjectIdentifier': int(course_id) * 100 + i,
+            'PointsNumerator': self.grade_points.get(int(course_id) * 100 + i, 70 + i),
+            'GradedDate': self.graded_dates.get(int(course_id) * 100 + i, '2026-05-02T12:00:00Z'),
+            'Comments': {'Text': 'Good job!'}
+        } for i in range(self.activity_count)]
+
+    def conditional(self, headers, payload):
+        if not self.etags or self.page_size:
+            return 200, {}, payload
+        etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest() + '"'
+        if headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag}, payload
+
+    def paged_result_set(self, items, query):
+        if not self.page_size:
+            return items
+        start = int(query.get('bookmark', ['0'])[0])
+        end = start + self.page_size
+        return {
+            'PagingInfo': {'Bookmark': str(end) if end < len(items) else None, 'HasMoreItems': end < len(items)},
+            'Items': items[start:end]
+        }
+
+    def object_list_page(self, items, host, path, query):
+        if not self.page_size:
+            return items
+        start = int(query.get('page', ['0'])[0])
+        end = start + self.page_size
+        return {
+            'Objects': items[start:end],
+            'Next': f"http://{host}{path}?page={end}" if end < len(items) else None
+        }
+
+    def __call__(self, method, path, headers, body):
+        if self.latency:
+            time.sleep(self.latency)
+        path, _, query_string = path.partition('?')
+        parts = path.strip('/').split('/')
+        if parts[:4] == ['d2l', 'api', 'lp', 'auth']:
+            return 200, {}, {'access_token': 'd2l-token', 'expires_in': 3600}
+        if headers.get('Authorization') != 'Bearer d2l-token':
+            return 401, {}, {}
+        if self.throttle:
+            status, retry_after = self.throttle.pop(0)
+            return status, {'Retry-After': retry_after} if retry_after is not None else {}, {}
+        return self.data(parts, path, parse_qs(query_string), headers)
+
+    def data(self, parts, path, query, headers):
+        if parts[:6] == ['d2l', 'api', 'lp', '1.0', 'enrollments', 'myenrollments']:
+            items = [{'OrgUnit': org} for org in self.courses.values()]
+            return 200, {}, self.paged_result_set(items, query) if self.page_size else {'Items': items}
+        if parts[:4] == ['d2l', 'api', 'le', '1.0'] and parts[4] in self.courses:
+            if parts[5] == 'activities':
+                return self.conditional(headers, self.paged_result_set(self.activities(parts[4]), query))
+            if parts[5:7] == ['grades', 'values']:
+                return self.conditional(
+                    headers, self.object_list_page(self.grade_values(parts[4]), headers['Host'], path, query)
+                )
+        return 404, {}, {}
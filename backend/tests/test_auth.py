@@ -46,3 +46,28 @@ def test_login_invalid_credentials(client):
         'password': 'wrongpassword'
     })
     assert response.status_code == 401
+
+def test_register_enqueues_course_import(app, client):
+    from application.services.job_queue import JobWorker
+
+    response = client.post('/api/auth/register', json={
+        'email': 'test@example.com',
+        'password': 'password123'
+    })
+    assert response.status_code == 201
+    assert response.json['import_job']['status'] == 'queued'
+    headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+
+    response = client.get('/api/auth/import-status', headers=headers)
+    assert response.json['job']['status'] == 'queued'
+
+    worker = JobWorker(app)
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+
+    response = client.get('/api/auth/import-status', headers=headers)
+    assert response.json['job']['status'] == 'succeeded'
+    assert response.json['job']['result'] == {'imported_courses': 3}
+
+    response = client.get('/api/courses/', headers=headers)
+    assert len(response.json['courses']) == 3
@@ -0,0 +1,373 @@
+import time
+from datetime import datetime
+import pytest
+from application.models.course import Course
+from application.services import brightspace_service
+from application.services.brightspace_service import BrightspaceAPIError, BrightspaceService, RateLimiter
+from application.services.course_import_service import CourseImportService
+from tests.stub_server import StubServer, D2LApiHandler
+
+@pytest.fixture
+def d2l_env(app, monkeypatch):
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('BRIGHTSPACE_APP_ID', 'app-id')
+    monkeypatch.setenv('BRIGHTSPACE_APP_KEY', 'app-key')
+    monkeypatch.setenv('BRIGHTSPACE_USER_ID', 'd2l-user')
+    monkeypatch.setenv('BRIGHTSPACE_USER_KEY', 'd2l-user-key')
+    monkeypatch.setenv('BRIGHTSPACE_RETRY_BACKOFF', '0.01')
+    monkeypatch.setattr(brightspace_service, '_rate_limiter', None)
+    brightspace_service.BRIGHTSPACE_TOKEN_CACHE.clear()
+
+    def configure(server, max_concurrency=8):
+        monkeypatch.setenv('BRIGHTSPACE_BASE_URL', server.url)
+        monkeypatch.setenv('BRIGHTSPACE_MAX_CONCURRENCY', str(max_concurrency))
+
+    yield configure
+    brightspace_service.BRIGHTSPACE_TOKEN_CACHE.clear()
+
+def test_brightspace_authenticates_once(d2l_env):
+    with StubServer(D2LApiHandler(course_count=2)) as server:
+        d2l_env(server)
+        service = BrightspaceService()
+        courses = service.get_courses(1)
+        for course in courses:
+            service.get_assignments(course['brightspace_course_id'])
+
+    assert [course['course_code'] for course in courses] == ['CS 3500', 'CS 3501']
+    assert len([path for _, path in server.requests if '/lp/auth' in path]) == 1
+    assert BrightspaceService.cache_stats() == {'hits': 2, 'misses': 1, 'tokens': 1}
+
+def test_import_fetches_courses_concurrently(app, user, d2l_env):
+    with StubServer(D2LApiHandler(course_count=4, activity_count=3, latency=0.1)) as server:
+        d2l_env(server, max_concurrency=8)
+        start = time.monotonic()
+        courses = CourseImportService().import_courses(user.id)
+        elapsed = time.monotonic() - start
+
+    assert len(courses) == 4
+    assert Course.query.count() == 4
+    assert all(len(course.assignments) == 3 for course in courses)
+    assert all(assignment.grade is not None for course in courses for assignment in course.assignments)
+    # auth + enrollments + 8 per-course fetches in one concurrent wave
+    assert elapsed < 0.6
+
+def test_brightspace_iterators_follow_bookmarks(d2l_env):
+    with StubServer(D2LApiHandler(course_count=5, activity_count=12, page_size=5)) as server:
+        d2l_env(server)
+        service = BrightspaceService()
+        courses = list(service.iter_courses(1))
+        assignments = list(service.iter_assignments('1000'))
+        grades = dict(service.iter_grades('1000', 1))
+
+    assert len(courses) == 5
+    assert len(assignments) == 12
+    assert len(grades) == 12
+    paths = [path for _, path in server.requests]
+    assert sum('/myenrollments/' in path for path in paths) == 1
+    assert sum('/activities/' in path for path in paths) == 3
+    assert sum('/grades/values/' in path for path in paths) == 3
+
+def test_sync_streams_pages_in_chunks(app, user, d2l_env):
+    from application import db
+    from application.models.grade import Grade
+    from application.services.course_sync_service import CourseSyncService
+
+    course = Course(user_id=user.id, course_code='CS 3500', course_name='Course 0 Fall', brightspace_course_id='1000')
+    db.session.add(course)
+    db.session.commit()
+
+    with StubServer(D2LApiHandler(course_count=1, activity_count=23, page_size=10)) as server:
+        d2l_env(server)
+        stats = CourseSyncService(chunk_size=4).sync(course, user.id)
+        db.session.commit()
+
+    assert stats['counts']['assignments_received'] == 23
+    assert stats['counts']['assignments_inserted'] == 23
+    assert stats['counts']['grades_upserted'] == 23
+    assert Grade.query.count() == 23
+
+def _remote_course(user):
+    from application import db
+
+    course = Course(user_id=user.id, course_code='CS 3500', course_name='Course 0 Fall', brightspace_course_id='1000')
+    db.session.add(course)
+    db.session.commit()
+    return course
+
+def _writes(statements):
+    return [s for s in statements if s.lstrip().split()[0].upper() in ('INSERT', 'UPDATE', 'DELETE')]
+
+def test_unchanged_sync_writes_nothing(app, user, d2l_env):
+    from application import db
+    from application.services.course_sync_service import CourseSyncService
+    from tests.test_courses import count_queries
+
+    course = _remote_course(user)
+    with StubServer(D2LApiHandler(course_count=1, activity_count=6)) as server:
+        d2l_env(server)
+        first = CourseSyncService().sync(course, user.id)
+        db.session.commit()
+
+        with count_queries() as statements:
+            second = CourseSyncService().sync(course, user.id)
+            db.session.commit()
+
+    assert first['updated'] == 12
+    assert second['updated'] == 0
+    assert second['skipped'] == 12
+    assert second['not_modified'] == []
+    assert _writes(statements) == []
+
+def test_sync_skips_resources_whose_etag_matches(app, user, d2l_env):
+    from application import db
+    from application.models.grade import Grade
+    from application.models.course_sync_state import CourseSyncState
+    from application.services.course_sync_service import CourseSyncService
+    from tests.test_courses import count_queries
+
+    course = _remote_course(user)
+    handler = D2LApiHandler(course_count=1, activity_count=6, etags=True)
+    with StubServer(handler) as server:
+        d2l_env(server)
+        CourseSyncService().sync(course, user.id)
+        db.session.commit()
+        state = CourseSyncState.query.filter_by(course_id=course.id).one()
+        assert state.assignments_etag and state.grades_etag
+
+        with count_queries() as statements:
+            unchanged = CourseSyncService().sync(course, user.id)
+            db.session.commit()
+
+        handler.grade_points[100002] = 99
+        changed = CourseSyncService().sync(course, user.id)
+        db.session.commit()
+
+    assert unchanged['not_modified'] == ['assignments', 'grades']
+    assert unchanged['counts']['grades_received'] == 0
+    assert _writes(statements) == []
+
+    assert changed['not_modified'] == ['assignments']
+    assert changed['counts']['grades_upserted'] == 1
+    assert changed['counts']['grades_unchanged'] == 5
+    assert Grade.query.filter_by(points_earned=99).count() == 1
+
+def test_sync_only_compares_grades_newer_than_the_watermark(app, user, d2l_env):
+    from application import db
+    from application.models.assignment import Assignment
+    from application.models.grade import Grade
+    from application.models.course_sync_state import CourseSyncState
+    from application.services.course_sync_service import CourseSyncService
+
+    course = _remote_course(user)
+    handler = D2LApiHandler(course_count=1, activity_count=6)
+    with StubServer(handler) as server:
+        d2l_env(server)
+        CourseSyncService().sync(course, user.id)
+        db.session.commit()
+
+        # One grade row lost locally, one regraded upstream after the watermark
+        lost = Assignment.query.filter_by(brightspace_assignment_id='100001').one()
+        db.session.delete(lost.grade)
+        db.session.commit()
+        handler.grade_points[100003] = 95
+        handler.graded_dates[100003] = '2026-06-01T12:00:00Z'
+
+        stats = CourseSyncService().sync(course, user.id)
+        db.session.commit()
+
+    assert stats['counts']['grades_settled'] == 4
+    assert stats['counts']['grades_upserted'] == 2
+    assert Grade.query.count() == 6
+    assert Grade.query.filter_by(points_earned=95).count() == 1
+    state = CourseSyncState.query.filter_by(course_id=course.id).one()
+    assert state.last_graded_date == datetime(2026, 6, 1, 12, 0)
+
+def test_throttled_request_honours_retry_after(d2l_env):
+    handler = D2LApiHandler(course_count=1)
+    handler.throttle.extend([(429, '0.3'), (503, None)])
+    with StubServer(handler) as server:
+        d2l_env(server)
+        service = BrightspaceService()
+        service._get_access_token()
+        start = time.monotonic()
+        assignments = service.get_assignments('1000')
+        elapsed = time.monotonic() - start
+
+    assert len(assignments) == 5
+    assert elapsed >= 0.3
+    stats = BrightspaceService.rate_limit_stats()
+    assert stats['throttled'] == 1
+    assert stats['retries'] == 2
+
+def test_exhausted_retries_surface_an_error(client, auth_headers, user, d2l_env, monkeypatch):
+    from application import db
+    from application.models.assignment import Assignment
+
+    monkeypatch.setenv('BRIGHTSPACE_MAX_RETRIES', '1')
+    course = Course(user_id=user.id, course_code='CS 3500', course_name='Course 0 Fall', brightspace_course_id='1000')
+    db.session.add(course)
+    db.session.commit()
+
+    handler = D2LApiHandler(course_count=1)
+    handler.throttle.extend([(429, '0'), (429, '0')])
+    with StubServer(handler) as server:
+        d2l_env(server)
+        response = client.post(f'/api/courses/{course.id}/sync', headers=auth_headers)
+
+    assert response.status_code == 503
+    assert response.json['upstream_status'] == 429
+    assert Assignment.query.count() == 0
+
+def test_long_retry_after_fails_fast_without_stalling_the_limiter(client, auth_headers, user, d2l_env):
+    from application import db
+
+    course = Course(user_id=user.id, course_code='CS 3500', course_name='Course 0 Fall', brightspace_course_id='1000')
+    db.session.add(course)
+    db.session.commit()
+
+    handler = D2LApiHandler(course_count=1)
+    handler.throttle.append((429, '3600'))
+    with StubServer(handler) as server:
+        d2l_env(server)
+        start = time.monotonic()
+        response = client.post(f'/api/courses/{course.id}/sync', headers=auth_headers)
+        elapsed = time.monotonic() - start
+
+        assert response.status_code == 503
+        assert elapsed < 2.0
+        assert BrightspaceService.rate_limit_stats()['retries'] == 0
+        # Other callers are not held behind the throttled request
+        start = time.monotonic()
+        brightspace_service.get_rate_limiter().acquire()
+        assert time.monotonic() - start < 0.5
+
+def test_rate_limiter_caps_server_requested_pauses():
+    limiter = RateLimiter(rate=20, burst=1, max_pause=0.1)
+    limiter.pause(3600)
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.5
+
+def test_client_errors_are_not_retried(d2l_env):
+    handler = D2LApiHandler(course_count=1)
+    with StubServer(handler) as server:
+        d2l_env(server)
+        with pytest.raises(BrightspaceAPIError) as error:
+            BrightspaceService().get_assignments('9999')
+
+    assert error.value.status_code == 404
+    assert not error.value.retryable
+    assert BrightspaceService.rate_limit_stats()['retries'] == 0
+
+def test_rate_limiter_spaces_requests_and_tracks_waits():
+    limiter = RateLimiter(rate=20, burst=1)
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.19
+    stats = limiter.stats()
+    assert stats['requests'] == 5
+    assert stats['queue_depth'] == 0
+    assert stats['wait_seconds_total'] >= 0.19
+
+@pytest.mark.parametrize('remaining, reset', [('0', 'soon'), ('none', '5'), ('0', 'inf')])
+def test_rate_limiter_ignores_malformed_budget_headers(remaining, reset):
+    class Response:
+        status_code = 200
+        headers = {'X-Rate-Limit-Remaining': remaining, 'X-Rate-Limit-Reset': reset}
+
+    limiter = RateLimiter(rate=20, burst=1)
+    limiter.observe(Response())
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+def _remote_courses(user, remote_ids):
+    from application import db
+
+    courses = [
+        Course(user_id=user.id, course_code=f'CS {remote_id}', course_name='Course', brightspace_course_id=remote_id)
+        for remote_id in remote_ids
+    ]
+    db.session.add_all(courses)
+    db.session.commit()
+    return courses
+
+def test_sync_all_isolates_failing_courses(client, auth_headers, user, d2l_env):
+    from application.models.assignment import Assignment
+
+    _remote_courses(user, ['1000', '9999', '1001'])
+    with StubServer(D2LApiHandler(course_count=2, activity_count=4)) as server:
+        d2l_env(server)
+        response = client.post('/api/courses/sync-all', headers=auth_headers)
+
+    assert response.status_code == 200
+    summary = response.json['summary']
+    assert (summary['courses'], summary['synced'], summary['failed']) == (3, 2, 1)
+    assert summary['updated'] == 16
+    statuses = [(course['course_code'], course['status']) for course in response.json['courses']]
+    assert statuses == [('CS 1000', 'synced'), ('CS 9999', 'failed'), ('CS 1001', 'synced')]
+    assert Assignment.query.count() == 8
+
+def test_sync_all_survives_unexpected_course_errors(client, auth_headers, user, d2l_env, monkeypatch):
+    import json
+    from application.models.assignment import Assignment
+    from application.services.course_sync_service import CourseSyncService
+
+    original_sync = CourseSyncService.sync
+
+    def sync(self, course, user_id, remote=None):
+        stats = original_sync(self, course, user_id, remote)
+        if course.brightspace_course_id == '1001':
+            # Fails after writing, so the course's savepoint has something to undo
+            raise ValueError('malformed grade payload')
+        return stats
+
+    monkeypatch.setattr(CourseSyncService, 'sync', sync)
+    _remote_courses(user, ['1000', '1001', '1002'])
+    with StubServer(D2LApiHandler(course_count=3, activity_count=2)) as server:
+        d2l_env(server)
+        response = client.post('/api/courses/sync-all?stream=1', headers=auth_headers)
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [event.get('status') for event in events[:-1]] == ['synced', 'failed', 'synced']
+    assert events[1]['error'] == 'malformed grade payload'
+    assert (events[-1]['type'], events[-1]['synced'], events[-1]['failed']) == ('summary', 2, 1)
+    assert Assignment.query.count() == 4
+
+def test_sync_all_keeps_courses_streamed_before_a_disconnect(app, user, d2l_env):
+    from application import db
+    from application.models.assignment import Assignment
+    from application.services.bulk_sync_service import BulkSyncService
+
+    first, _ = _remote_courses(user, ['1000', '1001'])
+    with StubServer(D2LApiHandler(course_count=2, activity_count=3)) as server:
+        d2l_env(server)
+        events = BulkSyncService().iter_sync(user.id)
+        assert next(events)['status'] == 'synced'
+        # The client goes away before the second course is applied
+        events.close()
+    db.session.rollback()
+
+    assert Assignment.query.filter_by(course_id=first.id).count() == 3
+
+def test_sync_all_streams_ndjson_progress(client, auth_headers, user, d2l_env):
+    import json
+
+    _remote_courses(user, ['1000', '1001', '1002'])
+    with StubServer(D2LApiHandler(course_count=3, activity_count=2)) as server:
+        d2l_env(server)
+        response = client.post('/api/courses/sync-all?stream=1', headers=auth_headers)
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert [event['progress'] for event in events[:-1]] == [
+        {'done': 1, 'total': 3}, {'done': 2, 'total': 3}, {'done': 3, 'total': 3}
+    ]
+    assert events[-1]['type'] == 'summary'
+    assert events[-1]['synced'] == 3
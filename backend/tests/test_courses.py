@@ -0,0 +1,232 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from application import db
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def test_calculate_grade_query_count_is_constant(client, auth_headers, make_course):
+    small_id = make_course(assignment_count=4, course_code='CS 1000').id
+    large_id = make_course(assignment_count=40, course_code='CS 2000').id
+    db.session.expire_all()
+
+    with count_queries() as small_queries:
+        response = client.get(f'/api/courses/{small_id}/calculate', headers=auth_headers)
+    assert response.status_code == 200
+
+    with count_queries() as large_queries:
+        response = client.get(f'/api/courses/{large_id}/calculate', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['letter_grade'] is not None
+
+    assert len(large_queries) == len(small_queries)
+    assert len(large_queries) <= 3
+
+def test_grade_needed_query_count(client, auth_headers, make_course):
+    course_id = make_course(assignment_count=25).id
+    db.session.expire_all()
+
+    with count_queries() as queries:
+        response = client.get(f'/api/courses/{course_id}/grade-needed?target=90', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(queries) <= 3
+
+def test_calculate_grade_unknown_course(client, auth_headers):
+    response = client.get('/api/courses/999/calculate', headers=auth_headers)
+    assert response.status_code == 404
+
+def test_calculate_reads_snapshot_in_one_query(client, auth_headers, make_course):
+    course_id = make_course(assignment_count=12).id
+    db.session.expire_all()
+
+    with count_queries() as queries:
+        response = client.get(f'/api/courses/{course_id}/calculate', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(queries) == 1
+
+def test_snapshot_tracks_grade_and_weight_changes(user, make_course):
+    from application.models.course import Course
+    from application.models.course_grade_snapshot import CourseGradeSnapshot
+    from application.utils.grade_calculator import GradeCalculator
+
+    course_id = make_course(assignment_count=8).id
+    course = Course.load_for_grading(course_id, user.id)
+
+    course.assignments[0].grade.points_earned = 10.0
+    db.session.commit()
+    snapshot = CourseGradeSnapshot.query.filter_by(course_id=course_id).one()
+    assert snapshot.to_dict() == GradeCalculator.calculate_course_grade(course)
+
+    db.session.delete(next(w for w in course.syllabus_weights if w.category == 'Homework'))
+    db.session.commit()
+    snapshot = CourseGradeSnapshot.query.filter_by(course_id=course_id).one()
+    assert snapshot.error == 'Syllabus weights must sum to 100% (currently 70.0%)'
+
+def test_snapshot_refresh_overwrites_a_row_written_concurrently(user, make_course):
+    from application.models.course_grade_snapshot import CourseGradeSnapshot
+    from application.utils.grade_calculator import GradeCalculator
+
+    course = make_course(assignment_count=4)
+    CourseGradeSnapshot.query.delete()
+    db.session.commit()
+    # Another request's first read inserted the row after this one found none
+    db.session.execute(db.insert(CourseGradeSnapshot).values(course_id=course.id, final_grade=1.0))
+
+    snapshots = CourseGradeSnapshot.refresh([course.id])
+    db.session.commit()
+
+    assert CourseGradeSnapshot.query.count() == 1
+    assert snapshots[course.id].to_dict() == GradeCalculator.calculate_course_grade(course)
+
+def test_rebuild_grade_snapshots_command(app, make_course):
+    from application.models.course_grade_snapshot import CourseGradeSnapshot
+
+    make_course(assignment_count=3)
+    CourseGradeSnapshot.query.delete()
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['rebuild-grade-snapshots', '--chunk-size', '1'])
+    assert 'Rebuilt grade snapshots for 1 courses' in result.output
+    assert CourseGradeSnapshot.query.count() == 1
+
+def test_sync_course_is_set_based(client, auth_headers, user):
+    from application.models.course import Course
+    from application.models.grade import Grade
+
+    course = Course(user_id=user.id, course_code='CS 4500', course_name='Software Development',
+                    brightspace_course_id='BS002')
+    db.session.add(course)
+    db.session.commit()
+    course_id = course.id
+
+    response = client.post(f'/api/courses/{course_id}/sync', headers=auth_headers)
+    assert response.status_code == 200
+    counts = response.json['sync_stats']['counts']
+    assert counts['assignments_inserted'] == 7
+    assert counts['grades_upserted'] == 7
+    assert set(response.json['sync_stats']['timings_ms']) >= {'fetch_assignments', 'write_assignments', 'write_grades'}
+    assert Grade.query.count() == 7
+
+    with count_queries() as queries:
+        response = client.post(f'/api/courses/{course_id}/sync', headers=auth_headers)
+    counts = response.json['sync_stats']['counts']
+    assert counts['assignments_inserted'] == 0
+    assert counts['grades_upserted'] == 7
+    assert Grade.query.count() == 7
+    assert len(queries) < 20
+
+def test_import_synthetic_courses_skips_existing(client, auth_headers):
+    response = client.post('/api/courses/import-synthetic', headers=auth_headers)
+    assert response.status_code == 200
+    courses = response.json['courses']
+    assert len(courses) == 3
+    assert all(len(course['assignments']) == 7 for course in courses)
+    assert all(len(course['syllabus_weights']) == 4 for course in courses)
+
+    response = client.post('/api/courses/import-synthetic', headers=auth_headers)
+    assert response.json['courses'] == []
+
+def test_list_courses_keyset_pages_with_projection(client, auth_headers, make_course):
+    for i in range(5):
+        make_course(assignment_count=0, course_code=f'CS {i}')
+
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': 2, 'fields': 'id,course_code'}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get('/api/courses/', headers=auth_headers, query_string=params)
+        assert response.status_code == 200
+        assert all(set(course) == {'id', 'course_code'} for course in response.json['courses'])
+        seen.extend(course['course_code'] for course in response.json['courses'])
+        cursor = response.json['page']['next_cursor']
+        if not cursor:
+            break
+    assert seen == [f'CS {i}' for i in range(5)]
+
+    assert client.get('/api/courses/?fields=password', headers=auth_headers).status_code == 400
+    assert client.get('/api/courses/?cursor=garbage', headers=auth_headers).status_code == 400
+
+def test_course_detail_pages_assignments(client, auth_headers, make_course):
+    course_id = make_course(assignment_count=7).id
+
+    response = client.get(f'/api/courses/{course_id}?limit=5', headers=auth_headers)
+    assert response.status_code == 200
+    first = response.json['course']['assignments']
+    assert len(first) == 5
+    assert len(response.json['course']['syllabus_weights']) == 4
+
+    cursor = response.json['assignments_page']['next_cursor']
+    response = client.get(f'/api/courses/{course_id}?limit=5&cursor={cursor}', headers=auth_headers)
+    rest = response.json['course']['assignments']
+    assert [a['name'] for a in first + rest] == [f'Assignment {i}' for i in range(7)]
+    assert response.json['assignments_page']['next_cursor'] is None
+
+def test_dashboard_returns_every_course_with_grade(client, auth_headers, make_course):
+    make_course(assignment_count=4, course_code='CS 1000')
+    make_course(assignment_count=40, course_code='CS 2000')
+    db.session.expire_all()
+
+    with count_queries() as queries:
+        response = client.get('/api/courses/dashboard', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(queries) == 1
+    courses = response.json['courses']
+    assert [c['course_code'] for c in courses] == ['CS 1000', 'CS 2000']
+    assert all(c['grade']['letter_grade'] for c in courses)
+
+    calculated = client.get(f"/api/courses/{courses[1]['id']}/calculate", headers=auth_headers).json
+    assert courses[1]['grade'] == calculated
+
+def test_dashboard_computes_missing_snapshots_in_one_pass(client, auth_headers, make_course):
+    from application.models.course_grade_snapshot import CourseGradeSnapshot
+
+    course_ids = [make_course(course_code=f'CS {i}').id for i in range(3)]
+    expected = [client.get(f'/api/courses/{course_id}/calculate', headers=auth_headers).json for course_id in course_ids]
+    CourseGradeSnapshot.query.delete()
+    db.session.commit()
+
+    with count_queries() as queries:
+        response = client.get('/api/courses/dashboard', headers=auth_headers)
+    assert len(queries) <= 3
+    grades = [course['grade'] for course in response.json['courses']]
+    for grade, calculated in zip(grades, expected):
+        assert grade['letter_grade'] == calculated['letter_grade']
+        assert grade['projected_final_grade'] == pytest.approx(calculated['projected_final_grade'])
+
+def test_sync_diff_tolerates_zero_point_activities(app):
+    from application.services.course_sync_service import CourseSyncService
+
+    service = CourseSyncService(brightspace=object())
+    rows, unchanged = service._diff_grades(
+        {'BONUS': {'points_earned': 5.0}, 'HW': {'points_earned': 45.0}},
+        {'BONUS': {'id': 1, 'max_points': 0.0, 'grade_id': None}, 'HW': {'id': 2, 'max_points': 50.0, 'grade_id': None}}
+    )
+    assert unchanged == 0
+    assert {row['assignment_id']: row['percentage'] for row in rows} == {1: None, 2: 90.0}
+
+def test_import_tolerates_zero_point_activities(app, user):
+    from application.services.course_import_service import CourseImportService
+
+    course = CourseImportService(brightspace=object())._build_course(
+        user.id,
+        {'brightspace_course_id': '42', 'course_code': 'CS 42', 'course_name': 'Bonus'},
+        [
+            {'brightspace_assignment_id': 'BONUS', 'name': 'Bonus', 'category': 'Homework', 'max_points': 0.0},
+            {'brightspace_assignment_id': 'HW', 'name': 'HW', 'category': 'Homework', 'max_points': 50.0}
+        ],
+        {'BONUS': {'points_earned': 5.0}, 'HW': {'points_earned': 45.0}}
+    )
+    assert [a.grade.percentage for a in course.assignments] == [None, 90.0]
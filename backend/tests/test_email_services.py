@@ -0,0 +1,322 @@
+import json
+import time
+from datetime import datetime, timedelta
+import pytest
+from application.services import gmail_service
+from application.services.gmail_service import GmailService, GMAIL_CLIENT_CACHE
+from tests.stub_server import StubServer, gmail_api_handler
+
+class FakeGmailApi:
+    def __init__(self):
+        self.sent = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def send(self, userId, body):
+        self.sent.append(body)
+        return self
+
+    def execute(self, http=None):
+        return {'id': str(len(self.sent))}
+
+@pytest.fixture
+def gmail_env(app, monkeypatch):
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('GMAIL_CLIENT_ID', 'client-id')
+    monkeypatch.setenv('GMAIL_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setenv('GMAIL_REFRESH_TOKEN', 'refresh-token')
+
+    builds = []
+    refreshes = []
+
+    def fake_build(*args, **kwargs):
+        builds.append(kwargs['credentials'])
+        return FakeGmailApi()
+
+    def fake_refresh(credentials, request):
+        refreshes.append(credentials)
+        credentials.token = 'access-token'
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(gmail_service, 'build', fake_build)
+    monkeypatch.setattr(gmail_service.Credentials, 'refresh', fake_refresh)
+    GMAIL_CLIENT_CACHE.clear()
+    yield builds, refreshes
+    GMAIL_CLIENT_CACHE.clear()
+
+def test_gmail_client_is_built_once(gmail_env):
+    builds, refreshes = gmail_env
+
+    assert GmailService().send_email('a@example.com', 'Subject', '<p>Hi</p>')
+    assert GmailService().send_email('b@example.com', 'Subject', '<p>Hi</p>')
+
+    assert len(builds) == 1
+    assert len(refreshes) == 1
+    stats = GmailService.cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+def test_gmail_token_refreshed_near_expiry(gmail_env):
+    builds, refreshes = gmail_env
+
+    service = GmailService()
+    service.send_email('a@example.com', 'Subject', 'Hi', html=False)
+    service._get_credentials().expiry = datetime.utcnow() + timedelta(minutes=1)
+    service.send_email('a@example.com', 'Subject', 'Hi', html=False)
+
+    assert len(builds) == 1
+    assert len(refreshes) == 2
+    assert GmailService.cache_stats()['token_refreshes'] == 2
+
+@pytest.fixture
+def gmail_stub_env(app, monkeypatch):
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('GMAIL_CLIENT_ID', 'client-id')
+    monkeypatch.setenv('GMAIL_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setenv('GMAIL_REFRESH_TOKEN', 'refresh-token')
+
+    def fake_refresh(credentials, request):
+        credentials.token = 'access-token'
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(gmail_service.Credentials, 'refresh', fake_refresh)
+    GMAIL_CLIENT_CACHE.clear()
+
+    def configure(server, batch_size):
+        monkeypatch.setenv('GMAIL_API_ENDPOINT', server.url)
+        monkeypatch.setenv('GMAIL_BATCH_SIZE', str(batch_size))
+
+    yield configure
+    GMAIL_CLIENT_CACHE.clear()
+
+def grade_alerts(count):
+    return [
+        {'email': f'student{i}@example.com', 'course_name': 'CS 3520', 'grade_data': {'current_grade': 88}}
+        for i in range(count)
+    ]
+
+def test_gmail_batch_reports_per_recipient_status(gmail_stub_env):
+    alerts = grade_alerts(25)
+    handler = gmail_api_handler(reject={'student7@example.com'})
+    with StubServer(handler) as server:
+        gmail_stub_env(server, 10)
+        results = GmailService().send_batch_alerts(alerts)
+
+    assert [result['email'] for result in results] == [alert['email'] for alert in alerts]
+    assert [result['success'] for result in results] == [i != 7 for i in range(25)]
+    assert 'Invalid To header' in results[7]['error']
+    assert [path for _, path in server.requests].count('/batch/gmail/v1') == 3
+    assert len(handler.sent) == 24
+
+def test_gmail_batch_size_one_sends_concurrently(gmail_stub_env):
+    alerts = grade_alerts(6)
+    handler = gmail_api_handler(reject={'student2@example.com'})
+    with StubServer(handler) as server:
+        gmail_stub_env(server, 1)
+        results = GmailService().send_batch_alerts(alerts)
+
+    assert [result['success'] for result in results] == [True, True, False, True, True, True]
+    assert '/batch/gmail/v1' not in [path for _, path in server.requests]
+    assert sorted(handler.sent) == sorted(alert['email'] for i, alert in enumerate(alerts) if i != 2)
+
+def test_gmail_stalled_call_times_out(gmail_stub_env, monkeypatch):
+    monkeypatch.setenv('GMAIL_REQUEST_TIMEOUT', '0.2')
+    with StubServer(gmail_api_handler(latency=1.0)) as server:
+        gmail_stub_env(server, 1)
+        start = time.perf_counter()
+        assert GmailService().send_email('student@example.com', 'Subject', '<p>Hi</p>') is False
+        assert time.perf_counter() - start < 0.9
+
+class FakeResponse:
+    def __init__(self, status_code=202, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = ''
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+class FakeSession:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, **kwargs):
+        self.posts.append(url)
+        if 'oauth2' in url:
+            return FakeResponse(200, {'access_token': 'token', 'expires_in': 3600})
+        return FakeResponse(202)
+
+@pytest.fixture
+def outlook_env(app, monkeypatch):
+    from application.services import outlook_service
+
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('OUTLOOK_CLIENT_ID', 'client-id')
+    monkeypatch.setenv('OUTLOOK_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setenv('OUTLOOK_REFRESH_TOKEN', 'refresh-token')
+    session = FakeSession()
+    monkeypatch.setattr(outlook_service, 'get_http_session', lambda: session)
+    outlook_service.OUTLOOK_TOKEN_CACHE.clear()
+    yield session
+    outlook_service.OUTLOOK_TOKEN_CACHE.clear()
+
+def test_outlook_fetches_token_once(outlook_env):
+    from application.services.outlook_service import OutlookService
+
+    service = OutlookService()
+    for i in range(3):
+        assert service.send_email(f'student{i}@example.com', 'Subject', '<p>Hi</p>')
+
+    token_posts = [url for url in outlook_env.posts if 'oauth2' in url]
+    assert len(token_posts) == 1
+    assert OutlookService.cache_stats() == {'hits': 2, 'misses': 1, 'tokens': 1}
+
+def graph_stub(throttle_once=(), reject=(), retry_after='0'):
+    throttled = set()
+
+    def handler(method, path, headers, body):
+        if path.endswith('/oauth2/v2.0/token'):
+            return 200, {}, {'access_token': 'token', 'expires_in': 3600}
+        if path == '/v1.0/$batch':
+            responses = []
+            for request in json.loads(body)['requests']:
+                address = request['body']['message']['toRecipients'][0]['emailAddress']['address']
+                if address in reject:
+                    responses.append({'id': request['id'], 'status': 400, 'body': {'error': {'code': 'ErrorInvalidRecipients'}}})
+                elif address in throttle_once and address not in throttled:
+                    throttled.add(address)
+                    responses.append({'id': request['id'], 'status': 429, 'headers': {'Retry-After': retry_after}})
+                else:
+                    responses.append({'id': request['id'], 'status': 202})
+            return 200, {}, {'responses': responses}
+        return 404, {}, {}
+
+    return StubServer(handler)
+
+@pytest.fixture
+def graph_env(app, monkeypatch):
+    from application.services import outlook_service
+
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('OUTLOOK_CLIENT_ID', 'client-id')
+    monkeypatch.setenv('OUTLOOK_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setenv('OUTLOOK_REFRESH_TOKEN', 'refresh-token')
+    outlook_service.OUTLOOK_TOKEN_CACHE.clear()
+
+    def configure(server):
+        monkeypatch.setenv('OUTLOOK_AUTHORITY_URL', server.url)
+        monkeypatch.setenv('OUTLOOK_GRAPH_URL', f'{server.url}/v1.0')
+
+    yield configure
+    outlook_service.OUTLOOK_TOKEN_CACHE.clear()
+
+def test_outlook_batch_packs_twenty_per_request(graph_env):
+    from application.services.outlook_service import OutlookService
+
+    alerts = [
+        {'email': f'student{i}@example.com', 'course_name': 'CS 3520', 'grade_data': {'current_grade': 88}}
+        for i in range(45)
+    ]
+    with graph_stub() as server:
+        graph_env(server)
+        results = OutlookService().send_batch_alerts(alerts)
+
+    assert [result['email'] for result in results] == [alert['email'] for alert in alerts]
+    assert all(result['success'] for result in results)
+    assert [path for _, path in server.requests].count('/v1.0/$batch') == 3
+
+def test_outlook_batch_retries_only_failed_items(graph_env):
+    from application.services.outlook_service import OutlookService
+
+    alerts = [
+        {'email': f'student{i}@example.com', 'course_name': 'CS 3520', 'grade_data': {'current_grade': 88}}
+        for i in range(5)
+    ]
+    with graph_stub(throttle_once={'student1@example.com', 'student3@example.com'},
+                    reject={'student4@example.com'}) as server:
+        graph_env(server)
+        results = OutlookService().send_batch_alerts(alerts)
+
+    assert [result['success'] for result in results] == [True, True, True, True, False]
+    assert [path for _, path in server.requests].count('/v1.0/$batch') == 2
+
+@pytest.mark.parametrize('retry_after', ['0.05', 'Wed, 21 Oct 2015 07:28:00 GMT', 'soon'])
+def test_outlook_batch_tolerates_any_retry_after(graph_env, monkeypatch, retry_after):
+    from application.services import outlook_service
+
+    sleeps = []
+    monkeypatch.setattr(outlook_service.time, 'sleep', sleeps.append)
+    alerts = [{'email': 'student@example.com', 'course_name': 'CS 3520', 'grade_data': {'current_grade': 88}}]
+    with graph_stub(throttle_once={'student@example.com'}, retry_after=retry_after) as server:
+        graph_env(server)
+        results = outlook_service.OutlookService().send_batch_alerts(alerts)
+
+    assert results == [{'email': 'student@example.com', 'success': True}]
+    assert sleeps == [{'0.05': 0.05, 'soon': 1}.get(retry_after, 0.0)]
+
+@pytest.mark.parametrize('retry_after', ['3600', 'Wed, 21 Oct 2099 07:28:00 GMT'])
+def test_outlook_batch_gives_up_on_long_retry_after(graph_env, monkeypatch, retry_after):
+    from application.services import outlook_service
+
+    sleeps = []
+    monkeypatch.setattr(outlook_service.time, 'sleep', sleeps.append)
+    alerts = [
+        {'email': f'student{i}@example.com', 'course_name': 'CS 3520', 'grade_data': {'current_grade': 88}}
+        for i in range(2)
+    ]
+    with graph_stub(throttle_once={'student1@example.com'}, retry_after=retry_after) as server:
+        graph_env(server)
+        results = outlook_service.OutlookService().send_batch_alerts(alerts)
+
+    assert [result['success'] for result in results] == [True, False]
+    assert sleeps == []
+    assert [path for _, path in server.requests].count('/v1.0/$batch') == 1
+
+def test_outlook_stalled_graph_call_times_out(graph_env, monkeypatch):
+    from application.services.outlook_service import OutlookService
+
+    def handler(method, path, headers, body):
+        if path.endswith('/oauth2/v2.0/token'):
+            return 200, {}, {'access_token': 'token', 'expires_in': 3600}
+        time.sleep(1.0)
+        return 202, {}, {}
+
+    monkeypatch.setenv('OUTLOOK_REQUEST_TIMEOUT', '0.2')
+    with StubServer(handler) as server:
+        graph_env(server)
+        start = time.perf_counter()
+        assert OutlookService().send_email('student@example.com', 'Subject', '<p>Hi</p>') is False
+        assert time.perf_counter() - start < 0.9
+
+def test_grade_alert_rendered_once_per_course_snapshot(app):
+    from application.services.outlook_service import OutlookService
+    from application.utils.email_templates import RENDER_CACHE
+
+    RENDER_CACHE.clear()
+    grade_data = {
+        'current_grade': 81.5,
+        'letter_grade': 'B-',
+        'target_grade': 85,
+        'category_breakdown': {'Homework': {'average': 92.25, 'weight': 30}}
+    }
+    alerts = [
+        {'email': f'student{i}@example.com', 'course_name': 'CS 3520', 'grade_data': dict(grade_data)}
+        for i in range(3)
+    ]
+
+    results = OutlookService().send_batch_alerts(alerts)
+    subject, html = OutlookService()._build_grade_alert('CS 3520', grade_data)
+
+    assert all(result['success'] for result in results)
+    assert RENDER_CACHE.stats() == {'hits': 3, 'misses': 1, 'entries': 1}
+    assert subject == 'Grade Update: CS 3520'
+    assert '<td style="padding: 10px; text-align: right;">92.2%</td>' in html
+    assert 'You need 3.5% more to reach your target.' in html
+    RENDER_CACHE.clear()
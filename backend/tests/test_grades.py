@@ -1,4 +1,5 @@
 import pytest
+from application import db
 from application.utils.grade_calculator import GradeCalculator
 
 def test_get_letter_grade():
@@ -10,5 +11,169 @@ def test_get_letter_grade():
     assert GradeCalculator.get_letter_grade(55) == 'F'
 
 def test_calculate_category_average():
-    # This would require mock data - simplified test
-    assert GradeCalculator.get_letter_grade(90) == 'A-'
+    course = _course(1, [('Quiz', 100.0)], [('Quiz', 10, 7), ('Quiz', 10, 9.5), ('Quiz', 20, False)])
+    breakdown = GradeCalculator.calculate_course_grade(course)['breakdown']
+    # Ungraded assignments count toward neither earned nor possible points
+    assert breakdown == [{'category': 'Quiz', 'weight': 100.0, 'average': 82.5, 'weighted_contribution': 82.5}]
+
+def _course(course_id, weights, assignments):
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        id=course_id,
+        syllabus_weights=[SimpleNamespace(category=c, weight=w) for c, w in weights],
+        assignments=[
+            SimpleNamespace(
+                category=c,
+                max_points=m,
+                grade=SimpleNamespace(points_earned=p) if p is not False else None
+            )
+            for c, m, p in assignments
+        ]
+    )
+
+def test_calculate_course_grade_partial_completion():
+    course = _course(1, [('Homework', 40.0), ('Exam', 60.0)], [
+        ('Homework', 100, 90),
+        ('Homework', 50, 40),
+        ('Homework', 100, False),
+        ('Exam', 200, None)
+    ])
+    result = GradeCalculator.calculate_course_grade(course)
+    assert result['final_grade'] == round((130 / 150) * 100 * 40 / 100, 2)
+    assert result['projected_final_grade'] == round((130 / 150) * 100, 2)
+    assert result['letter_grade'] == 'B'
+    assert result['total_weight_applied'] == 40.0
+    assert result['breakdown'][1]['average'] is None
+
+def test_calculate_course_grade_errors():
+    assert 'error' in GradeCalculator.calculate_course_grade(_course(1, [], []))
+    result = GradeCalculator.calculate_course_grade(_course(1, [('Homework', 50.0)], []))
+    assert result['error'] == 'Syllabus weights must sum to 100% (currently 50.0%)'
+
+def test_calculate_batch_matches_hand_computed_grades():
+    courses = [
+        _course(1, [('Homework', 30.0), ('Quiz', 20.0), ('Exam', 50.0)], [
+            ('Homework', 100, 88.5), ('Quiz', 10, 7), ('Exam', 200, 151), ('Quiz', 10, 9.5)
+        ]),
+        _course(2, [('Project', 100.0)], [('Project', 100, 72), ('Homework', 100, 100)]),
+        _course(3, [('Homework', 100.0)], []),
+        _course(4, [], [('Homework', 100, 50)]),
+        _course(5, [('Homework', 40.0), ('Exam', 60.0)], [('Homework', 50, 45), ('Exam', 100, False)])
+    ]
+    batch = GradeCalculator.calculate_course_grades(courses)
+
+    # 88.5% * 30 + 82.5% * 20 + 75.5% * 50
+    assert batch[1]['final_grade'] == 80.8
+    assert batch[1]['projected_final_grade'] == 80.8
+    assert batch[1]['letter_grade'] == 'B-'
+    assert batch[1]['completion_percentage'] == 100.0
+    assert [c['average'] for c in batch[1]['breakdown']] == [88.5, 82.5, 75.5]
+
+    # Homework is graded but carries no syllabus weight
+    assert (batch[2]['final_grade'], batch[2]['letter_grade']) == (72.0, 'C-')
+
+    assert batch[3]['final_grade'] is None and batch[3]['projected_final_grade'] is None
+    assert batch[3]['completion_percentage'] == 0.0
+
+    assert batch[4]['error'] == 'No syllabus weights defined for this course'
+
+    # Only 40% of the weight is graded: 90% * 40 = 36 so far, projecting to 90
+    assert batch[5]['final_grade'] == 36.0
+    assert batch[5]['projected_final_grade'] == 90.0
+    assert batch[5]['letter_grade'] == 'A-'
+    assert batch[5]['completion_percentage'] == 40.0
+
+def test_gradebook_streams_assignments_with_grades_in_one_query(client, auth_headers, make_course):
+    from application.models.assignment import Assignment
+    from tests.test_courses import count_queries
+
+    course = make_course(assignment_count=9)
+    course.assignments.append(Assignment(name='Ungraded', category='Exam', max_points=50.0))
+    db.session.commit()
+    course_id = course.id
+    db.session.expire_all()
+
+    with count_queries() as queries:
+        response = client.get(f'/api/grades/course/{course_id}', headers=auth_headers)
+        body = response.get_json()
+    assert response.status_code == 200
+    assert len(queries) == 1
+    assert body['course_id'] == course_id
+    assignments = body['assignments']
+    assert len(assignments) == 10
+    assert assignments[0]['grade']['points_earned'] == 80.0
+    assert assignments[-1]['name'] == 'Ungraded' and assignments[-1]['grade'] is None
+
+def test_gradebook_empty_and_unknown_course(client, auth_headers, make_course):
+    course_id = make_course(assignment_count=0).id
+    response = client.get(f'/api/grades/course/{course_id}', headers=auth_headers)
+    assert response.get_json() == {'course_id': course_id, 'assignments': []}
+
+    assert client.get('/api/grades/course/999', headers=auth_headers).status_code == 404
+
+def test_bulk_upsert_accepts_json_and_refreshes_course_once(client, auth_headers, make_course):
+    from application.models.assignment import Assignment
+    from application.models.grade import Grade
+
+    first = make_course(assignment_count=4, course_code='CS 1000')
+    second = make_course(assignment_count=4, course_code='CS 2000')
+    ungraded = Assignment(course_id=first.id, name='Final', category='Exam', max_points=200.0)
+    db.session.add(ungraded)
+    db.session.commit()
+    rows = [{'assignment_id': a.id, 'points_earned': 50} for a in first.assignments + second.assignments if a.grade]
+    rows.append({'assignment_id': ungraded.id, 'points_earned': 150, 'graded_date': '2024-05-01T12:00:00Z', 'feedback': 'Nice'})
+    before = client.get(f'/api/courses/{first.id}/calculate', headers=auth_headers).json
+
+    response = client.post('/api/grades/bulk', json=rows, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['upserted'] == 9
+    assert set(response.json['course_grades']) == {str(first.id), str(second.id)}
+    assert response.json['course_grades'][str(first.id)] != before
+
+    grade = Grade.query.filter_by(assignment_id=ungraded.id).one()
+    assert grade.percentage == 75.0
+    assert grade.graded_date.hour == 12
+    assert Grade.query.filter_by(points_earned=50).count() == 8
+
+def test_bulk_upsert_csv_and_rejects_foreign_assignments(app, client, auth_headers, make_course):
+    from application.models.assignment import Assignment
+    from application.models.course import Course
+    from application.models.grade import Grade
+    from application.models.user import User
+
+    course = make_course(assignment_count=2)
+    other = User(email='other@example.com', first_name='Other', last_name='Student')
+    other.set_password('password123')
+    other.courses.append(Course(course_code='X', course_name='Not yours'))
+    other.courses[0].assignments.append(Assignment(name='Secret', max_points=10.0))
+    db.session.add(other)
+    db.session.commit()
+    mine = [a.id for a in course.assignments]
+    foreign = other.courses[0].assignments[0].id
+
+    csv_body = f"assignment_id,points_earned,feedback\n{mine[0]},91,\n{mine[1]},88,Good\n"
+    response = client.post('/api/grades/bulk', data=csv_body, content_type='text/csv', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['upserted'] == 2
+
+    response = client.post('/api/grades/bulk', json={'grades': [
+        {'assignment_id': mine[0], 'points_earned': 10},
+        {'assignment_id': foreign, 'points_earned': 10},
+        {'assignment_id': mine[1], 'points_earned': 'lots'}
+    ]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert [error['row'] for error in response.json['errors']] == [1, 2]
+    assert Grade.query.filter_by(assignment_id=mine[0]).one().points_earned == 91.0
+
+def test_bulk_upsert_rejects_non_finite_points(client, auth_headers, make_course):
+    from application.models.grade import Grade
+
+    course = make_course(assignment_count=3)
+    ids = [a.id for a in course.assignments]
+
+    csv_body = f"assignment_id,points_earned\n{ids[0]},nan\n{ids[1]},inf\n{ids[2]},-Infinity\n"
+    response = client.post('/api/grades/bulk', data=csv_body, content_type='text/csv', headers=auth_headers)
+    assert response.status_code == 400
+    assert [error['row'] for error in response.json['errors']] == [0, 1, 2]
+    assert all('finite' in error['error'] for error in response.json['errors'])
+    assert Grade.query.filter(Grade.points_earned >= 80.0).count() == 3
@@ -0,0 +1,62 @@
+import pytest
+from datetime import datetime, timedelta
+from application import db
+from application.models.assignment import Assignment
+from application.models.course import Course
+from application.models.grade import Grade
+from application.models.notification import Notification
+from application.models.syllabus_weight import SyllabusWeight
+
+# The query shapes every request path leans on, keyed by what issues them
+HOT_QUERIES = {
+    'course by id and owner': lambda ids: db.select(Course.id).where(
+        Course.id == ids['course'], Course.user_id == ids['user']
+    ),
+    'courses by owner in id order': lambda ids: db.select(Course.id, Course.course_code).where(
+        Course.user_id == ids['user']
+    ).order_by(Course.id),
+    'assignments by course and brightspace id': lambda ids: db.select(Assignment.id).where(
+        Assignment.course_id == ids['course'],
+        Assignment.brightspace_assignment_id.in_(['ASSIGN1', 'ASSIGN2'])
+    ),
+    'gradebook join': lambda ids: db.select(Assignment.id, Grade.points_earned).outerjoin(
+        Grade, Grade.assignment_id == Assignment.id
+    ).where(Assignment.course_id == ids['course']),
+    'notifications newest first': lambda ids: db.select(Notification.id).where(
+        Notification.user_id == ids['user']
+    ).order_by(Notification.created_at.desc(), Notification.id.desc()).limit(50),
+    'weight by course and category': lambda ids: db.select(SyllabusWeight.weight).where(
+        SyllabusWeight.course_id == ids['course'], SyllabusWeight.category == 'Exam'
+    ),
+}
+
+def _sequential_scans(stmt):
+    connection = db.session.connection()
+    sql = str(stmt.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+    if connection.dialect.name == 'postgresql':
+        # Seeded tables are tiny; forbid seq scans so only a missing index can produce one
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {sql}')]
+        return [line.strip() for line in plan if 'Seq Scan' in line]
+
+    plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+    return [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line]
+
+@pytest.fixture
+def seeded(user, make_course):
+    courses = [make_course(assignment_count=20, course_code=f'CS {i}') for i in range(5)]
+    base = datetime(2024, 1, 1)
+    for i in range(50):
+        db.session.add(Notification(
+            user_id=user.id, notification_type='grade_alert', subject=f'Alert {i}',
+            message='...', created_at=base + timedelta(hours=i)
+        ))
+    db.session.commit()
+    return {'user': user.id, 'course': courses[2].id}
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(seeded, name):
+    scans = _sequential_scans(HOT_QUERIES[name](seeded))
+    db.session.rollback()
+    assert scans == [], f'{name} falls back to a sequential scan: {scans}'
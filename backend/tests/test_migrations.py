@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import DBAPIError
+from application.migrations import SchemaVersionError, check_schema_version, head_version, upgrade
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+def test_upgrade_builds_schema_once(app, engine):
+    with pytest.raises(SchemaVersionError):
+        check_schema_version(engine)
+
+    applied = upgrade(engine, log=lambda message: None)
+    assert applied == list(range(1, head_version() + 1))
+    assert check_schema_version(engine) == head_version()
+
+    tables = set(inspect(engine).get_table_names())
+    assert {'users', 'courses', 'assignments', 'grades', 'schema_migrations'} <= tables
+    assert 'ix_notifications_user_id_created_at' in {i['name'] for i in inspect(engine).get_indexes('notifications')}
+
+    assert upgrade(engine, log=lambda message: None) == []
+
+def test_upgrade_adopts_database_created_before_migrations(app, engine):
+    from application import db
+
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('DROP INDEX ix_courses_user_id_id')
+
+    upgrade(engine, log=lambda message: None)
+    assert 'ix_courses_user_id_id' in {i['name'] for i in inspect(engine).get_indexes('courses')}
+
+def test_frozen_indexes_match_the_models(app):
+    from application import db
+    from application.migrations.m0002_hot_query_indexes import HOT_INDEXES
+
+    model_indexes = {
+        index.name: [column.name for column in index.columns]
+        for table in db.metadata.tables.values()
+        for index in table.indexes
+    }
+    for index in HOT_INDEXES:
+        assert model_indexes[index.name] == [column.name for column in index.columns]
+
+def test_migrated_schema_matches_the_models(app, engine):
+    from application import db
+
+    upgrade(engine, log=lambda message: None)
+    inspector = inspect(engine)
+    for table in db.metadata.sorted_tables:
+        assert {c['name'] for c in inspector.get_columns(table.name)} == {c.name for c in table.columns}, table.name
+        indexes = {i['name']: i['column_names'] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            assert indexes[index.name] == [column.name for column in index.columns], index.name
+
+def test_invalid_concurrent_index_is_rebuilt(app, make_course):
+    from application import db
+    from application.migrations import m0002_hot_query_indexes
+
+    if db.engine.dialect.name != 'postgresql':
+        pytest.skip('INVALID indexes are a PostgreSQL concept')
+
+    # Two courses for one user make a unique build fail, leaving an INVALID index
+    make_course(course_code='CS 1000')
+    make_course(course_code='CS 2000')
+    db.session.close()
+    valid = text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass('ix_courses_user_id_id')")
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.exec_driver_sql('DROP INDEX ix_courses_user_id_id')
+        with pytest.raises(DBAPIError):
+            connection.exec_driver_sql('CREATE UNIQUE INDEX CONCURRENTLY ix_courses_user_id_id ON courses (user_id)')
+        assert connection.execute(valid).scalar() is False
+
+        m0002_hot_query_indexes.upgrade(connection)
+        assert connection.execute(valid).scalar() is True
@@ -0,0 +1,321 @@
+import time
+from datetime import datetime, timedelta
+from application import db
+from application.models.job import Job
+from application.models.notification import Notification
+from application.services.job_queue import JobQueue, JobWorker, JOB_HANDLERS
+
+def test_send_grade_alert_is_queued(app, client, auth_headers, make_course):
+    course_id = make_course().id
+
+    response = client.post(f'/api/notifications/send-grade-alert/{course_id}', headers=auth_headers, json={})
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    assert Notification.query.count() == 0
+
+    assert JobWorker(app).run_once() is True
+
+    response = client.get(f'/api/notifications/jobs/{job_id}', headers=auth_headers)
+    job = response.json['job']
+    assert job['status'] == 'succeeded'
+    assert job['result']['sent_via'] == ['gmail', 'outlook']
+    assert Notification.query.count() == 1
+
+def test_auto_check_is_queued(app, client, auth_headers, make_course):
+    make_course()
+
+    response = client.post('/api/notifications/auto-check', headers=auth_headers)
+    assert response.status_code == 202
+
+    JobWorker(app).run_once()
+    db.session.expire_all()
+    job = db.session.get(Job, response.json['job_id'])
+    assert job.status == 'succeeded'
+    assert job.result['message'].startswith('Checked 1 courses')
+
+def test_failed_job_is_retried_with_backoff(app):
+    JOB_HANDLERS['always_fails'] = lambda job: 1 / 0
+    try:
+        job = JobQueue.enqueue('always_fails', max_attempts=2)
+        db.session.commit()
+        job_id = job.id
+
+        worker = JobWorker(app)
+        assert worker.run_once() is True
+        db.session.expire_all()
+        job = db.session.get(Job, job_id)
+        assert job.status == 'queued'
+        assert job.attempts == 1
+        assert job.run_at > datetime.utcnow()
+
+        job.run_at = datetime.utcnow()
+        db.session.commit()
+        worker.run_once()
+        db.session.expire_all()
+        job = db.session.get(Job, job_id)
+        assert job.status == 'failed'
+        assert job.attempts == 2
+        assert 'division by zero' in job.error
+    finally:
+        JOB_HANDLERS.pop('always_fails')
+
+def test_expired_visibility_timeout_is_reclaimed(app):
+    job = JobQueue.enqueue('import_courses', {'user_id': 0})
+    job.status = Job.STATUS_RUNNING
+    job.locked_until = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+
+    assert JobQueue.claim_next() is None
+
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    claimed = JobQueue.claim_next()
+    assert claimed.id == job.id
+    assert claimed.attempts == 1
+
+def test_grade_scan_enqueues_alerts_once(app, make_course):
+    from application.models.course import Course
+    from application.services.grade_scan_service import GradeScanService
+
+    app.config['GRADE_THRESHOLD'] = 50.0
+    low = make_course(course_code='CS 1000')
+    make_course(course_code='CS 2000')
+    Course.query.filter(Course.id != low.id).update({'target_grade': 50.0})
+    db.session.commit()
+
+    report = GradeScanService(app, chunk_size=1, parallelism=1).run()
+    assert report['courses_scanned'] == 2
+    assert report['chunks'] == 2
+    assert report['alerts_enqueued'] == 1
+    assert report['courses_per_second'] > 0
+
+    job = Job.query.filter_by(job_type='send_grade_alert').one()
+    assert job.payload['course_id'] == low.id
+    assert job.payload['recipient_email'] == 'student@example.com'
+
+    report = GradeScanService(app, chunk_size=1, parallelism=1).run()
+    assert report['alerts_enqueued'] == 0
+    assert report['alerts_suppressed'] == 1
+
+def test_scan_alerts_go_out_in_one_graph_batch(app, make_course, monkeypatch):
+    from application.services import outlook_service
+    from application.services.grade_scan_service import GradeScanService
+    from tests.test_email_services import graph_stub
+
+    app.config['GRADE_THRESHOLD'] = 99.0
+    for i in range(3):
+        make_course(course_code=f'CS {i}')
+    GradeScanService(app, chunk_size=1, parallelism=1).run()
+    assert Job.query.filter_by(job_type='send_grade_alert', status='queued').count() == 3
+
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('OUTLOOK_CLIENT_ID', 'client-id')
+    monkeypatch.setenv('OUTLOOK_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setenv('OUTLOOK_REFRESH_TOKEN', 'refresh-token')
+    outlook_service.OUTLOOK_TOKEN_CACHE.clear()
+    with graph_stub() as server:
+        monkeypatch.setenv('OUTLOOK_AUTHORITY_URL', server.url)
+        monkeypatch.setenv('OUTLOOK_GRAPH_URL', f'{server.url}/v1.0')
+        assert JobWorker(app).run_once() is True
+    outlook_service.OUTLOOK_TOKEN_CACHE.clear()
+
+    assert [path for _, path in server.requests].count('/v1.0/$batch') == 1
+    assert [job.status for job in Job.query.filter_by(job_type='send_grade_alert')] == ['succeeded'] * 3
+    assert Notification.query.count() == 3
+
+def test_auto_check_alerts_go_out_in_one_gmail_batch(app, client, auth_headers, make_course, monkeypatch):
+    from application.services import gmail_service
+    from tests.stub_server import StubServer, gmail_api_handler
+
+    app.config['GRADE_THRESHOLD'] = 99.0
+    for i in range(3):
+        make_course(course_code=f'CS {i}')
+
+    def fake_refresh(credentials, request):
+        credentials.token = 'access-token'
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setenv('USE_SYNTHETIC_DATA', 'false')
+    monkeypatch.setenv('GMAIL_CLIENT_ID', 'client-id')
+    monkeypatch.setenv('GMAIL_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setenv('GMAIL_REFRESH_TOKEN', 'refresh-token')
+    monkeypatch.setattr(gmail_service.Credentials, 'refresh', fake_refresh)
+    gmail_service.GMAIL_CLIENT_CACHE.clear()
+
+    response = client.post('/api/notifications/auto-check', headers=auth_headers)
+    handler = gmail_api_handler()
+    with StubServer(handler) as server:
+        monkeypatch.setenv('GMAIL_API_ENDPOINT', server.url)
+        JobWorker(app).run_once()
+    gmail_service.GMAIL_CLIENT_CACHE.clear()
+
+    job = db.session.get(Job, response.json['job_id'])
+    assert job.result['message'] == 'Checked 3 courses, sent 3 alerts'
+    assert [path for _, path in server.requests] == ['/batch/gmail/v1']
+    assert handler.sent == ['student@example.com'] * 3
+
+class SlowProvider:
+    def __init__(self, delay, succeed=True):
+        self.delay = delay
+        self.succeed = succeed
+        self.calls = 0
+
+    def send_grade_alert(self, to_email, course_name, grade_data):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.succeed is None:
+            raise RuntimeError('provider down')
+        return self.succeed
+
+def test_dispatcher_fans_out_concurrently(app):
+    from application.services.notification_dispatcher import NotificationDispatcher
+
+    providers = [('gmail', SlowProvider(0.2)), ('outlook', SlowProvider(0.2, succeed=None))]
+    alerts = [(f'student{i}@example.com', f'Course {i}', {}) for i in range(3)]
+
+    start = time.monotonic()
+    results = NotificationDispatcher(providers).dispatch(alerts)
+
+    assert results == [['gmail'], ['gmail'], ['gmail']]
+    assert time.monotonic() - start < 0.6
+
+def test_dispatcher_abandons_slow_provider(app):
+    from application.services.notification_dispatcher import NotificationDispatcher
+
+    providers = [('gmail', SlowProvider(0.0)), ('outlook', SlowProvider(2.0))]
+
+    start = time.monotonic()
+    dispatcher = NotificationDispatcher(providers, timeout=0.2)
+    results = dispatcher.dispatch([('student@example.com', 'Course', {})])
+
+    assert results == [['gmail']]
+    assert dispatcher.unconfirmed == [['outlook']]
+    assert time.monotonic() - start < 1.5
+
+def test_batch_job_runs_on_its_own(app, make_course):
+    course = make_course()
+    JobQueue.enqueue('send_grade_alert', {'course_id': course.id, 'recipient_email': 'student@example.com'},
+                     user_id=course.user_id)
+    db.session.commit()
+
+    job = JobQueue.run(JobQueue.claim_next())
+    assert job.status == 'succeeded'
+    assert job.result['sent_via'] == ['gmail', 'outlook']
+
+def test_timed_out_alert_is_not_retried(app, make_course, monkeypatch):
+    from application import jobs
+
+    app.config['NOTIFY_PROVIDER_TIMEOUT'] = 0.2
+    monkeypatch.setattr(jobs, 'OutlookService', lambda: SlowProvider(1.0))
+    course = make_course()
+    job = JobQueue.enqueue('send_grade_alert', {
+        'course_id': course.id, 'recipient_email': 'student@example.com', 'use_gmail': False, 'use_outlook': True
+    }, user_id=course.user_id)
+    db.session.commit()
+
+    job = JobQueue.run(JobQueue.claim_next())
+    assert job.status == 'succeeded'
+    assert job.result['unconfirmed'] == ['outlook']
+    assert Notification.query.count() == 0
+
+def test_dispatcher_deadline_covers_queued_calls(app, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from application.services import notification_dispatcher
+
+    # One pool thread: the second and third calls queue behind the first
+    monkeypatch.setattr(notification_dispatcher, '_executor', ThreadPoolExecutor(max_workers=1))
+    provider = SlowProvider(0.5)
+    alerts = [(f'student{i}@example.com', f'Course {i}', {}) for i in range(3)]
+
+    start = time.monotonic()
+    results = notification_dispatcher.NotificationDispatcher([('gmail', provider)], timeout=0.2).dispatch(alerts)
+
+    assert results == [[], [], []]
+    assert time.monotonic() - start < 0.45
+    notification_dispatcher._executor.shutdown(wait=True)
+    assert provider.calls == 1
+
+def test_notifications_page_newest_first(client, auth_headers, user):
+    base = datetime(2024, 1, 1)
+    for i in range(5):
+        # Two rows share a timestamp so the id tiebreaker is exercised
+        db.session.add(Notification(
+            user_id=user.id, notification_type='grade_alert', subject=f'Alert {i}',
+            message='...', created_at=base + timedelta(minutes=min(i, 3))
+        ))
+    db.session.commit()
+
+    subjects = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'/api/notifications/?limit=2&fields=subject&cursor={cursor}', headers=auth_headers)
+        assert response.status_code == 200
+        subjects.extend(n['subject'] for n in response.json['notifications'])
+        cursor = response.json['page']['next_cursor']
+    assert subjects == ['Alert 4', 'Alert 3', 'Alert 2', 'Alert 1', 'Alert 0']
+
+def test_expired_job_on_final_attempt_is_failed_not_reclaimed(app):
+    job = JobQueue.enqueue('import_courses', {'user_id': 0}, max_attempts=2)
+    job.status = Job.STATUS_RUNNING
+    job.attempts = 2
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    job_id = job.id
+
+    assert JobQueue.claim_next() is None
+    db.session.expire_all()
+    job = db.session.get(Job, job_id)
+    assert job.status == 'failed'
+    assert job.attempts == 2
+    assert job.locked_until is None
+    assert 'final attempt' in job.error
+
+def test_reclaimed_job_ignores_the_stale_worker_result(app):
+    def slow_handler(job):
+        # Another worker reclaims the job while this one is still running it
+        db.session.execute(db.update(Job).where(Job.id == job.id).values(
+            locked_until=datetime.utcnow() + timedelta(minutes=10), attempts=Job.attempts + 1
+        ))
+        db.session.commit()
+        return {'stale': True}
+
+    JOB_HANDLERS['slow'] = slow_handler
+    try:
+        job = JobQueue.enqueue('slow')
+        db.session.commit()
+        job = JobQueue.run(JobQueue.claim_next())
+        assert job.status == 'running'
+        assert job.result is None
+        assert job.attempts == 2
+    finally:
+        JOB_HANDLERS.pop('slow')
+
+def test_lost_lease_rolls_back_the_handler_writes(app, user):
+    def slow_handler(job):
+        db.session.add(Notification(user_id=user.id, notification_type='grade_alert', subject='Late', message='...'))
+        # Another worker reclaims the job before this one commits its work
+        with db.engine.begin() as connection:
+            connection.execute(db.update(Job).where(Job.id == job.id).values(
+                locked_until=datetime.utcnow() + timedelta(minutes=10)
+            ))
+        return {'stale': True}
+
+    JOB_HANDLERS['slow'] = slow_handler
+    try:
+        job = JobQueue.enqueue('slow')
+        db.session.commit()
+        job = JobQueue.run(JobQueue.claim_next())
+        assert job.status == 'running'
+        assert Notification.query.count() == 0
+    finally:
+        JOB_HANDLERS.pop('slow')
+
+def test_auto_check_for_deleted_user_fails_permanently(app):
+    job = JobQueue.enqueue('auto_check_grades', user_id=999)
+    db.session.commit()
+
+    job = JobQueue.run(JobQueue.claim_next())
+    assert job.status == 'failed'
+    assert job.attempts == 1
+    assert job.error == 'User not found'
@@ -0,0 +1,24 @@
+"""
+Background job worker. Polls the jobs table and runs queued work
+(course imports for new users, grade alerts and auto-checks) outside the
+request path.
+
+    python worker.py
+"""
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from application import create_app
+from application.services.job_queue import JobWorker
+
+config_name = os.getenv('FLASK_ENV', 'production')
+app = create_app(config_name)
+
+if __name__ == "__main__":
+    worker = JobWorker(app)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
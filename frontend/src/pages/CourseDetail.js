@@ -26,7 +26,7 @@ function CourseDetail() {
         coursesAPI.getCourse(id),
         coursesAPI.calculateGrade(id),
       ]);
-      setCourse(courseRes.data);
+      setCourse(courseRes.data.course);
       setGradeData(gradeRes.data);
     } catch (err) {
       setError('Failed to load course');
@@ -49,7 +49,7 @@ function CourseDetail() {
   const handleSendAlert = async () => {
     try {
       await notificationsAPI.sendGradeAlert(id, {});
-      setSuccess('Grade alert sent successfully!');
+      setSuccess('Grade alert queued!');
       setTimeout(() => setSuccess(''), 3000);
     } catch (err) {
       setError('Failed to send alert');
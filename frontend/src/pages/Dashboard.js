@@ -1,10 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { coursesAPI, notificationsAPI } from '../services/api';
+import { authAPI, coursesAPI, notificationsAPI } from '../services/api';
 
 function Dashboard() {
   const [courses, setCourses] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [importing, setImporting] = useState(false);
+  const [syncProgress, setSyncProgress] = useState(null);
   const [showAddCourse, setShowAddCourse] = useState(false);
   const [formData, setFormData] = useState({
     course_code: '',
@@ -23,8 +25,11 @@ function Dashboard() {
 
   const loadCourses = async () => {
     try {
-      const response = await coursesAPI.getCourses();
+      const response = await coursesAPI.getDashboard();
       setCourses(response.data.courses);
+      if (response.data.courses.length === 0) {
+        checkImportStatus();
+      }
     } catch (err) {
       setError('Failed to load courses');
     } finally {
@@ -32,6 +37,20 @@ function Dashboard() {
     }
   };
 
+  const checkImportStatus = async () => {
+    try {
+      const response = await authAPI.getImportStatus();
+      const { status } = response.data.job;
+      const pending = status === 'queued' || status === 'running';
+      setImporting(pending);
+      if (pending) {
+        setTimeout(loadCourses, 2000);
+      }
+    } catch (err) {
+      setImporting(false);
+    }
+  };
+
   const handleAddCourse = async (e) => {
     e.preventDefault();
     setError('');
@@ -64,6 +83,24 @@ function Dashboard() {
     }
   };
 
+  const handleSyncAll = async () => {
+    setError('');
+    setSyncProgress({ done: 0, total: courses.length });
+    try {
+      const summary = await coursesAPI.syncAllCourses((event) => setSyncProgress(event.progress));
+      setSuccess(`Synced ${summary.synced} of ${summary.courses} courses from Brightspace`);
+      if (summary.failed) {
+        setError(`${summary.failed} course(s) failed to sync`);
+      }
+      loadCourses();
+      setTimeout(() => setSuccess(''), 5000);
+    } catch (err) {
+      setError('Failed to sync courses from Brightspace');
+    } finally {
+      setSyncProgress(null);
+    }
+  };
+
   const getGradeClass = (letterGrade) => {
     if (!letterGrade) return '';
     const grade = letterGrade[0];
@@ -79,6 +116,9 @@ function Dashboard() {
       <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginBottom: '2rem' }}>
         <h2>My Courses</h2>
         <div style={{ display: 'flex', gap: '1rem' }}>
+          <button className="btn btn-secondary" onClick={handleSyncAll} disabled={syncProgress !== null}>
+            {syncProgress ? `Syncing ${syncProgress.done}/${syncProgress.total}...` : 'Sync All'}
+          </button>
           <button className="btn btn-secondary" onClick={handleAutoCheck}>
             Check All Grades
           </button>
@@ -93,7 +133,11 @@ function Dashboard() {
 
       {courses.length === 0 ? (
         <div className="card">
-          <p>No courses yet. Add your first course to get started!</p>
+          {importing ? (
+            <p>Importing your courses from Brightspace...</p>
+          ) : (
+            <p>No courses yet. Add your first course to get started!</p>
+          )}
         </div>
       ) : (
         <div className="course-list">
@@ -169,24 +213,7 @@ function Dashboard() {
 }
 
 function CourseCard({ course, navigate, getGradeClass }) {
-  const [gradeData, setGradeData] = useState(null);
-  const [loading, setLoading] = useState(true);
-
-  useEffect(() => {
-    loadGradeData();
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
-
-  const loadGradeData = async () => {
-    try {
-      const response = await coursesAPI.calculateGrade(course.id);
-      setGradeData(response.data);
-    } catch (err) {
-      console.error('Failed to load grade data');
-    } finally {
-      setLoading(false);
-    }
-  };
+  const gradeData = course.grade;
 
   return (
     <div className="course-item" onClick={() => navigate(`/course/${course.id}`)}>
@@ -198,14 +225,14 @@ function CourseCard({ course, navigate, getGradeClass }) {
             {course.semester} {course.year}
           </p>
         </div>
-        {!loading && gradeData && gradeData.projected_final_grade && (
+        {gradeData && gradeData.projected_final_grade && (
           <div className={`grade-badge ${getGradeClass(gradeData.letter_grade)}`}>
             {gradeData.projected_final_grade}%
             <div style={{ fontSize: '0.9rem' }}>{gradeData.letter_grade}</div>
           </div>
         )}
       </div>
-      {!loading && gradeData && (
+      {gradeData && (
         <div style={{ marginTop: '1rem', paddingTop: '1rem', borderTop: '1px solid #eee' }}>
           <div style={{ display: 'flex', justifyContent: 'space-between', fontSize: '0.9rem' }}>
             <span>Target: {course.target_grade}%</span>
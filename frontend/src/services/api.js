@@ -39,15 +39,59 @@ export const authAPI = {
   login: (data) => api.post('/auth/login', data),
   getCurrentUser: () => api.get('/auth/me'),
   updateUser: (data) => api.put('/auth/me', data),
+  getImportStatus: () => api.get('/auth/import-status'),
 };
 
 export const coursesAPI = {
-  getCourses: () => api.get('/courses/'),
-  getCourse: (id) => api.get(`/courses/${id}`),
+  getCourses: (params) => api.get('/courses/', { params }),
+  getDashboard: () => api.get('/courses/dashboard'),
+  getCourse: async (id) => {
+    // Assignments come back in keyset pages; follow next_cursor so callers get them all
+    const response = await api.get(`/courses/${id}`, { params: { limit: 1000 } });
+    const { course } = response.data;
+    let cursor = response.data.assignments_page.next_cursor;
+    while (cursor) {
+      const next = await api.get(`/courses/${id}`, { params: { limit: 1000, cursor } });
+      course.assignments = course.assignments.concat(next.data.course.assignments);
+      cursor = next.data.assignments_page.next_cursor;
+    }
+    return response;
+  },
   createCourse: (data) => api.post('/courses/', data),
   updateCourse: (id, data) => api.put(`/courses/${id}`, data),
   deleteCourse: (id) => api.delete(`/courses/${id}`),
   syncCourse: (id) => api.post(`/courses/${id}/sync`),
+  syncAllCourses: async (onProgress) => {
+    // Streams NDJSON progress events; axios cannot read a response body incrementally
+    const response = await fetch(`${API_URL}/courses/sync-all?stream=1`, {
+      method: 'POST',
+      headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+    });
+    if (!response.ok) {
+      throw new Error(`Sync failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let summary = null;
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      for (const line of lines.filter(Boolean)) {
+        const event = JSON.parse(line);
+        if (event.type === 'summary') {
+          summary = event;
+        } else if (onProgress) {
+          onProgress(event);
+        }
+      }
+    }
+    return summary;
+  },
   calculateGrade: (id) => api.get(`/courses/${id}/calculate`),
   calculateGradeNeeded: (id, target) => api.get(`/courses/${id}/grade-needed?target=${target}`),
   addWeight: (id, data) => api.post(`/courses/${id}/weights`, data),
@@ -61,10 +105,11 @@ export const gradesAPI = {
   getGrade: (assignmentId) => api.get(`/grades/assignment/${assignmentId}`),
   deleteGrade: (assignmentId) => api.delete(`/grades/assignment/${assignmentId}`),
   getCourseGrades: (courseId) => api.get(`/grades/course/${courseId}`),
+  bulkUpsertGrades: (grades) => api.post('/grades/bulk', grades),
 };
 
 export const notificationsAPI = {
-  getNotifications: () => api.get('/notifications/'),
+  getNotifications: (params) => api.get('/notifications/', { params }),
   markAsRead: (id) => api.put(`/notifications/${id}/read`),
   sendGradeAlert: (courseId, data) => api.post(`/notifications/send-grade-alert/${courseId}`, data),
   autoCheckGrades: () => api.post('/notifications/auto-check'),